@@ -0,0 +1,620 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from os import path
+
+from lib import display_message, hor_bar
+
+# Module variables :
+app_root = path.abspath(path.dirname(__file__))
+width = 100
+baseline_name = "bench_baseline.json"  # Saved with --save; compared on every run
+default_params = {
+    "repeat": 5,  # Runs per benchmark; the median is reported.
+    "cards": 10000,  # Entries in the synthetic research log
+    "tags": 1000,  # Tags in the synthetic tag library
+    "psds": 2000,  # Dummy PSD files in the synthetic chapter folder
+    "seed": 1812,
+}
+words = (
+    "the transition to new manufacturing processes in great britain continental europe "
+    "and the united states steam power textile industry iron court statute subsidy"
+).split()
+
+# Timed in a fresh interpreter; argv : app folder, "lazy" or "eager".
+_startup_script = """
+import json, sys, time
+
+t0 = time.perf_counter()
+from Tools import RegistryManager
+
+t1 = time.perf_counter()
+reg = RegistryManager(app_parent=sys.argv[1])
+projects = reg.projects
+
+t2 = time.perf_counter()
+heavy = [m for m in ("PIL", "pytesseract", "tkinter") if m in sys.modules]
+
+if sys.argv[2] == "eager":  # As before; heavy modules, and OCR engine at start up.
+    import PIL.Image, pytesseract, tkinter
+
+    reg.ocr_manager
+
+t3 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "registry": t2 - t1, "ocr": t3 - t2, "heavy": heavy}))
+"""
+
+
+def bench_startup(work_dir, params) -> dict:
+    """Time to a usable project registry; OCR engine deferred, versus set up at start up."""
+    app_parent = _make_app_parent(work_dir)
+    results = {}
+
+    for mode in ["lazy", "eager"]:
+        runs = []
+
+        for _ in range(params["repeat"]):
+            proc = subprocess.run(
+                [sys.executable, "-c", _startup_script, app_parent, mode],
+                cwd=app_root,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+        for key in ["import", "registry", "ocr"]:
+            results[f"startup_{mode}_{key}"] = statistics.median(
+                run[key] for run in runs
+            )
+
+        if mode == "lazy":
+            display_message(
+                "INFO",
+                f"Modules loaded before first OCR : {runs[-1]['heavy'] or 'none'}.",
+            )
+
+    return results
+
+
+def bench_log(work_dir, params) -> dict:
+    """Save one entry, load, stream, and read the tail of a log of params["cards"] entries."""
+    from Storage import _load_log, iter_log, open_log
+
+    results = {}
+    entries = _synthetic_entries(params)
+
+    for storage in ["json", "jsonl"]:
+        project_path = _make_project(work_dir, f"log_{storage}", storage, entries)
+        log_path = path.join(project_path, "research_log.json")
+        log_file = open_log(log_path, storage).log_path
+        entry = entries[0]
+
+        with open(log_file, "rb") as file:
+            original = file.read()
+
+        def reset():
+            """Each save is timed against a log of params["cards"] entries."""
+            with open(log_file, "wb") as file:
+                file.write(original)
+
+        def save():
+            log_store = open_log(log_path, storage)
+            log_store.append(entry)
+
+        results[f"save_{storage}"] = _timeit(save, params, setup=reset, quiet=True)
+        reset()
+
+        if storage == "json":  # Full loads only apply to the JSON array.
+            results["load_json"] = _timeit(lambda: _load_log(log_path), params)
+
+        results[f"iter_{storage}"] = _timeit(
+            lambda: sum(1 for _ in iter_log(log_file)), params
+        )
+        results[f"tail_{storage}"] = _timeit(
+            lambda: open_log(log_path, storage).tail(10), params
+        )
+
+    return results
+
+
+def bench_tags(work_dir, params) -> dict:
+    """Resolve a mix of tag IDs, existing names, and new names, against params["tags"] tags."""
+    from Tools import TagManager
+
+    rng = random.Random(params["seed"])
+    project_path = _make_project(work_dir, "tags", "json", [])
+    tag_names = [f"TAG{n}" for n in range(params["tags"])]
+
+    with open(path.join(project_path, "tags.json"), "w", encoding="utf-8") as file:
+        json.dump(tag_names, file)
+
+    tags_manager = TagManager(project_path)
+    items = (
+        [str(rng.randint(1, params["tags"])) for _ in range(20)]
+        + [rng.choice(tag_names).lower() for _ in range(20)]
+        + [f"<{rng.randint(1000, 2000)}>" for _ in range(5)]
+    )
+    user_input = ", ".join(items)
+
+    return {
+        "resolve_tags": _timeit(
+            lambda: tags_manager.resolve_tags(user_input), params, quiet=True
+        )
+    }
+
+
+def bench_index(work_dir, params) -> dict:
+    """Build the project index, then run tag queries, and full-text searches."""
+    from Index import ProjectIndex
+    from Storage import open_log
+
+    project_path = _make_project(work_dir, "index", "jsonl", _synthetic_entries(params))
+    log_store = open_log(path.join(project_path, "research_log.json"), "jsonl")
+
+    def build():
+        if path.exists(path.join(project_path, "index.db")):
+            os.remove(path.join(project_path, "index.db"))
+        ProjectIndex(project_path, log_store).conn.close()
+
+    results = {"index_build": _timeit(build, params, quiet=True)}
+    project_index = ProjectIndex(project_path, log_store)
+    results["index_query"] = _timeit(
+        lambda: project_index.query("(TAG1 OR TAG2) NOT <1800-1850>"), params
+    )
+    results["index_search"] = _timeit(
+        lambda: project_index.search('"steam power" manufactur*'), params
+    )
+
+    return results
+
+
+def bench_preprocess(work_dir, params) -> dict:
+    """Preprocess synthetic screenshots of rendered text; light, and dark mode."""
+    from Tools import OCRManager
+
+    ocr_manager = OCRManager(
+        _make_app_parent(work_dir), tesseract_path=path.join(work_dir, "tesseract")
+    )
+    results = {}
+
+    for label, size, dark in [
+        ("1080p", (1920, 1080), False),
+        ("4k_dark", (3840, 2160), True),
+    ]:
+        img = _synthetic_image(size, dark, params)
+        results[f"preprocess_{label}"] = _timeit(
+            lambda: ocr_manager._preprocess_for_ocr(img), params
+        )
+
+    return results
+
+
+def bench_table(work_dir, params) -> dict:
+    """Detect the grid of synthetic rendered tables, and build the OCR mosaic; no OCR."""
+    from Tables import build_mosaic, find_cells
+
+    results = {}
+
+    for rows, cols, ruled in [(5, 3, True), (20, 5, False), (60, 8, True)]:
+        img = _synthetic_table(rows, cols, ruled, params)
+
+        def layout():
+            cells, _, _ = find_cells(img)
+            build_mosaic(img, [box for _, _, box in cells])
+
+        results[f"table_{rows}x{cols}"] = _timeit(layout, params)
+
+    return results
+
+
+def bench_cleanup(work_dir, params) -> dict:
+    """Clean up synthetic raw OCR text of 10, and 200 pages; time should scale linearly."""
+    from Cleanup import clean_text
+
+    results = {}
+
+    for pages in [10, 200]:
+        text = _synthetic_ocr_text(pages, params)
+        results[f"cleanup_{pages}_pages"] = _timeit(lambda: clean_text(text), params)
+
+    return results
+
+
+def bench_layout(work_dir, params) -> dict:
+    """Build, derive text from, and reload the word boxes of a dense synthetic page."""
+    from Layout import Layout
+
+    rng = random.Random(params["seed"])
+    page_words = [
+        {
+            "text": rng.choice(words),
+            "conf": rng.uniform(40, 97),
+            "left": 20 + (n % 12) * 90,
+            "top": 20 + (n // 12) * 40,
+            "width": 80,
+            "height": 30,
+            "block_num": 1,
+            "par_num": 1 + n // 240,
+            "line_num": 1 + (n // 12) % 20,
+        }
+        for n in range(4000)
+    ]
+    layout = Layout.from_words(page_words, (1200, 14000), 2.0)
+    data = layout.to_bytes()
+    display_message(
+        "INFO",
+        f"{len(layout)} words; {len(data)} bytes, versus {len(json.dumps(page_words))} as JSON.",
+    )
+
+    return {
+        "layout_build": _timeit(
+            lambda: Layout.from_words(page_words, (1200, 14000)), params
+        ),
+        "layout_text": _timeit(layout.text, params),
+        "layout_load": _timeit(lambda: Layout.from_bytes(data), params),
+    }
+
+
+def bench_cli(work_dir, params) -> dict:
+    """Headless ingest, and search, end to end through Cli.main; image entries, no OCR."""
+    import Cli
+
+    app_parent = _make_app_parent(work_dir)
+    project_path = path.join(work_dir, "cli_project")
+    image_path = path.join(work_dir, "snip.png")
+    _synthetic_image((1280, 720), False, params).save(image_path)
+    base = ["--app-parent", app_parent]
+
+    with _Silence(True):
+        Cli.main([*base, "add-project", "cli", project_path, "--storage", "jsonl"])
+
+    def ingest():
+        Cli.main([*base, "ingest", "cli", image_path, "--type", "image", "--tags", "A"])
+
+    results = {"cli_ingest": _timeit(ingest, params, quiet=True)}
+    results["cli_search"] = _timeit(
+        lambda: Cli.main([*base, "search", "cli", "--tags", "A"]), params, quiet=True
+    )
+
+    return results
+
+
+def bench_rename(work_dir, params) -> dict:
+    """Plan, and apply page marker renames over a folder of params["psds"] dummy PSD files."""
+    from lib import apply_renames, plan_renames, _write_journal
+
+    psd_path = path.join(work_dir, "chapter")
+
+    def make_folder():
+        shutil.rmtree(psd_path, ignore_errors=True)
+        os.makedirs(psd_path)
+
+        for n in range(params["psds"]):
+            open(path.join(psd_path, f"page{n:04d}.psd"), "w").close()
+
+    def apply():
+        plan, _ = plan_renames(1, psd_path, set())
+        _write_journal(psd_path, 1, plan)
+        apply_renames(psd_path, plan)
+
+    make_folder()
+    results = {"rename_plan": _timeit(lambda: plan_renames(1, psd_path, set()), params)}
+    results["rename_apply"] = _timeit(apply, params, setup=make_folder)
+
+    return results
+
+
+benchmarks = {
+    "startup": bench_startup,
+    "log": bench_log,
+    "tags": bench_tags,
+    "index": bench_index,
+    "preprocess": bench_preprocess,
+    "table": bench_table,
+    "cleanup": bench_cleanup,
+    "layout": bench_layout,
+    "cli": bench_cli,
+    "rename": bench_rename,
+}
+
+
+def run(selected, params, baseline_path, save=False, tolerance=0.2) -> bool:
+    """
+    Run benchmarks, and compare with the saved baseline.
+    :return: Whether every benchmark is within tolerance of the baseline.
+    """
+    baseline = _read_baseline(baseline_path)
+    comparable = baseline.get("params") == params
+    results = {}
+
+    if baseline and not comparable:
+        display_message("WARN", "Baseline was recorded with other parameters.")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for bench_name in selected:
+            hor_bar(width, 10, f"BENCHMARK : {bench_name}")
+            bench_dir = path.join(work_dir, bench_name)
+            os.makedirs(bench_dir)
+
+            timings = benchmarks[bench_name](bench_dir, params)
+            results.update(timings)
+
+            for metric, seconds in timings.items():
+                print(_format_row(metric, seconds, baseline, comparable, tolerance))
+
+    regressions = [
+        metric
+        for metric, seconds in results.items()
+        if comparable and _is_regression(metric, seconds, baseline, tolerance)
+    ]
+
+    if regressions:
+        display_message("WARN", f"Regressions : {regressions}")
+
+    if save:
+        baseline = {
+            "params": params,
+            "python": sys.version.split()[0],
+            "recorded": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": (
+                {**baseline.get("results", {}), **results} if comparable else results
+            ),
+        }
+
+        with open(baseline_path, "w", encoding="utf-8") as file:
+            json.dump(baseline, file, indent=2)
+
+        display_message("INFO", f'Baseline saved to "{path.basename(baseline_path)}".')
+
+    return not regressions
+
+
+def _timeit(func, params, setup=None, quiet=False) -> float:
+    """Median time of func over params["repeat"] runs; setup runs untimed before each."""
+    runs = []
+
+    for _ in range(params["repeat"]):
+        if setup:
+            setup()
+
+        with _Silence(quiet):
+            start = time.perf_counter()
+            func()
+            runs.append(time.perf_counter() - start)
+
+    return statistics.median(runs)
+
+
+class _Silence:
+    """Suppress the tool's console messages while timing; Cli sends its progress to stderr."""
+
+    def __init__(self, active) -> None:
+        self.active = active
+
+    def __enter__(self):
+        if self.active:
+            self.streams = sys.stdout, sys.stderr
+            sys.stdout = sys.stderr = open(os.devnull, "w")
+
+    def __exit__(self, *exc):
+        if self.active:
+            sys.stdout.close()
+            sys.stdout, sys.stderr = self.streams
+
+
+def _synthetic_entries(params) -> list:
+    rng = random.Random(params["seed"])
+    tag_names = [f"TAG{n}" for n in range(params["tags"])]
+
+    return [
+        {
+            "type": "text",
+            "created": "2025-12-26T00:00:00+00:00",
+            "title": f"card {n}",
+            "content": " ".join(rng.choice(words) for _ in range(120)),
+            "source": "https://en.wikipedia.org/wiki/Industrial_Revolution",
+            "tags": rng.sample(tag_names, min(3, len(tag_names)))
+            + [f"<{rng.randint(1700, 1950)}>"],
+            "notes": "",
+            "lang": "eng",
+        }
+        for n in range(params["cards"])
+    ]
+
+
+def _synthetic_image(size, dark, params):
+    from PIL import Image, ImageDraw, ImageFont
+
+    rng = random.Random(params["seed"])
+    background, ink = ((30, 30, 30), (220, 220, 220)) if dark else ("white", "black")
+    img = Image.new("RGB", size, background)
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=20)
+
+    for y in range(20, size[1] - 30, 30):
+        draw.text(
+            (20, y), " ".join(rng.choice(words) for _ in range(30)), font=font, fill=ink
+        )
+
+    return img
+
+
+def _synthetic_ocr_text(pages, params) -> str:
+    """
+    Raw Tesseract output of a book; hard-wrapped lines, words split across lines,
+    bullet, and numbered lists, ligatures, and a form feed after each page.
+    """
+    rng = random.Random(params["seed"])
+    page_texts = []
+
+    for _ in range(pages):
+        lines = []
+
+        for _ in range(6):
+            para = " ".join(rng.choice(words) for _ in range(rng.randint(40, 120)))
+            para = para.replace("fi", "\ufb01") + "."
+
+            while len(para) > 70:
+                cut = para.rfind(" ", 0, 70)
+
+                if rng.random() < 0.2:  # Split the next word, as typeset.
+                    lines.append(para[: cut + 4] + "-")
+                    para = para[cut + 4 :]
+                else:
+                    lines.append(para[:cut])
+                    para = para[cut + 1 :]
+
+            lines.extend([para, ""])
+
+            if rng.random() < 0.3:
+                lines.extend(
+                    f"{rng.choice(['•', '-', f'{n + 1})'])} {rng.choice(words)} {rng.choice(words)}"
+                    for n in range(rng.randint(2, 6))
+                )
+                lines.append("")
+
+        page_texts.append("\n".join(lines))
+
+    return "\f".join(page_texts)
+
+
+def _synthetic_table(rows, cols, ruled, params):
+    """Table of words, as preprocessed; ruled both ways, or with a header rule only."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    rng = random.Random(params["seed"])
+    cell_w, cell_h, margin = 320, 44, 20
+    img = Image.new("L", (cols * cell_w + 2 * margin, rows * cell_h + 2 * margin), 255)
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=20)
+
+    for row in range(rows):
+        for col in range(cols):
+            draw.text(
+                (margin + col * cell_w + 10, margin + row * cell_h + 10),
+                " ".join(rng.choice(words) for _ in range(2)),
+                font=font,
+                fill=0,
+            )
+
+    right, bottom = margin + cols * cell_w, margin + rows * cell_h
+    h_lines = range(rows + 1) if ruled else [1]
+
+    for row in h_lines:
+        y = margin + row * cell_h
+        draw.line((margin, y, right, y), fill=0, width=2)
+
+    for col in range(cols + 1) if ruled else []:
+        x = margin + col * cell_w
+        draw.line((x, margin, x, bottom), fill=0, width=2)
+
+    return img
+
+
+def _make_app_parent(work_dir) -> str:
+    """App folder with a registry, and a stand-in Tesseract path; OCR set up never prompts."""
+    user_data_path = path.join(work_dir, "user_data")
+    tess_path = path.join(work_dir, "tesseract")
+
+    if not path.exists(user_data_path):
+        os.makedirs(user_data_path)
+        open(tess_path, "w").close()
+
+        with open(path.join(user_data_path, "paths.csv"), "w") as file:
+            file.write(tess_path.replace(os.sep, "/") + "\n")
+
+    return work_dir
+
+
+def _make_project(work_dir, name, storage, entries) -> str:
+    project_path = path.join(work_dir, name)
+    os.makedirs(project_path)
+
+    with open(path.join(project_path, "tags.json"), "w", encoding="utf-8") as file:
+        json.dump([], file)
+
+    log_path = path.join(project_path, "research_log.json")
+
+    with open(log_path, "w", encoding="utf-8") as file:
+        if storage == "json":
+            json.dump(entries, file, indent=2, ensure_ascii=False)
+        else:
+            json.dump([], file)
+
+    if storage == "jsonl":
+        with open(log_path + "l", "w", encoding="utf-8") as file:
+            file.writelines(json.dumps(entry) + "\n" for entry in entries)
+
+    return project_path
+
+
+def _read_baseline(baseline_path) -> dict:
+    if not path.exists(baseline_path):
+        return {}
+
+    with open(baseline_path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _is_regression(metric, seconds, baseline, tolerance) -> bool:
+    previous = baseline.get("results", {}).get(metric)
+    return previous is not None and seconds > previous * (1 + tolerance)
+
+
+def _format_row(metric, seconds, baseline, comparable, tolerance) -> str:
+    row = f"<=>  {metric:<28}{seconds * 1000:>12.2f}ms"
+    previous = baseline.get("results", {}).get(metric) if comparable else None
+
+    if previous:
+        change = (seconds - previous) / previous
+        flag = (
+            "REGRESSION" if _is_regression(metric, seconds, baseline, tolerance) else ""
+        )
+        row += f"{previous * 1000:>12.2f}ms{change:>+9.0%}  {flag}"
+
+    return row
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Research Tool hot paths; headless."
+    )
+    parser.add_argument("names", nargs="*", help=f"Any of {list(benchmarks)}.")
+    parser.add_argument("--save", action="store_true", help="Save as the baseline.")
+    parser.add_argument(
+        "--baseline", default=path.join(app_root, baseline_name), help="Baseline file."
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Slow down flagged as a regression; 0.2 is 20%%.",
+    )
+
+    for key, value in default_params.items():
+        parser.add_argument(f"--{key}", type=int, default=value)
+
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in benchmarks]
+
+    if unknown:
+        parser.error(f"Unknown benchmarks {unknown}; {list(benchmarks)}.")
+
+    bench_params = {key: getattr(args, key) for key in default_params}
+    passed = run(
+        args.names or list(benchmarks),
+        bench_params,
+        args.baseline,
+        args.save,
+        args.tolerance,
+    )
+
+    sys.exit(0 if passed else 1)
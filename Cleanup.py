@@ -0,0 +1,217 @@
+import re
+
+# Module variables :
+# Clean up stages of OCR text; override per project with "cleanup" in registry.json
+cleanup_defaults = {
+    "dehyphenate": True,  # Join words split across lines; "recog-\nnition".
+    "rejoin": True,  # Join hard-wrapped lines into paragraphs.
+    "lists": True,  # Keep bullet, and numbered items on their own lines.
+    "markdown": False,  # Write list items as markdown; "- item", "1. item".
+}
+short_line = 0.7  # Lines shorter than this share of the widest, ending a sentence, end a paragraph.
+
+# Hyphenated prefixes kept when split across lines; eg "self-\nevident".
+kept_prefixes = {"self", "non", "well", "co", "ex", "anti", "multi", "cross", "half"}
+
+# Ligatures, page breaks, and invisible characters Tesseract emits; mapped in one str.translate pass.
+_char_map = str.maketrans(
+    {
+        "ﬀ": "ff",
+        "ﬁ": "fi",
+        "ﬂ": "fl",
+        "ﬃ": "ffi",
+        "ﬄ": "ffl",
+        "ﬅ": "st",
+        "ﬆ": "st",
+        "\u00ad": "",  # Soft hyphen
+        "\u200b": "",  # Zero width space
+        "\u00a0": " ",  # Non-breaking space
+        "\t": " ",
+        "\r": "",
+        "\f": "\n",  # Page break; a paragraph may run on to the next page.
+    }
+)
+_spaces = re.compile(r" {2,}")
+_list_item = re.compile(
+    r"^(?:(?P<bullet>[-*•·▪◦‣–—])"
+    r"|(?P<number>\(?(?:\d{1,3}|[ivxlc]{2,5})[.)])"
+    r"|(?P<letter>\(?[a-zA-Z][.)]))\s+(?P<text>\S.*)$"
+)
+_list_starts = "aAiI"  # Letters that may begin a lettered list, or a roman numbered one
+_hyphen_end = re.compile(r"(?P<word>[^\W\d_]+)-$")
+_sentence_end = re.compile(r"[.!?:;\"'”’)\]]$")
+
+
+class TextCleaner:
+    """
+    Rule-based clean up of OCR text, one line at a time; linear in the length of the text.
+    Feed text in pieces, eg page by page, then close to get the rest of the output.
+    """
+
+    def __init__(self, stages=None) -> None:
+        """:param stages: Overrides of cleanup_defaults."""
+        self.stages = {**cleanup_defaults, **(stages or {})}
+        self.blocks = []  # Finished paragraphs, and lists
+        self.pieces = []  # Text of the paragraph, or list item being built
+        self.items = []  # Finished items of the list being built
+        self.in_list = False  # Whether pieces hold a list item
+        self.last_line = ""  # Last line added to pieces
+        self.letter_start = None  # Match, and pieces index of a line like "a. item"
+        self.partial = ""  # Text after the last line break of the latest feed
+        self.width = 0  # Widest line so far
+
+    def feed(self, text) -> None:
+        lines = (self.partial + text.translate(_char_map)).split("\n")
+        self.partial = lines.pop()
+
+        for line in lines:
+            self._line(line)
+
+    def close(self) -> str:
+        """Finish the text fed so far, and return it cleaned."""
+        if self.partial:
+            self._line(self.partial)
+            self.partial = ""
+
+        self._end_block()
+
+        return "\n\n".join(self.blocks)
+
+    def _line(self, line) -> None:
+        line = _spaces.sub(" ", line.strip())
+
+        if not line:
+            self._end_block()
+            return
+
+        self.width = max(self.width, len(line))
+        item = _list_item.match(line) if self.stages["lists"] else None
+        letter_start = None
+
+        if item and self.letter_start and self._follows(item):
+            # A lettered list began inside the paragraph; eg "a. item", then "b. item".
+            self._split_list()
+        elif item and item.group("letter") and not self.in_list:
+            # Prose may start with an initial; eg "A. Smith wrote". Kept as a paragraph,
+            # unless the next item follows on.
+            if self._marker(item) in _list_starts:
+                letter_start = item
+
+            item = None
+
+        if item:
+            self._end_piece()
+
+            if not self.in_list:
+                self._end_block()
+
+            self.in_list = True
+            self._start(self._item(item))
+
+        elif self.in_list:
+            # Wrapped text of the last item; else the list has ended.
+            if line[0].islower():
+                self._join(line)
+            else:
+                self._end_block()
+                self._start(line)
+
+        elif self.pieces and self._continues(line):
+            self._join(line)
+
+        else:
+            self._end_block()
+            self._start(line)
+
+        if letter_start:
+            self.letter_start = letter_start, len(self.pieces) - 1
+
+    def _continues(self, line) -> bool:
+        """Whether a line is the hard-wrapped continuation of the paragraph."""
+        # Line breaks are kept; only blank lines, and lists end a block.
+        if not self.stages["rejoin"]:
+            return True
+
+        ends_sentence = _sentence_end.search(self.last_line) is not None
+
+        return not (ends_sentence and len(self.last_line) < self.width * short_line)
+
+    def _start(self, line) -> None:
+        self.pieces = [line]
+        self.last_line = line
+
+    def _join(self, line) -> None:
+        """
+        Append a line; across a hyphen if it splits a word, else with a space.
+        With rejoin off, the line break is kept instead of the space.
+        """
+        hyphen = _hyphen_end.search(self.last_line)
+
+        if hyphen and self.stages["dehyphenate"] and line[0].islower():
+            if hyphen.group("word").lower() not in kept_prefixes:
+                self.pieces[-1] = self.pieces[-1][:-1]  # Last piece is the last line.
+        elif not self.stages["rejoin"]:
+            self.pieces.append("\n")
+        else:
+            self.pieces.append(" ")
+
+        self.pieces.append(line)
+        self.last_line = line
+
+    def _item(self, match) -> str:
+        if not self.stages["markdown"]:
+            return match.group(0)
+
+        if match.group("bullet"):
+            return f"- {match.group('text')}"
+
+        return f"{self._marker(match)}. {match.group('text')}"
+
+    def _split_list(self) -> None:
+        """End the paragraph before letter_start; its line is the first list item."""
+        match, start = self.letter_start
+        item_pieces = [self._item(match), *self.pieces[start + 1 :]]
+
+        if start:
+            self.pieces = ["".join(self.pieces[:start]).rstrip()]
+            self._end_block()
+
+        self.in_list = True
+        self.pieces = item_pieces
+        self.letter_start = None
+
+    def _follows(self, match) -> bool:
+        """Whether a list item is the second of the list begun by letter_start."""
+        first = self._marker(self.letter_start[0])
+
+        return self._marker(match) in [chr(ord(first) + 1), first * 2]
+
+    @staticmethod
+    def _marker(match) -> str:
+        """Number, or letter of a list item; eg "b" of "(b)"."""
+        return (match.group("number") or match.group("letter")).strip("().")
+
+    def _end_piece(self) -> None:
+        """Finish the paragraph, or list item being built."""
+        if self.pieces:
+            text = "".join(self.pieces)
+            (self.items if self.in_list else self.blocks).append(text)
+            self.pieces = []
+
+    def _end_block(self) -> None:
+        self._end_piece()
+
+        if self.items:
+            self.blocks.append("\n".join(self.items))
+            self.items = []
+
+        self.in_list = False
+        self.letter_start = None
+
+
+def clean_text(text, stages=None) -> str:
+    """Clean up OCR text in one call; see TextCleaner."""
+    cleaner = TextCleaner(stages)
+    cleaner.feed(text)
+
+    return cleaner.close()
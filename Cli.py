@@ -0,0 +1,438 @@
+import argparse
+import csv
+import json
+import os
+import shutil
+import sys
+from contextlib import redirect_stdout
+from os import path
+
+import Metrics
+from lib import display_message
+from Storage import default_storage, open_log, storage_types
+
+# Module variables :
+entry_types = ["text", "table", "image"]  # Entry types created by ingest
+meta_keys = ["title", "source", "notes", "tags"]  # Metadata read from flags, or stdin
+
+
+def main(argv=None) -> int:
+    """
+    Run one subcommand, without prompts or dialogs; results are printed to stdout as JSON.
+    Progress, and warnings go to stderr, so output can be piped.
+    :return: The exit code; 0 on success.
+    """
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    out = sys.stdout
+
+    if args.metrics:
+        Metrics.enable()
+
+    with redirect_stdout(sys.stderr):
+        from Tools import RegistryManager  # Deferred; --help stays fast.
+
+        reg = RegistryManager(app_parent=args.app_parent)
+
+        if args.command == "add-project":
+            return cmd_add_project(reg, args, out)
+
+        if args.command == "list":
+            return cmd_list(reg, args, out)
+
+        if args.command == "search-all":
+            return cmd_search_all(reg, args, out)
+
+        project = _find_project(reg, args.project)
+
+        if project is None:
+            display_message("WARN", f'Project "{args.project}" not found in registry.')
+            return 1
+
+        match args.command:
+            case "ingest":
+                return cmd_ingest(reg, project, args, out)
+            case "watch":
+                return cmd_watch(reg, project, args, out)
+            case "search":
+                return cmd_search(project, args, out)
+            case "export":
+                return cmd_export(project, args, out)
+
+    return 1
+
+
+def cmd_add_project(reg, args, out) -> int:
+    """Register a project folder, and create its files."""
+    if not reg.add_project(args.name, args.path, args.lang, args.storage):
+        return 1
+
+    project = reg.by_path[_registry_path(args.path)]
+    _emit(out, {"number": reg.projects.index(project) + 1, **project})
+
+    return 0
+
+
+def cmd_list(reg, args, out) -> int:
+    """List registered projects, with their numbers."""
+    for number, project in enumerate(reg.projects, 1):
+        _emit(out, {"number": number, **project})
+
+    return 0
+
+
+def cmd_ingest(reg, project, args, out) -> int:
+    """
+    Create entries from an image file, or a folder of images.
+    Metadata comes from the flags, or a JSON object on stdin with --meta -; flags win.
+    """
+    from Tools import ImageEntry, TagManager
+
+    meta = _read_meta(args)
+
+    if meta is None:
+        return 1
+
+    storage = project.get("storage", default_storage)
+    tags_manager = TagManager(project["path"], storage)
+    tag_input = meta["tags"]
+
+    if isinstance(tag_input, list):
+        tag_input = ", ".join(str(tag) for tag in tag_input)
+
+    if args.type == "image":
+        entry_maker = ImageEntry(project["path"], tags_manager, storage)
+    else:
+        entry_maker = _text_entry(reg, project, args, tags_manager)
+
+        if entry_maker is None:
+            return 1
+
+    if path.isdir(args.image_path):
+        if args.type != "text":
+            display_message("WARN", "Folders are imported as text entries only.")
+            return 1
+
+        saved, errors = entry_maker.capture_folder(
+            args.image_path, tag_input, args.workers, meta["source"], meta["notes"]
+        )
+        _emit(out, {"saved": saved, "failed": [name for name, _ in errors]})
+
+        return 0 if not errors else 1
+
+    from PIL import Image
+
+    try:
+        with Image.open(args.image_path) as img:
+            img.load()
+    except (OSError, ValueError) as e:
+        display_message("WARN", "Image not readable.", f"{e}")
+        return 1
+
+    metadata = (
+        meta["title"] or path.splitext(path.basename(args.image_path))[0],
+        meta["source"] or path.abspath(args.image_path),
+        meta["notes"],
+        tags_manager.resolve_tags(tag_input),
+    )
+
+    if args.type == "image":
+        entry = entry_maker.add_image(img, metadata)
+        entry_maker.close()
+    else:
+        entry = entry_maker.add_image(img, metadata, args.type)
+
+    if entry is None:
+        return 1
+
+    _emit(out, entry)
+    return 0
+
+
+def cmd_watch(reg, project, args, out) -> int:
+    """
+    Create a text entry from every image copied to the clipboard, until Ctrl+C.
+    Metadata comes from the flags, or --meta, else the project's "defaults"; entries are
+    printed as they are saved.
+    """
+    from Tools import TagManager
+
+    meta = _read_meta(args)
+
+    if meta is None:
+        return 1
+
+    defaults = project.get("defaults", {})
+    meta = {key: meta[key] or defaults.get(key, "") for key in meta_keys}
+    tag_input = meta["tags"]
+
+    if isinstance(tag_input, list):
+        tag_input = ", ".join(str(tag) for tag in tag_input)
+
+    tags_manager = TagManager(project["path"], project.get("storage", default_storage))
+    text_entry = _text_entry(reg, project, args, tags_manager)
+
+    if text_entry is None:
+        return 1
+
+    metadata = (
+        meta["title"],
+        meta["source"],
+        meta["notes"],
+        tags_manager.resolve_tags(tag_input),
+    )
+    text_entry.watch_clipboard(metadata, args.interval, lambda entry: _emit(out, entry))
+
+    return 0
+
+
+def cmd_search(project, args, out) -> int:
+    """Full-text search, and or a tag query; prints matching entries, best first."""
+    from Index import ProjectIndex
+    from Tools import research_log
+
+    if not args.text and not args.tags:
+        display_message("WARN", "Give search text, --tags, or both.")
+        return 1
+
+    log_store = open_log(
+        path.join(project["path"], research_log),
+        project.get("storage", default_storage),
+    )
+    index = ProjectIndex(project["path"], log_store)
+    snippets = {}
+
+    if args.text:
+        hits = index.search(args.text, args.limit)
+        snippets = dict(hits)
+        cards = [card for card, _ in hits]
+
+        if args.tags:
+            tagged = set(index.query(args.tags))
+            cards = [card for card in cards if card in tagged]
+    else:
+        cards = index.query(args.tags)[: args.limit]
+
+    entries = dict(index.fetch(cards))
+
+    for card in cards:
+        result = {"card": card, "entry": entries.get(card)}
+
+        if card in snippets:
+            result["snippet"] = snippets[card]
+
+        _emit(out, result)
+
+    return 0
+
+
+def cmd_search_all(reg, args, out) -> int:
+    """Full-text search across every registered project; prints matches, best first."""
+    for result in reg.search_all(args.text, args.tags, args.limit):
+        _emit(out, result)
+
+    return 0
+
+
+def cmd_export(project, args, out) -> int:
+    """Write a project, from any backend, as JSON files in a folder."""
+    from Tools import export_json
+
+    if not export_json(project, args.folder):
+        return 1
+
+    _emit(out, {"exported": path.abspath(args.folder)})
+    return 0
+
+
+def _build_parser():
+    parser = argparse.ArgumentParser(
+        prog="Res Tool", description="Research Tool; headless commands."
+    )
+    parser.add_argument(
+        "--app-parent", default="", help="Folder holding user_data; the app folder."
+    )
+    parser.add_argument(
+        "--metrics", action="store_true", help="Record per-stage timings."
+    )
+    parser.add_argument(
+        "--tesseract", default="", help="Tesseract executable; else from paths.csv."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add-project", help="Register a project folder.")
+    add.add_argument("name")
+    add.add_argument("path")
+    add.add_argument("--lang", default="eng", help='eg "fra+eng+deu".')
+    add.add_argument("--storage", choices=storage_types, default=default_storage)
+
+    commands.add_parser("list", help="List registered projects.")
+
+    ingest = commands.add_parser(
+        "ingest", help="Create entries from an image, or a folder of images."
+    )
+    ingest.add_argument("project", help="Project number, name, or path.")
+    ingest.add_argument(
+        "image_path", metavar="image", help="Image file, or folder of images."
+    )
+    ingest.add_argument("--type", choices=entry_types, default="text")
+
+    _add_meta_args(ingest)
+    _add_ocr_args(ingest)
+    ingest.add_argument("--workers", type=int, help="Processes, for a folder.")
+
+    watch = commands.add_parser(
+        "watch", help="Create text entries from clipboard images, until Ctrl+C."
+    )
+    watch.add_argument("project", help="Project number, name, or path.")
+    _add_meta_args(watch)
+    _add_ocr_args(watch)
+    watch.add_argument("--interval", type=float, help="Seconds between polls.")
+
+    search = commands.add_parser("search", help="Search a project's entries.")
+    search.add_argument("project", help="Project number, name, or path.")
+    search.add_argument("text", nargs="?", default="", help="Full-text query.")
+    search.add_argument("--tags", default="", help='Tag query; eg "LAW NOT <1900>".')
+    search.add_argument("--limit", type=int, default=50)
+
+    search_all = commands.add_parser(
+        "search-all", help="Search the entries of every project."
+    )
+    search_all.add_argument("text", help="Full-text query.")
+    search_all.add_argument("--tags", default="", help="Tag query.")
+    search_all.add_argument("--limit", type=int, default=50)
+
+    export = commands.add_parser("export", help="Write a project as JSON files.")
+    export.add_argument("project", help="Project number, name, or path.")
+    export.add_argument("folder")
+
+    return parser
+
+
+def _add_meta_args(parser) -> None:
+    parser.add_argument(
+        "--meta", help='JSON object of title, source, notes, and tags; "-" for stdin.'
+    )
+
+    for key in meta_keys:
+        parser.add_argument(f"--{key}")
+
+
+def _add_ocr_args(parser) -> None:
+    parser.add_argument("--lang", help="Overrides the project's languages.")
+    parser.add_argument("--psm", type=int)
+    parser.add_argument("--oem", type=int)
+    parser.add_argument(
+        "--detect", action="store_true", default=None, help="Detect the language."
+    )
+    parser.add_argument(
+        "--refine",
+        action="store_true",
+        default=None,
+        help="OCR low confidence lines again.",
+    )
+
+
+def _text_entry(reg, project, args, tags_manager):
+    """TextEntry of a project, with OCR flags over the project's settings; None if no OCR engine."""
+    from Tools import TextEntry
+
+    ocr_manager = _ocr_manager(reg, args)
+
+    if ocr_manager is None:
+        return None
+
+    ocr = {key: getattr(args, key) for key in ["psm", "oem", "detect", "refine"]}
+
+    return TextEntry(
+        project["path"],
+        tags_manager,
+        ocr_manager,
+        project.get("storage", default_storage),
+        project.get("preprocess"),
+        args.lang or project.get("lang", "eng"),
+        {
+            **project.get("ocr", {}),
+            **{key: value for key, value in ocr.items() if value is not None},
+        },
+        project.get("cleanup"),
+    )
+
+
+def _ocr_manager(reg, args):
+    """
+    OCR engine from --tesseract, paths.csv, or the PATH; never prompts for a location.
+    :return: None if the executable is not found.
+    """
+    from Tools import OCRManager, paths_csv
+
+    tesseract_path = args.tesseract
+
+    if not tesseract_path:
+        try:
+            with open(
+                path.join(reg.user_data_path, paths_csv), encoding="utf-8"
+            ) as file:
+                known = [path.expanduser(row[0]) for row in csv.reader(file) if row]
+        except OSError:
+            known = []
+
+        found = [file_path for file_path in known if path.isfile(file_path)]
+        tesseract_path = found[0] if found else shutil.which("tesseract") or ""
+
+    if not path.isfile(tesseract_path):
+        display_message("WARN", "Tesseract OCR engine not found; use --tesseract.")
+        return None
+
+    return OCRManager(reg.user_data_path, tesseract_path=tesseract_path)
+
+
+def _find_project(reg, ref):
+    """The project matching a number, name, or folder path; None if not found."""
+    if ref.isdigit() and 1 <= int(ref) <= len(reg.projects):
+        return reg.projects[int(ref) - 1]
+
+    for project in reg.projects:
+        if project["name"] == ref:
+            return project
+
+    return reg.by_path.get(_registry_path(ref))
+
+
+def _registry_path(folder_path) -> str:
+    """A folder path, as stored in registry.json."""
+    return path.abspath(folder_path).replace(os.sep, "/")
+
+
+def _read_meta(args):
+    """Entry metadata from --meta JSON, then the flags; None if the JSON is invalid."""
+    meta = dict.fromkeys(meta_keys, "")
+
+    if args.meta:
+        try:
+            text = sys.stdin.read() if args.meta == "-" else args.meta
+            stored = json.loads(text)
+        except json.decoder.JSONDecodeError as e:
+            display_message("WARN", "Invalid metadata JSON.", f"{e}")
+            return None
+
+        if not isinstance(stored, dict):
+            display_message("WARN", "Metadata JSON must be an object.")
+            return None
+
+        meta.update({key: stored[key] for key in meta_keys if key in stored})
+
+    meta.update(
+        {key: getattr(args, key) for key in meta_keys if getattr(args, key) is not None}
+    )
+
+    return meta
+
+
+def _emit(out, record) -> None:
+    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    out.flush()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+from io import BytesIO
+
+from Metrics import span
+
+# Module variables :
+watch_interval = 0.5  # Seconds between clipboard polls, in watch mode
+# Commands printing the clipboard image as PNG; used where the OS has no change counter
+paste_commands = [
+    ["wl-paste", "--no-newline", "--type", "image/png"],  # Wayland
+    ["xclip", "-selection", "clipboard", "-target", "image/png", "-out"],  # X11
+]
+
+
+class ClipboardWatcher:
+    """
+    Detect new images copied to the clipboard, without decoding the clipboard on every poll.
+    Windows, and macOS (with pyobjc) expose a change counter; elsewhere the raw PNG bytes
+    are hashed, and only decoded when the hash changes.
+    """
+
+    def __init__(self) -> None:
+        self.counter = _change_counter()
+        self.paste = None if self.counter else _paste_command()
+        self.last, _ = self._read()  # What is on the clipboard already is not captured.
+
+    def poll(self):
+        """Returns the image copied since the last poll; None if unchanged, or not an image."""
+        mark, content = self._read()
+
+        if mark == self.last:
+            return None
+
+        self.last = mark
+
+        if self.counter:
+            with span("watch.grab"):
+                return _grab_image()
+
+        if self.paste:
+            return _open_image(content) if content else None
+
+        return content  # Already decoded.
+
+    def _read(self) -> tuple:
+        """A cheap token that changes with the clipboard, and what was read to make it."""
+        if self.counter:
+            return self.counter(), None
+
+        if self.paste:
+            data = _paste_bytes(self.paste)
+            mark = hashlib.blake2b(data, digest_size=16).digest() if data else None
+
+            return mark, data
+
+        # No counter, or paste tool; the image is decoded, and hashed on every poll.
+        img = _grab_image()
+
+        if img is None:
+            return None, None
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{img.mode}:{img.size}:".encode())
+        digest.update(img.tobytes())
+
+        return digest.digest(), img
+
+
+def _change_counter():
+    """Returns a function giving the clipboard's change count; None if the OS has none."""
+    if sys.platform == "win32":
+        import ctypes
+
+        return ctypes.windll.user32.GetClipboardSequenceNumber
+
+    if sys.platform == "darwin":
+        try:
+            from AppKit import NSPasteboard  # Optional dependency; pyobjc.
+
+            return NSPasteboard.generalPasteboard().changeCount
+        except ImportError:
+            pass
+
+    return None
+
+
+def _paste_command():
+    """The first installed command of paste_commands, for the running display server."""
+    wayland = bool(os.environ.get("WAYLAND_DISPLAY"))
+
+    for command in paste_commands:
+        if (command[0] == "wl-paste") == wayland and shutil.which(command[0]):
+            return command
+
+    return None
+
+
+def _paste_bytes(command) -> bytes:
+    """Clipboard image as PNG bytes; b"" if the clipboard holds no image."""
+    try:
+        result = subprocess.run(command, capture_output=True, timeout=5)
+    except (OSError, subprocess.TimeoutExpired):
+        return b""
+
+    return result.stdout if result.returncode == 0 else b""
+
+
+def _open_image(data):
+    from PIL import Image
+
+    try:
+        img = Image.open(BytesIO(data))
+        img.load()
+        return img
+    except (OSError, ValueError):
+        return None
+
+
+def _grab_image():
+    from PIL import Image, ImageGrab
+
+    try:
+        img = ImageGrab.grabclipboard()
+    except Exception:
+        return None  # No clipboard access; eg no display.
+
+    return img if isinstance(img, Image.Image) else None
@@ -0,0 +1,301 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from os import path
+
+from lib import display_message
+
+# Module variables :
+engine_types = ["auto", "tesserocr", "pytesseract"]  # OCR backends of OCRManager
+cache_max_bytes = 64 * 1024 * 1024  # Size limit of the OCR cache
+max_apis = 4  # Idle tesserocr API handles kept loaded; least recently used are ended
+# Fields of each word returned by image_to_data
+word_keys = [
+    "text",
+    "conf",
+    "left",
+    "top",
+    "width",
+    "height",
+    "block_num",
+    "par_num",
+    "line_num",
+]
+
+
+class PytesseractEngine:
+    """Runs the tesseract executable for every image; language data is reloaded each call."""
+
+    name = "pytesseract"
+
+    def __init__(self, tesseract_path) -> None:
+        import pytesseract
+
+        self.pytesseract = pytesseract
+        pytesseract.pytesseract.tesseract_cmd = tesseract_path
+
+    def image_to_string(self, img, lang="eng", psm=3, oem=3) -> str:
+        return self.pytesseract.image_to_string(
+            img, lang=lang, config=f"--oem {oem} --psm {psm}"
+        )
+
+    def image_to_data(self, img, lang="eng", psm=3, oem=3) -> list:
+        """Returns the recognised words, with their confidence, box, and position in the layout."""
+        data = self.pytesseract.image_to_data(
+            img,
+            lang=lang,
+            config=f"--oem {oem} --psm {psm}",
+            output_type=self.pytesseract.Output.DICT,
+        )
+
+        return [
+            {**{key: data[key][n] for key in word_keys}, "conf": float(data["conf"][n])}
+            for n in range(len(data["text"]))
+            if data["level"][n] == 5  # Word level
+        ]
+
+    def detect_script(self, img) -> str:
+        """Returns the writing system of the text; eg "Latin". Needs osd.traineddata."""
+        osd = self.pytesseract.image_to_osd(
+            img, config="--psm 0", output_type=self.pytesseract.Output.DICT
+        )
+
+        return osd.get("script", "")
+
+    def warm(self, lang, oem=3) -> None:
+        """Each call runs a new process; language data is only kept in the OS file cache."""
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class TesserocrEngine:
+    """
+    Calls the Tesseract C-API in process, through tesserocr.
+    API handles are kept per language and engine setting, so language data is loaded once.
+    A handle serves one thread at a time; threads calling at once each get their own.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, tesseract_path) -> None:
+        import tesserocr  # Optional dependency; raises ImportError if not installed.
+
+        self.tesserocr = tesserocr
+        self.tessdata_path = _tessdata_path(tesseract_path)
+        # (lang, oem) -> idle PyTessBaseAPIs; most recent last
+        self.apis = OrderedDict()
+        self._lock = threading.Lock()  # Guards apis; OCR itself runs outside it.
+
+    def image_to_string(self, img, lang="eng", psm=3, oem=3) -> str:
+        with self._api(lang, oem) as api:
+            api.SetPageSegMode(psm)
+            api.SetImage(img)
+
+            return api.GetUTF8Text()
+
+    def image_to_data(self, img, lang="eng", psm=3, oem=3) -> list:
+        """Returns the recognised words, with their confidence, box, and position in the layout."""
+        ril = self.tesserocr.RIL
+        words = []
+        block = par = line = 0
+
+        with self._api(lang, oem) as api:
+            api.SetPageSegMode(psm)
+            api.SetImage(img)
+            api.Recognize()
+
+            for word in self.tesserocr.iterate_level(api.GetIterator(), ril.WORD):
+                if word.IsAtBeginningOf(ril.BLOCK):
+                    block, par, line = block + 1, 0, 0
+                if word.IsAtBeginningOf(ril.PARA):
+                    par, line = par + 1, 0
+                if word.IsAtBeginningOf(ril.TEXTLINE):
+                    line += 1
+
+                box = word.BoundingBox(ril.WORD)
+
+                if box is None:
+                    continue
+
+                left, top, right, bottom = box
+                words.append(
+                    {
+                        "text": word.GetUTF8Text(ril.WORD),
+                        "conf": word.Confidence(ril.WORD),
+                        "left": left,
+                        "top": top,
+                        "width": right - left,
+                        "height": bottom - top,
+                        "block_num": block,
+                        "par_num": par,
+                        "line_num": line,
+                    }
+                )
+
+        return words
+
+    def detect_script(self, img) -> str:
+        """Returns the writing system of the text; eg "Latin". Needs osd.traineddata."""
+        with self._api("osd", 0) as api:  # OSD uses the legacy engine.
+            api.SetPageSegMode(self.tesserocr.PSM.OSD_ONLY)
+            api.SetImage(img)
+            osd = api.DetectOrientationScript()
+
+        return (osd or {}).get("script_name", "")
+
+    def warm(self, lang, oem=3) -> None:
+        """Load the language data now, so the next capture does not wait on it."""
+        with self._api(lang, oem):
+            pass
+
+    def close(self) -> None:
+        with self._lock:
+            for apis in self.apis.values():
+                for api in apis:
+                    api.End()
+
+            self.apis = OrderedDict()
+
+    @contextmanager
+    def _api(self, lang, oem):
+        """An idle API handle for the setting, or a new one; kept for reuse once released."""
+        key = (lang, oem)
+
+        with self._lock:
+            idle = self.apis.get(key)
+            api = idle.pop() if idle else None
+
+            if idle == []:
+                del self.apis[key]
+
+        if api is None:
+            kwargs = {"lang": lang, "oem": self.tesserocr.OEM(oem)}
+
+            if self.tessdata_path:
+                kwargs["path"] = self.tessdata_path
+
+            api = self.tesserocr.PyTessBaseAPI(**kwargs)
+
+        try:
+            yield api
+        finally:
+            with self._lock:
+                self.apis.setdefault(key, []).append(api)
+                self.apis.move_to_end(key)
+
+                # Each model holds tens of MB; combined settings, eg "fra+eng", add up.
+                while sum(len(apis) for apis in self.apis.values()) > max_apis:
+                    oldest = next(iter(self.apis))
+                    self.apis[oldest].pop(0).End()
+
+                    if not self.apis[oldest]:
+                        del self.apis[oldest]
+
+
+def load_engine(tesseract_path, engine="auto", quiet=False):
+    """
+    Returns the OCR backend; the in-process engine if available, else the tesseract executable.
+    :param engine: One of engine_types.
+    :param quiet: Skip messages; used by batch import worker processes.
+    """
+    if engine in ["auto", "tesserocr"]:
+        try:
+            ocr_engine = TesserocrEngine(tesseract_path)
+
+            if not quiet:
+                display_message("INFO", "OCR backend : tesserocr (persistent).")
+            return ocr_engine
+
+        except Exception as e:
+            if engine == "tesserocr" and not quiet:
+                display_message("WARN", "tesserocr unavailable.", f"{e}")
+
+    if not quiet:
+        display_message("INFO", "OCR backend : pytesseract.")
+    return PytesseractEngine(tesseract_path)
+
+
+def _tessdata_path(tesseract_path) -> str:
+    """Language data installed beside the executable; Windows installs keep it there."""
+    tessdata = path.join(path.dirname(tesseract_path or ""), "tessdata")
+
+    return tessdata if path.isdir(tessdata) else ""
+
+
+class OCRCache:
+    """
+    OCR text of previously processed images, keyed by a hash of the pixels, and OCR settings.
+    Kept in SQLite, and bounded in size; least recently used entries are evicted first.
+    """
+
+    def __init__(self, db_path, max_bytes=cache_max_bytes) -> None:
+        self.max_bytes = max_bytes
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")  # Batch import workers share it.
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache "
+            "(key TEXT PRIMARY KEY, text TEXT, size INTEGER, used REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS cache_used ON cache (used)")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(img, **settings) -> str:
+        """Hash of the image pixels, and every setting that changes the OCR output."""
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{img.mode}:{img.size}:".encode())
+        digest.update(img.tobytes())
+        digest.update(json.dumps(settings, sort_keys=True).encode())
+
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Returns the cached text, or bytes, as put; or None."""
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT text FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row:
+                self.conn.execute(
+                    "UPDATE cache SET used = ? WHERE key = ?", (time.time(), key)
+                )
+
+        return row[0] if row else None
+
+    def put(self, key, text) -> None:
+        """:param text: OCR text, or bytes; eg a serialised Layout."""
+        size = len(text if isinstance(text, bytes) else text.encode("utf-8")) + len(key)
+
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache (key, text, size, used) VALUES (?, ?, ?, ?)",
+                (key, text, size, time.time()),
+            )
+
+            total = self.conn.execute("SELECT total(size) FROM cache").fetchone()[0]
+
+            # Evict least recently used entries, down to the size limit.
+            if total > self.max_bytes:
+                stale = self.conn.execute(
+                    "SELECT key, size FROM cache ORDER BY used"
+                ).fetchall()
+                evict = []
+
+                for stale_key, stale_size in stale:
+                    if total <= self.max_bytes:
+                        break
+                    evict.append((stale_key,))
+                    total -= stale_size
+
+                self.conn.executemany("DELETE FROM cache WHERE key = ?", evict)
+
+    def clear(self) -> None:
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM cache")
@@ -0,0 +1,556 @@
+import json
+import re
+import sqlite3
+import threading
+from os import path
+
+from lib import display_message
+from Storage import JsonlLog, default_storage, open_log, _load_log, _save_to_log
+
+# Module variables :
+tag_index_name = "tags_index.json"  # Tag IDs and usage counts; kept beside tags.json
+index_db = "index.db"  # SQLite file holding the search indexes of a project
+# Bump when the index tables change; older index.db files are rebuilt.
+index_version = 2
+
+# Tokens of a tag query; parentheses, numeric ranges "<1800-1850>", and words.
+_query_token = re.compile(r"\(|\)|<\s*\d+\s*-\s*\d+\s*>|[^\s()]+")
+_range_tag = re.compile(r"<\s*(\d+)\s*-\s*(\d+)\s*>")
+_numeric_tag = re.compile(r"<(\d+)>")
+_search_term = re.compile(r"\w+")  # Words of a search, for the streaming scan fallback
+
+
+class TagIndex:
+    """
+    Maps tag names to stable, user-facing IDs, and counts the entries using each tag.
+    IDs no longer depend on positions in tags.json; reordering the list keeps them intact.
+    """
+
+    def __init__(self, tags_path, tags_list, log_path) -> None:
+        self.index_path = path.join(path.dirname(tags_path), tag_index_name)
+        self.ids = {}  # name -> id
+        self.names = {}  # id -> name
+        self.counts = {}  # id -> number of entries using the tag
+        self.next_id = 1
+
+        stored = _load_log(self.index_path)
+
+        if stored:
+            self.next_id = stored.get("next_id", 1)
+
+            for tag_id, item in stored.get("tags", {}).items():
+                self._set(int(tag_id), item["name"], item.get("count", 0))
+
+        # Tags added to tags.json outside the index; legacy IDs follow list positions.
+        missing = [name for name in tags_list if name not in self.ids]
+
+        if missing:
+            if not stored:
+                for position, name in enumerate(tags_list, 1):
+                    self._set(position, name, 0)
+
+                self.next_id = len(tags_list) + 1
+                self._count_usage(log_path)
+            else:
+                for name in missing:
+                    self.add(name)
+
+            self.save()
+
+    def __contains__(self, name) -> bool:
+        return name in self.ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def name(self, tag_id):
+        """Returns the tag name for an ID, or None if not found."""
+        return self.names.get(tag_id)
+
+    def items(self) -> list:
+        """Returns (id, name, count) of all tags, in order of ID."""
+        return [
+            (tag_id, self.names[tag_id], self.counts[tag_id])
+            for tag_id in sorted(self.names)
+        ]
+
+    def add(self, name) -> int:
+        """Register a new tag, and return its ID."""
+        if name in self.ids:
+            return self.ids[name]
+
+        tag_id = self.next_id
+        self._set(tag_id, name, 0)
+        self.next_id += 1
+
+        return tag_id
+
+    def record_usage(self, tag_names) -> None:
+        for name in tag_names:
+            tag_id = self.ids.get(name) or self.add(name)
+            self.counts[tag_id] += 1
+
+    def replace(self, tag_items) -> bool:
+        """Overwrite the index with (id, name, count) items; used when migrating storage."""
+        self.ids, self.names, self.counts = {}, {}, {}
+
+        for tag_id, name, count in tag_items:
+            self._set(tag_id, name, count)
+
+        self.next_id = max(self.names, default=0) + 1
+        return self.save()
+
+    def save(self) -> bool:
+        data = {
+            "next_id": self.next_id,
+            "tags": {
+                str(tag_id): {"name": name, "count": count}
+                for tag_id, name, count in self.items()
+            },
+        }
+
+        return _save_to_log(self.index_path, data, quiet=True)
+
+    def _set(self, tag_id, name, count) -> None:
+        self.ids[name] = tag_id
+        self.names[tag_id] = name
+        self.counts[tag_id] = count
+
+    def _count_usage(self, log_path) -> None:
+        """Count tag usage over the existing research log; either backend."""
+        for entry in JsonlLog(log_path).iter():
+            for name in entry.get("tags", []):
+                if name in self.ids:
+                    self.counts[self.ids[name]] += 1
+
+
+class SqliteTagIndex(TagIndex):
+    """Tag library of a SQLite project store; tags are written to research.db as they are added."""
+
+    def __init__(self, store) -> None:
+        self.store = store
+        self.ids, self.names, self.counts = {}, {}, {}
+
+        for tag_id, name, count in store.tag_items():
+            self._set(tag_id, name, count)
+
+        self.next_id = max(self.names, default=0) + 1
+
+    def add(self, name) -> int:
+        if name in self.ids:
+            return self.ids[name]
+
+        tag_id = self.store.add_tag(name)
+        self._set(tag_id, name, 0)
+        self.next_id = max(self.next_id, tag_id + 1)
+
+        return tag_id
+
+    def save(self) -> bool:
+        """Counts come from card_tags; nothing else to write."""
+        return True
+
+
+class ProjectIndex:
+    """
+    On-disk indexes of a project's research log, kept in index.db.
+    Entries are identified by their card number; their position in the log, from 0.
+    """
+
+    def __init__(self, project_path, log_store) -> None:
+        self.db_path = path.join(project_path, index_db)
+        self.log_store = log_store
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS card_tags (
+                tag TEXT NOT NULL, card INTEGER NOT NULL, num INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS card_tags_tag ON card_tags (tag);
+            CREATE INDEX IF NOT EXISTS card_tags_num ON card_tags (num)
+                WHERE num IS NOT NULL;
+            """)
+
+        # Full-text index of the entries' text fields; needs SQLite built with FTS5.
+        try:
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS cards_fts USING fts5 "
+                "(title, notes, source, content, tokenize='unicode61 remove_diacritics 2')"
+            )
+            self.has_fts = True
+        except sqlite3.OperationalError as e:
+            display_message("WARN", "Full-text search unavailable.", f"{e}")
+            self.has_fts = False
+
+        # Indexes made before a table existed, eg cards_fts, hold a matching signature.
+        if (
+            self._get_meta("version") != index_version
+            or self._get_meta("signature") != log_store.signature()
+        ):
+            self.rebuild()
+
+    def __len__(self) -> int:
+        return self._get_meta("count") or 0
+
+    def rebuild(self) -> None:
+        """Re-index every entry of the research log."""
+        with self.conn:
+            self.conn.execute("DELETE FROM card_tags")
+
+            if self.has_fts:
+                self.conn.execute("DELETE FROM cards_fts")
+
+            self._set_meta("count", 0)
+            self._set_meta("version", index_version)
+
+        self.add(self.log_store.iter())
+        display_message("INFO", f"Project index rebuilt; {len(self)} entries.")
+
+    def add(self, entries) -> None:
+        """Index entries just appended to the log."""
+        count = len(self)
+
+        with self.conn:
+            for entry in entries:
+                self.conn.executemany(
+                    "INSERT INTO card_tags (tag, card, num) VALUES (?, ?, ?)",
+                    [
+                        (tag, count, _tag_number(tag))
+                        for tag in dict.fromkeys(entry.get("tags", []))
+                    ],
+                )
+
+                if self.has_fts:
+                    self.conn.execute(
+                        "INSERT INTO cards_fts "
+                        "(rowid, title, notes, source, content) VALUES (?, ?, ?, ?, ?)",
+                        (
+                            count,
+                            entry.get("title", ""),
+                            entry.get("notes", ""),
+                            entry.get("source", ""),
+                            _content_text(entry.get("content")),
+                        ),
+                    )
+
+                count += 1
+
+            self._set_meta("count", count)
+            self._set_meta("signature", self.log_store.signature())
+
+    def query(self, expression) -> list:
+        """
+        Returns card numbers of entries matching a tag query.
+        Tags combine with AND, OR, NOT, and parentheses; adjacent tags imply AND.
+        Numeric tags match a range when written as "<1800-1850>".
+        Ex : HISTORY AND (ECONOMICS OR LAW) NOT <1900-1999>
+        """
+        tokens = _query_token.findall(expression)
+
+        try:
+            cards, pos = self._parse_or(tokens, 0)
+
+            if pos != len(tokens):
+                raise ValueError(f'Unexpected "{tokens[pos]}".')
+
+        except ValueError as e:
+            display_message("WARN", "Invalid tag query.", f"{e}")
+            return []
+
+        return sorted(cards)
+
+    def search(self, text, limit=50) -> list:
+        """
+        Returns (card number, snippet) of entries whose title, notes, source or content match.
+        Supports phrases and prefixes; eg '"steam power" industr*'.
+        Limit a term to a field with a colon; eg 'title:revolution'.
+        """
+        return [(card, snippet) for card, snippet, _ in self.search_ranked(text, limit)]
+
+    def search_ranked(self, text, limit=50) -> list:
+        """As search, with the BM25 score of each match; higher is better."""
+        if not self.has_fts:
+            display_message("WARN", "Full-text search unavailable.")
+            return []
+
+        try:
+            rows = self.conn.execute(
+                "SELECT rowid, snippet(cards_fts, -1, '[', ']', '...', 12), -rank "
+                "FROM cards_fts WHERE cards_fts MATCH ? ORDER BY rank LIMIT ?",
+                (text, limit),
+            )
+            return rows.fetchall()
+
+        except sqlite3.OperationalError as e:
+            display_message("WARN", "Invalid search query.", f"{e}")
+            return []
+
+    def fetch(self, card_numbers):
+        """Yield (card number, entry) for the given cards; reads the log only as far as needed."""
+        wanted = set(card_numbers)
+
+        if not wanted:
+            return
+
+        last = max(wanted)
+
+        for number, entry in enumerate(self.log_store.iter()):
+            if number in wanted:
+                yield number, entry
+
+            if number >= last:
+                return
+
+    def filter(self, expression):
+        """Yield (card number, entry) of entries matching a tag query."""
+        return self.fetch(self.query(expression))
+
+    def _parse_or(self, tokens, pos):
+        cards, pos = self._parse_and(tokens, pos)
+
+        while pos < len(tokens) and tokens[pos].upper() == "OR":
+            other, pos = self._parse_and(tokens, pos + 1)
+            cards |= other
+
+        return cards, pos
+
+    def _parse_and(self, tokens, pos):
+        cards, pos = self._parse_not(tokens, pos)
+
+        while pos < len(tokens) and tokens[pos] != ")" and tokens[pos].upper() != "OR":
+            if tokens[pos].upper() == "AND":
+                pos += 1
+
+            other, pos = self._parse_not(tokens, pos)
+            cards &= other
+
+        return cards, pos
+
+    def _parse_not(self, tokens, pos):
+        if pos >= len(tokens):
+            raise ValueError("Query ends unexpectedly.")
+
+        token = tokens[pos]
+
+        if token.upper() == "NOT":
+            cards, pos = self._parse_not(tokens, pos + 1)
+            return set(range(len(self))) - cards, pos
+
+        if token == "(":
+            cards, pos = self._parse_or(tokens, pos + 1)
+
+            if pos >= len(tokens) or tokens[pos] != ")":
+                raise ValueError("Missing closing parenthesis.")
+
+            return cards, pos + 1
+
+        if token == ")" or token.upper() in ["AND", "OR"]:
+            raise ValueError(f'Unexpected "{token}".')
+
+        return self._tag_cards(token), pos + 1
+
+    def _tag_cards(self, token) -> set:
+        numeric_range = _range_tag.fullmatch(token)
+
+        if numeric_range:
+            low, high = sorted(int(n) for n in numeric_range.groups())
+            rows = self.conn.execute(
+                "SELECT card FROM card_tags WHERE num BETWEEN ? AND ?", (low, high)
+            )
+        else:
+            rows = self.conn.execute(
+                "SELECT card FROM card_tags WHERE tag = ?", (token.upper(),)
+            )
+
+        return {row[0] for row in rows}
+
+    def _get_meta(self, key):
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+
+        return json.loads(row[0]) if row else None
+
+    def _set_meta(self, key, value) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (key, json.dumps(value)),
+        )
+
+
+class GlobalSearch:
+    """
+    Full-text search over every project in the registry; projects are searched concurrently.
+    Index handles are kept between searches, and refreshed only when a log has changed.
+    """
+
+    def __init__(self, log_name, workers=8) -> None:
+        """:param log_name: File name of the research log in each project folder."""
+        self.log_name = log_name
+        self.workers = workers
+        # project path -> (storage, log store, index or None, signature)
+        self.handles = {}
+        # project path -> lock held while its handle is opened, or refreshed
+        self.locks = {}
+        self._lock = threading.Lock()  # Guards locks
+
+    def search(self, projects, text, tags="", limit=50) -> list:
+        """
+        Returns matches from all projects, best first; each a dict of project, card,
+        score, snippet, and entry. Projects without a usable index are scanned instead.
+        :param tags: Optional tag query; only entries matching it are returned.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        projects = [project for project in projects if path.isdir(project["path"])]
+
+        if not projects:
+            return []
+
+        with ThreadPoolExecutor(min(self.workers, len(projects))) as pool:
+            found = pool.map(
+                lambda project: self._search_project(project, text, tags, limit),
+                projects,
+            )
+            results = [result for matches in found for result in _normalise(matches)]
+
+        results.sort(key=lambda result: result["score"], reverse=True)
+
+        return results[:limit]
+
+    def _search_project(self, project, text, tags, limit) -> list:
+        try:
+            log_store, index = self._handle(project)
+
+            if index is None or not index.has_fts:
+                return self._scan(project, log_store, text, tags, limit)
+
+            hits = index.search_ranked(text, limit)
+
+            if tags:
+                tagged = set(index.query(tags))
+                hits = [hit for hit in hits if hit[0] in tagged]
+
+            entries = dict(index.fetch(card for card, _, _ in hits))
+
+            return [
+                {
+                    "project": project["name"],
+                    "card": card,
+                    "score": score,
+                    "snippet": snippet,
+                    "entry": entries.get(card),
+                }
+                for card, snippet, score in hits
+            ]
+
+        except Exception as e:
+            display_message("WARN", f'Search of "{project["name"]}" failed.', f"{e}")
+            return []
+
+    def _handle(self, project) -> tuple:
+        """The project's log, and index; reopened only if the storage, or log changed."""
+        storage = project.get("storage", default_storage)
+
+        with self._lock:
+            lock = self.locks.setdefault(project["path"], threading.Lock())
+
+        # Other projects are opened, and rebuilt meanwhile; only this one waits.
+        with lock:
+            cached = self.handles.get(project["path"])
+
+            if cached and cached[0] == storage:
+                _, log_store, index, signature = cached
+            else:
+                log_store = open_log(path.join(project["path"], self.log_name), storage)
+                index, signature = None, None
+
+            current = log_store.signature()
+
+            if index is None or current != signature:
+                try:
+                    if index is None:
+                        index = ProjectIndex(project["path"], log_store)
+                    elif index._get_meta("signature") != current:
+                        index.rebuild()  # Changed by another instance, or by hand.
+
+                except sqlite3.Error as e:  # eg a read-only project folder.
+                    display_message("WARN", "Project index unavailable.", f"{e}")
+                    index = None
+
+            self.handles[project["path"]] = (storage, log_store, index, current)
+
+        return log_store, index
+
+    @staticmethod
+    def _scan(project, log_store, text, tags, limit) -> list:
+        """
+        Stream the log, and count the search words in each entry; no index needed.
+        Tags in the query must all be present; operators, and ranges are not supported.
+        """
+        terms = [term.lower() for term in _search_term.findall(text)]
+        required = {
+            token.upper()
+            for token in _query_token.findall(tags)
+            if token not in ["(", ")"] and token.upper() not in ["AND", "OR", "NOT"]
+        }
+        matches = []
+
+        if not terms:
+            return []
+
+        for card, entry in enumerate(log_store.iter()):
+            if not required <= set(entry.get("tags", [])):
+                continue
+
+            fields = [entry.get(key) or "" for key in ["title", "notes", "source"]]
+            body = " ".join([*fields, _content_text(entry.get("content"))]).lower()
+
+            if not all(term in body for term in terms):
+                continue
+
+            start = body.find(terms[0])
+            snippet = body[max(0, start - 40) : start + 60].replace("\n", " ")
+            matches.append(
+                {
+                    "project": project["name"],
+                    "card": card,
+                    "score": float(sum(body.count(term) for term in terms)),
+                    "snippet": f"...{snippet}...",
+                    "entry": entry,
+                }
+            )
+
+        matches.sort(key=lambda match: match["score"], reverse=True)
+
+        return matches[:limit]
+
+
+def _normalise(matches) -> list:
+    """
+    Scale the scores of one project's matches to 0-1, relative to its best match.
+    BM25 scores, and the term counts of a scan are not comparable between projects.
+    """
+    top = max((match["score"] for match in matches), default=0)
+
+    for match in matches:
+        match["score"] = match["score"] / top if top > 0 else 0.0
+
+    return matches
+
+
+def _content_text(content) -> str:
+    """Flatten entry content to text; table content is a list of rows."""
+    if isinstance(content, list):
+        return "\n".join(
+            " ".join(str(cell) for cell in row) if isinstance(row, list) else str(row)
+            for row in content
+        )
+
+    return str(content or "")
+
+
+def _tag_number(tag):
+    """Returns the number of a numeric tag, eg "<1812>", or None."""
+    match = _numeric_tag.fullmatch(tag)
+    return int(match.group(1)) if match else None
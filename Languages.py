@@ -0,0 +1,72 @@
+import re
+
+# Module variables :
+# Tesseract language codes by writing system, as named by Tesseract's script detection (OSD)
+script_langs = {
+    "Latin": ["eng", "fra", "deu", "spa", "ita", "por", "nld", "lat", "pol", "swe"],
+    "Cyrillic": ["rus", "ukr", "bul", "srp", "bel"],
+    "Greek": ["ell", "grc"],
+    "Arabic": ["ara", "fas", "urd"],
+    "Hebrew": ["heb"],
+    "Devanagari": ["hin", "mar", "nep", "san"],
+    "Han": ["chi_sim", "chi_tra"],
+    "Japanese": ["jpn"],
+    "Hangul": ["kor"],
+    "Thai": ["tha"],
+}
+
+# Frequent short words; enough to tell languages of the same script apart in a paragraph
+stop_words = {
+    "eng": "the of and to in is that for it with as was on are by this be from".split(),
+    "fra": "le la les de des et est une dans que qui pour pas sur du au avec".split(),
+    "deu": "der die das und ist nicht ein eine zu den mit von sich auf des dem".split(),
+    "spa": "el la los las de que y en un una es por con para del se".split(),
+    "ita": "il la di che e un una per non sono del della con gli le si".split(),
+    "por": "o a os as de que e um uma para com não do da em se".split(),
+    "nld": "de het een en van is dat niet op te voor met zijn die".split(),
+    "lat": "et in est non ad cum quod ut sed qui quae enim esse".split(),
+}
+min_votes = 3  # Stop words needed before a language is chosen from text
+
+_word = re.compile(r"[^\W\d_]+")
+_stop_sets = {code: set(words) for code, words in stop_words.items()}
+
+
+def split_langs(lang) -> list:
+    """Language codes of a Tesseract setting; eg "fra+eng+deu"."""
+    return [code for code in lang.split("+") if code]
+
+
+def langs_for_script(langs, script) -> list:
+    """
+    Languages of a project written in the detected script; all of them if none match.
+    :param script: Script name from OSD; eg "Latin", or "" if detection failed.
+    """
+    matched = [code for code in langs if code in script_langs.get(script, [])]
+
+    return matched or langs
+
+
+def guess_lang(text, langs) -> str:
+    """
+    Returns the language of OCR'd text, by stop word counts; "" when undecided.
+    :param langs: Candidate languages; only those with stop word lists can be told apart.
+    """
+    words = _word.findall(text.lower())
+    votes = {
+        code: sum(1 for word in words if word in _stop_sets[code])
+        for code in langs
+        if code in _stop_sets
+    }
+
+    if not votes:
+        return ""
+
+    ranked = sorted(votes.items(), key=lambda item: item[1], reverse=True)
+    best, count = ranked[0]
+
+    # Needs a clear lead; mixed language snips are left to the combined models.
+    if count < min_votes or (len(ranked) > 1 and ranked[1][1] * 2 > count):
+        return ""
+
+    return best
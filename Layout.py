@@ -0,0 +1,193 @@
+import json
+import sys
+from array import array
+from itertools import groupby
+
+# Module variables :
+layout_version = 1  # Bump when the sidecar format changes
+layout_ext = ".lay"  # Sidecar file of a text entry; word boxes, and confidences
+# Numeric fields of each word; stored one array per field, in this order
+layout_columns = ["left", "top", "width", "height", "conf", "block", "par", "line"]
+# The same fields, as named in the words of Engines.image_to_data
+word_names = [
+    "left",
+    "top",
+    "width",
+    "height",
+    "conf",
+    "block_num",
+    "par_num",
+    "line_num",
+]
+
+
+class Layout:
+    """
+    Words of one OCR pass, in columns; one array per field, and the word texts in a list.
+    Plain text, paragraphs, confidences, and boxes all derive from it, without OCR again.
+    Boxes are in pixels of the original snip, not the preprocessed image.
+    """
+
+    def __init__(self, texts, columns, size) -> None:
+        """
+        :param texts: Word texts, in reading order.
+        :param columns: Field name to array of values; one value per word.
+        :param size: (width, height) of the snip.
+        """
+        self.texts = texts
+        self.columns = columns
+        self.size = tuple(size)
+
+    @classmethod
+    def from_words(cls, words, size, scale=1.0):
+        """
+        Build from engine words, as returned by image_to_data; blank words are dropped.
+        :param scale: Preprocessing upscale factor; boxes are divided by it.
+        """
+        words = [word for word in words if word["text"].strip()]
+        values = {
+            "left": [round(word["left"] / scale) for word in words],
+            "top": [round(word["top"] / scale) for word in words],
+            "width": [round(word["width"] / scale) for word in words],
+            "height": [round(word["height"] / scale) for word in words],
+            "conf": [max(-1, min(100, round(word["conf"]))) for word in words],
+            "block": [word["block_num"] for word in words],
+            "par": [word["par_num"] for word in words],
+            "line": [word["line_num"] for word in words],
+        }
+        columns = {
+            name: array(_typecode(name, values[name]), values[name])
+            for name in layout_columns
+        }
+
+        return cls([word["text"].strip() for word in words], columns, size)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def words(self, start=0, end=None) -> list:
+        """Words start to end as dicts; as returned by the engines' image_to_data."""
+        names = dict(zip(layout_columns, word_names))
+        fields = [
+            (names[name], self.columns[name][start:end]) for name in layout_columns
+        ]
+
+        return [
+            {"text": text, **{key: values[n] for key, values in fields}}
+            for n, text in enumerate(self.texts[start:end])
+        ]
+
+    def lines(self) -> list:
+        """(start, end) word indexes of each text line; end is exclusive."""
+        keys = zip(self.columns["block"], self.columns["par"], self.columns["line"])
+        spans = []
+        start = 0
+
+        for _, group in groupby(keys):
+            end = start + sum(1 for _ in group)
+            spans.append((start, end))
+            start = end
+
+        return spans
+
+    def paragraphs(self) -> list:
+        """Text of each paragraph; its lines joined by line breaks."""
+        block, par = self.columns["block"], self.columns["par"]
+        paragraphs = []
+        last = None
+
+        for start, end in self.lines():
+            if (block[start], par[start]) != last:
+                paragraphs.append([])
+                last = (block[start], par[start])
+
+            paragraphs[-1].append(" ".join(self.texts[start:end]))
+
+        return ["\n".join(lines) for lines in paragraphs]
+
+    def text(self) -> str:
+        """Plain text; as image_to_string, with a blank line between paragraphs."""
+        return "\n\n".join(self.paragraphs())
+
+    def box(self, start, end) -> tuple:
+        """(left, top, right, bottom) around words start to end; eg a line."""
+        left = self.columns["left"][start:end]
+        top = self.columns["top"][start:end]
+        right = [x + w for x, w in zip(left, self.columns["width"][start:end])]
+        bottom = [y + h for y, h in zip(top, self.columns["height"][start:end])]
+
+        return min(left), min(top), max(right), max(bottom)
+
+    def mean_conf(self, start=0, end=None) -> float:
+        """Mean word confidence, 0-100; -1 if there are no words."""
+        confs = self.columns["conf"][start:end]
+
+        return sum(confs) / len(confs) if confs else -1
+
+    def to_bytes(self) -> bytes:
+        """
+        A JSON header line, the raw arrays in layout_columns order, then the word texts.
+        Several times smaller than the same words as JSON objects.
+        """
+        header = {
+            "version": layout_version,
+            "size": self.size,
+            "count": len(self),
+            "columns": {name: self.columns[name].typecode for name in layout_columns},
+            "byteorder": sys.byteorder,
+        }
+
+        return b"".join(
+            [
+                json.dumps(header).encode("utf-8") + b"\n",
+                *(self.columns[name].tobytes() for name in layout_columns),
+                "\n".join(self.texts).encode("utf-8"),
+            ]
+        )
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Read a layout written by to_bytes; raises ValueError if the format differs."""
+        end = data.index(b"\n")
+        header = json.loads(data[:end])
+
+        if header.get("version") != layout_version:
+            raise ValueError(f"Layout version {header.get('version')} not supported.")
+
+        count = header["count"]
+        offset = end + 1
+        columns = {}
+
+        for name in layout_columns:
+            column = array(header["columns"][name])
+            size = column.itemsize * count
+            column.frombytes(data[offset : offset + size])
+
+            if header["byteorder"] != sys.byteorder:
+                column.byteswap()
+
+            columns[name] = column
+            offset += size
+
+        texts = data[offset:].decode("utf-8").split("\n") if count else []
+
+        return cls(texts, columns, header["size"])
+
+
+def load_layout(file_path):
+    """Returns the layout saved in a sidecar file; None if missing, or unreadable."""
+    try:
+        with open(file_path, "rb") as file:
+            return Layout.from_bytes(file.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _typecode(name, values) -> str:
+    """Smallest array type holding every value of a column."""
+    if name == "conf":
+        return "b"  # -1 to 100
+
+    return (
+        "H" if max(values, default=0) < 2**16 and min(values, default=0) >= 0 else "i"
+    )
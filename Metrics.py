@@ -0,0 +1,121 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from os import path
+
+from lib import display_message
+
+# Module variables :
+metrics_name = "metrics.jsonl"  # Timing records of a project; one JSON object per line
+env_flag = "RESTOOL_METRICS"  # Set to 1 to record timings; or run with --metrics
+env_path = "RESTOOL_METRICS_PATH"  # Metrics file of the active project; read by worker processes
+
+_enabled = os.environ.get(env_flag, "") not in ["", "0"]
+_metrics_path = os.environ.get(env_path, "")
+
+
+def enable(on=True) -> None:
+    """Switch timing records on, or off; inherited by worker processes."""
+    global _enabled
+    _enabled = on
+    os.environ[env_flag] = "1" if on else "0"
+
+
+def set_project(project_path) -> None:
+    """Direct timing records to the metrics file of the active project."""
+    global _metrics_path
+    _metrics_path = path.join(project_path, metrics_name)
+    os.environ[env_path] = _metrics_path
+
+
+@contextmanager
+def span(stage, **fields):
+    """
+    Time a stage of the workflow; a no-op unless metrics are enabled.
+    :param fields: Extra values stored with the record; eg the image size.
+    """
+    if not _enabled:
+        yield
+        return
+
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        _record(stage, time.perf_counter() - start, fields)
+
+
+def summarise(project_path) -> dict:
+    """Print, and return, the count, p50, and p95 of each stage, in milliseconds."""
+    metrics_path = path.join(project_path, metrics_name)
+    timings = {}
+
+    if path.exists(metrics_path):
+        with open(metrics_path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.decoder.JSONDecodeError:
+                    continue
+
+                timings.setdefault(record["stage"], []).append(record["ms"])
+
+    if not timings:
+        display_message("INFO", "No timing records found.", metrics_path)
+        return {}
+
+    summary = {
+        stage: {
+            "count": len(values),
+            "p50": _percentile(values, 50),
+            "p95": _percentile(values, 95),
+        }
+        for stage, values in sorted(timings.items())
+    }
+
+    print(f"\n<=> {'Stage':<24}{'Count':>8}{'p50':>12}{'p95':>12}")
+
+    for stage, row in summary.items():
+        print(
+            f"<=> {stage:<24}{row['count']:>8}"
+            f"{row['p50']:>10.1f}ms{row['p95']:>10.1f}ms"
+        )
+
+    return summary
+
+
+def _record(stage, seconds, fields) -> None:
+    if not _metrics_path:
+        return
+
+    record = {
+        "stage": stage,
+        "ms": round(seconds * 1000, 3),
+        "at": time.time(),
+        **fields,
+    }
+
+    try:
+        with open(_metrics_path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record) + "\n")
+    except OSError as e:
+        display_message("WARN", "Timing record not saved.", f"{e}")
+
+
+def _percentile(values, pct) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(1, -(-pct * len(ordered) // 100))
+
+    return ordered[int(rank) - 1]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage : python Metrics.py <project folder>")
+        sys.exit(1)
+
+    summarise(sys.argv[1])
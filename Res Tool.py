@@ -1,5 +1,18 @@
-from lib import create_path, display_menu, display_message, hor_bar, welcome_sequence
-from Tools import RegistryManager
+import sys
+
+import Cli
+import Metrics
+from lib import (
+    create_path,
+    display_menu,
+    display_message,
+    display_path_desc,
+    hor_bar,
+    identify_path,
+    welcome_sequence,
+)
+from Storage import default_storage
+from Tools import ImageEntry, RegistryManager, TagManager, TextEntry
 
 # Module Variables
 name = "Research Tool"
@@ -9,8 +22,6 @@ email = "tlcpineda.projects@gmail.com"
 width = 100
 indent = 10
 
-reg = RegistryManager()
-
 
 # Functions to process registry
 def list_projects() -> list:
@@ -64,16 +75,126 @@ def select_project() -> int:
     return proj_num
 
 
+def batch_import() -> int:
+    list_projects()
+    project = reg.projects[select_project() - 1]
+
+    print("\n>>> Folder of images to import ...")
+    folder_path = identify_path("folder")
+
+    if not folder_path:
+        display_message("WARN", "No folder selected.")
+        return 0
+
+    display_path_desc(folder_path, "folder")
+
+    tags_manager = TagManager(project["path"], project.get("storage", default_storage))
+    tags_manager.list_tags()
+    tag_input = input(">>> Enter tags for all entries (comma separated) : ")
+
+    text_entry = text_entry_for(project, tags_manager)
+    saved, _ = text_entry.capture_folder(folder_path, tag_input)
+
+    return saved
+
+
+def watch_clipboard() -> int:
+    list_projects()
+    project = reg.projects[select_project() - 1]
+    defaults = project.get("defaults", {})
+
+    print("\n>>> Metadata for every entry; blank keeps the project default.")
+    source = input(f">>> Source (URL/Book) [{defaults.get('source', '')}] : ").strip()
+    notes = input(f">>> Notes [{defaults.get('notes', '')}] : ").strip()
+
+    tags_manager = TagManager(project["path"], project.get("storage", default_storage))
+    tags_manager.list_tags()
+    tag_input = input(f">>> Tags (comma separated) [{defaults.get('tags', '')}] : ")
+
+    metadata = (
+        "",  # Each entry is titled by its first line.
+        source or defaults.get("source", "unidentified_source"),
+        notes or defaults.get("notes", ""),
+        tags_manager.resolve_tags(tag_input.strip() or defaults.get("tags", "")),
+    )
+
+    return text_entry_for(project, tags_manager).watch_clipboard(metadata)
+
+
+def image_entry() -> int:
+    list_projects()
+    project = reg.projects[select_project() - 1]
+    storage = project.get("storage", default_storage)
+
+    tags_manager = TagManager(project["path"], storage)
+    entry_maker = ImageEntry(project["path"], tags_manager, storage)
+    saved = entry_maker.capture_entry()
+    entry_maker.close()  # Waits for the snip to finish encoding
+
+    return int(bool(saved))
+
+
+def text_entry_for(project, tags_manager) -> TextEntry:
+    return TextEntry(
+        project["path"],
+        tags_manager,
+        reg.ocr_manager,
+        project.get("storage", default_storage),
+        project.get("preprocess"),
+        project.get("lang", "eng"),
+        project.get("ocr"),
+        project.get("cleanup"),
+    )
+
+
+def find_all() -> int:
+    text = input("\n>>> Search all projects for : ").strip()
+
+    if not text:
+        display_message("WARN", "No search text entered.")
+        return 0
+
+    results = reg.search_all(text, limit=20)
+
+    if not results:
+        display_message("INFO", "No matches found.")
+
+    for result in results:
+        # None if the entry left the log after the index was read.
+        entry = result["entry"]
+        title = entry.get("title", "") if entry else "(entry no longer in log)"
+        print(f"\n<=> [{result['project']} #{result['card']}] {title}")
+        print(f"<=>  {result['snippet']}")
+
+    return len(results)
+
+
 if __name__ == "__main__":
+    # Headless commands, eg "Res Tool.py ingest 1 scans/"; see Cli.py.
+    if sys.argv[1:] and sys.argv[1:] != ["--metrics"]:
+        sys.exit(Cli.main(sys.argv[1:]))
+
+    if "--metrics" in sys.argv:  # Record per-stage timings to each project's metrics.jsonl
+        Metrics.enable()
+
+    # Created here, so batch import worker processes do not set up the registry again.
+    reg = RegistryManager()
+
     options = [
         {"menu": "[N]ew Project", "shortkey": "N", "func": add_new_project},
         {"menu": "[L]ist Projects", "shortkey": "L", "func": list_projects},
         {"menu": "[S]elect Project", "shortkey": "S", "func": select_project},
+        {"menu": "[B]atch Import Images", "shortkey": "B", "func": batch_import},
+        {"menu": "[W]atch Clipboard", "shortkey": "W", "func": watch_clipboard},
+        {"menu": "[I]mage Entry", "shortkey": "I", "func": image_entry},
+        {"menu": "[F]ind in All Projects", "shortkey": "F", "func": find_all},
         {"menu": "E[X]it", "shortkey": "X"},
     ]
     welcome_sequence([f"{name} v{ver}", date, email], width)
     project_list = list_projects()
-    opts_filter = ["N", "S", "X"] if len(project_list) else ["N", "X"]
+    opts_filter = (
+        ["N", "S", "B", "W", "I", "F", "X"] if len(project_list) else ["N", "X"]
+    )
     options = [option for option in options if option["shortkey"] in opts_filter]
 
     confirm_exit = False
@@ -0,0 +1,601 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from itertools import chain
+from os import path
+
+from lib import display_message, display_path_desc
+
+# Module variables :
+storage_types = ["json", "jsonl", "sqlite"]  # Log backends selectable in registry.json
+chunk_size = 1 << 16  # Bytes read at a time when streaming a log file.
+default_storage = "json"  # Legacy backend; full rewrite of a JSON array per save.
+store_db = "research.db"  # SQLite project store; replaces the log, and tags.json
+card_keys = ["type", "created", "title", "content", "source", "tags", "notes", "lang"]
+absent_key = "__absent__"  # Schema keys an entry did not have; in SqliteLog "extra"
+lock_timeout = 10  # Seconds to wait for another instance to release a file lock
+stale_lock = 60  # Seconds after which a leftover lock file is treated as abandoned
+
+
+class JsonLog:
+    """Legacy backend; the whole log is kept as a single JSON array, rewritten on each save."""
+
+    def __init__(self, log_path) -> None:
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._data = None  # Loaded log; kept to avoid re-reading the file on each save.
+
+    def load(self) -> list:
+        self._data = _load_log(self.log_path)
+        return self._data
+
+    def iter(self):
+        """Yield entries one at a time, without loading the whole log."""
+        if self._data is not None:
+            return iter(self._data)
+
+        return iter_log(self.log_path)
+
+    def tail(self, count) -> list:
+        """Returns the last entries of the log."""
+        return list(deque(self.iter(), maxlen=count))
+
+    def signature(self) -> list:
+        """Size and modified time of the log; changes whenever entries are written."""
+        return _file_signature(self.log_path)
+
+    def append(self, entry) -> bool:
+        return self.extend([entry])
+
+    def extend(self, entries) -> bool:
+        with self._lock:
+            data = self._data if self._data is not None else self.load()
+            data.extend(entries)
+
+            return _save_to_log(self.log_path, data)
+
+    def replace(self, entries) -> bool:
+        """Overwrite the log with the given entries; used when migrating storage."""
+        with self._lock:
+            self._data = list(entries)
+            return _save_to_log(self.log_path, self._data, quiet=True)
+
+    def compact(self, background=False):
+        """Nothing to compact; the JSON array is rewritten in full on every save."""
+        return True
+
+
+class JsonlLog:
+    """
+    Append-only backend; one JSON record per line in research_log.jsonl.
+    Records still held in a legacy research_log.json array are read first, and folded
+    into the JSONL file on compaction.
+    """
+
+    def __init__(self, log_path) -> None:
+        root, _ = path.splitext(log_path)
+        self.legacy_path = root + ".json"
+        self.log_path = root + ".jsonl"
+        self._lock = threading.Lock()
+        self._compactor = None
+
+    def load(self) -> list:
+        return list(self.iter())
+
+    def iter(self):
+        """Yield entries one at a time; legacy records first."""
+        return chain(iter_log(self.legacy_path), iter_log(self.log_path))
+
+    def tail(self, count) -> list:
+        """Returns the last entries of the log; reads the JSONL file backwards."""
+        entries = _tail_jsonl(self.log_path, count)
+
+        if len(entries) < count:
+            legacy = deque(iter_log(self.legacy_path), maxlen=count - len(entries))
+            entries = list(legacy) + entries
+
+        return entries
+
+    def signature(self) -> list:
+        """Size and modified time of the legacy and JSONL files."""
+        return _file_signature(self.legacy_path) + _file_signature(self.log_path)
+
+    def append(self, entry) -> bool:
+        return self.extend([entry])
+
+    def extend(self, entries) -> bool:
+        """Append records to the end of the log, and fsync before returning."""
+        lines = "".join(_dump_line(entry) for entry in entries)
+
+        with self._lock:
+            try:
+                # Start on a fresh line, if the last write was torn.
+                if not _ends_with_newline(self.log_path):
+                    lines = "\n" + lines
+
+                with open(self.log_path, "a", encoding="utf-8") as log_file:
+                    log_file.write(lines)
+                    log_file.flush()
+                    os.fsync(log_file.fileno())
+
+                display_message(
+                    "INFO", f'New entry added to "{path.basename(self.log_path)}".'
+                )
+                return True
+            except Exception as e:
+                display_message("WARN", "File save failed :", f"{e}")
+                display_path_desc(self.log_path, "file")
+                return False
+
+    def compact(self, background=False):
+        """
+        Rewrite the JSONL file; fold in legacy records, and drop lines torn by an interrupted write.
+        :param background: Run compaction on a daemon thread, and return the thread.
+        :return: Whether compaction was successful, or the thread running it.
+        """
+        if not background:
+            return self._compact()
+
+        if self._compactor and self._compactor.is_alive():
+            return self._compactor
+
+        self._compactor = threading.Thread(target=self._compact, daemon=True)
+        self._compactor.start()
+
+        return self._compactor
+
+    def replace(self, entries) -> bool:
+        """Overwrite the log with the given entries; used when migrating storage."""
+        return self._rewrite(entries)
+
+    def _compact(self) -> bool:
+        return self._rewrite(self.iter())
+
+    def _rewrite(self, records) -> bool:
+        temp_path = self.log_path + ".tmp"
+
+        with self._lock:
+            try:
+                count = 0
+
+                with open(temp_path, "w", encoding="utf-8") as log_file:
+                    for record in records:
+                        log_file.write(_dump_line(record))
+                        count += 1
+                    log_file.flush()
+                    os.fsync(log_file.fileno())
+
+                os.replace(temp_path, self.log_path)
+
+                # Legacy records now live in the JSONL file.
+                if path.exists(self.legacy_path):
+                    _save_to_log(self.legacy_path, [], quiet=True)
+
+                display_message(
+                    "INFO",
+                    f'"{path.basename(self.log_path)}" compacted; {count} entries.',
+                )
+                return True
+            except Exception as e:
+                if path.exists(temp_path):
+                    os.remove(temp_path)
+
+                display_message("WARN", "Log compaction failed.", f"{e}")
+                return False
+
+
+class SqliteLog:
+    """
+    Project store in a single SQLite file, research.db; cards, tags, and the card_tags join.
+    Same interface as the JSON backends, plus the tag library used by TagManager.
+    Keys outside the data schema are kept in "extra", so JSON entries round-trip unchanged.
+    """
+
+    def __init__(self, log_path) -> None:
+        self.log_path = path.join(path.dirname(log_path), store_db)
+        self._lock = threading.Lock()
+        self._compactor = None
+        self.conn = sqlite3.connect(self.log_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS cards (
+                id INTEGER PRIMARY KEY,
+                type TEXT, created TEXT, title TEXT, content TEXT,
+                source TEXT, notes TEXT, lang TEXT, extra TEXT
+            );
+            CREATE TABLE IF NOT EXISTS tags (
+                id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS card_tags (
+                card_id INTEGER NOT NULL REFERENCES cards (id) ON DELETE CASCADE,
+                tag_id INTEGER NOT NULL REFERENCES tags (id),
+                position INTEGER NOT NULL,
+                PRIMARY KEY (card_id, position)
+            );
+            CREATE INDEX IF NOT EXISTS card_tags_tag ON card_tags (tag_id);
+            """)
+
+    def load(self) -> list:
+        return list(self.iter())
+
+    def iter(self):
+        """Yield entries one at a time, in order of capture."""
+        return self._select("ORDER BY c.id")
+
+    def tail(self, count) -> list:
+        return list(self._select("ORDER BY c.id DESC LIMIT ?", (count,)))[::-1]
+
+    def signature(self) -> list:
+        """Number of cards, and the last card ID."""
+        return list(self.conn.execute("SELECT count(*), max(id) FROM cards").fetchone())
+
+    def append(self, entry) -> bool:
+        return self.extend([entry])
+
+    def extend(self, entries) -> bool:
+        with self._lock:
+            try:
+                with self.conn:
+                    self._insert(entries)
+
+                display_message(
+                    "INFO", f'New entry added to "{path.basename(self.log_path)}".'
+                )
+                return True
+            except Exception as e:
+                display_message("WARN", "File save failed :", f"{e}")
+                display_path_desc(self.log_path, "file")
+                return False
+
+    def replace(self, entries, tag_items=None) -> bool:
+        """
+        Overwrite all cards with the given entries; used when migrating storage.
+        :param tag_items: (id, name, count) of the tag library; replaces it, keeping the IDs.
+        """
+        with self._lock:
+            try:
+                with self.conn:
+                    self.conn.execute("DELETE FROM cards")
+
+                    if tag_items is not None:
+                        self.conn.execute("DELETE FROM tags")
+                        self.conn.executemany(
+                            "INSERT INTO tags (id, name) VALUES (?, ?)",
+                            [(tag_id, name) for tag_id, name, _ in tag_items],
+                        )
+
+                    self._insert(entries)
+                return True
+            except Exception as e:
+                display_message("WARN", "Store update failed.", f"{e}")
+                return False
+
+    def compact(self, background=False):
+        """Reclaim free pages, and fold the write-ahead log into the database file."""
+        if not background:
+            return self._compact()
+
+        if self._compactor and self._compactor.is_alive():
+            return self._compactor
+
+        self._compactor = threading.Thread(target=self._compact, daemon=True)
+        self._compactor.start()
+
+        return self._compactor
+
+    def tag_items(self) -> list:
+        """Returns (id, name, count) of all tags, in order of ID."""
+        return self.conn.execute(
+            "SELECT t.id, t.name, count(ct.card_id) FROM tags t "
+            "LEFT JOIN card_tags ct ON ct.tag_id = t.id GROUP BY t.id ORDER BY t.id"
+        ).fetchall()
+
+    def add_tag(self, name, tag_id=None) -> int:
+        """Register a tag, and return its ID; existing tags keep theirs."""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO tags (id, name) VALUES (?, ?)", (tag_id, name)
+            )
+            return self.conn.execute(
+                "SELECT id FROM tags WHERE name = ?", (name,)
+            ).fetchone()[0]
+
+    def _compact(self) -> bool:
+        with self._lock:
+            try:
+                self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                self.conn.execute("VACUUM")
+                display_message("INFO", f'"{path.basename(self.log_path)}" compacted.')
+                return True
+            except Exception as e:
+                display_message("WARN", "Store compaction failed.", f"{e}")
+                return False
+
+    def _insert(self, entries) -> None:
+        for entry in entries:
+            extra = {key: value for key, value in entry.items() if key not in card_keys}
+            absent = [key for key in card_keys if key not in entry]
+
+            if absent:  # Schema keys missing from the entry; not restored as null.
+                extra[absent_key] = absent
+            card_id = self.conn.execute(
+                "INSERT INTO cards "
+                "(type, created, title, content, source, notes, lang, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry.get("type"),
+                    entry.get("created"),
+                    entry.get("title"),
+                    json.dumps(entry.get("content"), ensure_ascii=False),
+                    entry.get("source"),
+                    entry.get("notes"),
+                    entry.get("lang"),
+                    json.dumps(extra, ensure_ascii=False) if extra else None,
+                ),
+            ).lastrowid
+
+            for position, name in enumerate(entry.get("tags", [])):
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO tags (name) VALUES (?)", (name,)
+                )
+                self.conn.execute(
+                    "INSERT INTO card_tags (card_id, tag_id, position) "
+                    "SELECT ?, id, ? FROM tags WHERE name = ?",
+                    (card_id, position, name),
+                )
+
+    def _select(self, order, params=()):
+        rows = self.conn.execute(
+            "SELECT c.type, c.created, c.title, c.content, c.source, c.notes, c.lang, "
+            "c.extra, (SELECT json_group_array(name) FROM "
+            "(SELECT t.name FROM card_tags ct JOIN tags t ON t.id = ct.tag_id "
+            "WHERE ct.card_id = c.id ORDER BY ct.position)) "
+            f"FROM cards c {order}",
+            params,
+        )
+
+        for type_, created, title, content, source, notes, lang, extra, tags in rows:
+            entry = {
+                "type": type_,
+                "created": created,
+                "title": title,
+                "content": json.loads(content),
+                "source": source,
+                "tags": json.loads(tags),
+                "notes": notes,
+                "lang": lang,
+            }
+
+            if extra:
+                entry.update(json.loads(extra))
+
+                for key in entry.pop(absent_key, []):
+                    entry.pop(key, None)
+
+            yield entry
+
+
+def open_log(log_path, storage=default_storage):
+    """Returns the log backend for the storage type set in the project's registry entry."""
+    match storage:
+        case "sqlite":
+            return SqliteLog(log_path)
+        case "jsonl":
+            return JsonlLog(log_path)
+        case "json":
+            return JsonLog(log_path)
+
+    display_message("WARN", f'Unknown storage "{storage}"; using "{default_storage}".')
+    return JsonLog(log_path)
+
+
+@contextmanager
+def file_lock(file_path, timeout=lock_timeout):
+    """
+    Exclusive lock on a file shared by several running instances; a "<file>.lock" beside it.
+    Behaves the same on Windows, and POSIX. Raises TimeoutError if not acquired in time.
+    """
+    lock_path = file_path + ".lock"
+    deadline = time.monotonic() + timeout
+
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                # Left behind by an instance that crashed while holding it.
+                if time.time() - path.getmtime(lock_path) > stale_lock:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue  # Released in the meantime.
+
+            if time.monotonic() > deadline:
+                raise TimeoutError(f'"{path.basename(file_path)}" is in use.')
+
+            time.sleep(0.05)
+
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        yield
+    finally:
+        os.close(fd)
+
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
+
+
+def _file_signature(file_path) -> list:
+    if not path.exists(file_path):
+        return [0, 0]
+
+    stat = os.stat(file_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _dump_line(record) -> str:
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def _ends_with_newline(file_path) -> bool:
+    if not path.exists(file_path) or path.getsize(file_path) == 0:
+        return True
+
+    with open(file_path, "rb") as file:
+        file.seek(-1, os.SEEK_END)
+        return file.read(1) == b"\n"
+
+
+def iter_log(file_path):
+    """
+    Yield the entries of a log file one at a time.
+    Handles both a JSON array (legacy research_log.json) and line-delimited records.
+    """
+    if not path.exists(file_path):
+        return
+
+    with open(file_path, "r", encoding="utf-8") as file:
+        head = file.read(chunk_size)
+        stripped = head.lstrip()
+
+        if stripped.startswith("["):
+            yield from _iter_json_array(file, stripped[1:])
+        else:
+            yield from _iter_jsonl(
+                chain([head], iter(lambda: file.read(chunk_size), "")), file_path
+            )
+
+
+_array_gap = re.compile(r"[\s,]*")  # Separators between records in a JSON array.
+
+
+def _iter_json_array(file, buffer):
+    """Incrementally decode the records of a JSON array, after its opening bracket."""
+    decoder = json.JSONDecoder()
+    pos = 0
+
+    while True:
+        pos = _array_gap.match(buffer, pos).end()
+
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except json.decoder.JSONDecodeError:
+            # Record straddles the end of the buffer; read more of the file.
+            more = file.read(chunk_size)
+
+            if not more:
+                if buffer[pos:].strip():
+                    display_message(
+                        "WARN", "Log file is truncated; skipped last entry."
+                    )
+                return
+
+            buffer = buffer[pos:] + more
+            pos = 0
+            continue
+
+        yield record
+
+        # Drop decoded text, to keep memory bounded.
+        if end > chunk_size:
+            buffer = buffer[end:]
+            end = 0
+
+        pos = end
+
+
+def _iter_jsonl(chunks, file_path):
+    """Decode line-delimited records, skipping lines that cannot be decoded."""
+    pending = ""
+
+    for chunk in chain(chunks, ["\n"]):
+        lines = (pending + chunk).split("\n")
+        pending = lines.pop()
+
+        for line in lines:
+            line = line.strip()
+
+            if not line:
+                continue
+
+            try:
+                yield json.loads(line)
+            except json.decoder.JSONDecodeError:
+                display_message(
+                    "WARN", f'Skipped unreadable line in "{path.basename(file_path)}".'
+                )
+
+
+def _tail_jsonl(file_path, count) -> list:
+    """Read the last records of a JSONL file, from its end."""
+    if count <= 0 or not path.exists(file_path):
+        return []
+
+    with open(file_path, "rb") as file:
+        end = file.seek(0, os.SEEK_END)
+        data = b""
+
+        # Read blocks backwards until enough complete lines are found.
+        while end > 0 and data.count(b"\n") <= count:
+            start = max(0, end - chunk_size)
+            file.seek(start)
+            data = file.read(end - start) + data
+            end = start
+
+    lines = data.split(b"\n")
+
+    # The first line may be partial, and start inside a character; drop it undecoded.
+    if end > 0:
+        lines = lines[1:]
+
+    text = b"\n".join(lines).decode("utf-8", errors="replace")
+    records = list(_iter_jsonl([text], file_path))
+    return records[-count:]
+
+
+def _load_log(file_path):
+    """Load contents of log file, or returns an empty list if not found."""
+    if path.exists(file_path):
+        with open(file_path, "r", encoding="utf-8") as file:
+            try:
+                return json.load(file)
+            except json.decoder.JSONDecodeError:
+                return []
+
+    return []
+
+
+def _save_to_log(log_path, data, quiet=False):
+    """Helper function to save data to specified log file."""
+    # Create a temp file, in case of fatal error during write process.
+    temp_path = log_path + ".tmp"
+
+    try:
+        with open(temp_path, "w", encoding="utf-8") as log_file:
+            json.dump(data, log_file, indent=2, ensure_ascii=False)
+
+        # Replace the official file, by the temp file.
+        os.replace(temp_path, log_path)
+
+        if not quiet:
+            display_message("INFO", f'New entry added to "{path.basename(log_path)}".')
+        return True
+    except Exception as e:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+        display_message("WARN", "File save failed :", f"{e}")
+        display_path_desc(log_path, "file")
+        return False
@@ -0,0 +1,200 @@
+from bisect import bisect_right
+from statistics import median
+
+from Metrics import span
+
+# Module variables :
+table_version = 1  # Bump when grid detection changes; invalidates cached tables.
+ink_cut = 128  # Pixels darker than this are ink, in the preprocessed image
+rule_fill = 0.6  # Share of a row, or column, in ink for it to be a ruling line
+col_gap = 1.0  # Blank width, in text line heights, that separates two columns
+row_gap = 2  # Blank pixels that separate two rows, in tables without ruling lines
+cell_pad = 10  # Blank pixels around each cell in the OCR mosaic
+max_mosaic_height = 30000  # Tesseract rejects images over 32767 pixels high
+
+
+def extract_table(img, engine, lang="eng", oem=3) -> list:
+    """
+    Returns the table in a preprocessed image; a list of rows, each a list of cell text.
+    Cells are OCR'd together, in one engine call, from a mosaic of the cropped cells.
+    :param img: Grayscale image, dark text on white; as from OCRManager._preprocess_for_ocr.
+    """
+    with span("table.grid", size=img.size):
+        cells, row_count, col_count = find_cells(img)
+
+    if not cells:
+        return []
+
+    cell_words = []
+
+    # Uniform block of text; one line, or more, per cell. Very long tables take a few calls.
+    with span("table.ocr", cells=len(cells)):
+        for boxes in _batches([box for _, _, box in cells]):
+            mosaic, slots = build_mosaic(img, boxes)
+            words = engine.image_to_data(mosaic, lang=lang, psm=6, oem=oem)
+            cell_words.extend(_assign_words(words, slots))
+
+    table = [[""] * col_count for _ in range(row_count)]
+
+    for (row, col, _), texts in zip(cells, cell_words):
+        table[row][col] = " ".join(texts)
+
+    return table
+
+
+def find_cells(img) -> tuple:
+    """
+    Locate the table grid; from ruling lines when ruled both ways, else from whitespace.
+    :return: (row, column, box) of cells holding ink, the number of rows, and of columns.
+    """
+    from PIL import Image, ImageDraw
+
+    ink = img.convert("L").point([255 if v < ink_cut else 0 for v in range(256)])
+    w, h = ink.size
+    transposed = ink.transpose(Image.Transpose.TRANSPOSE)
+    h_rules = _runs([n >= w * rule_fill for n in _ink_counts(ink)])
+    v_rules = _runs([n >= h * rule_fill for n in _ink_counts(transposed)])
+
+    if len(h_rules) >= 2 and len(v_rules) >= 2:  # Fully ruled; eg spreadsheets.
+        rows = _between(h_rules)
+        cols = _between(v_rules)
+    else:
+        # Partial rules (eg header underlines) would join rows, or columns; erase them.
+        if h_rules or v_rules:
+            ink = ink.copy()
+            draw = ImageDraw.Draw(ink)
+
+            for start, end in h_rules:
+                draw.rectangle((0, start, w, end - 1), fill=0)
+
+            for start, end in v_rules:
+                draw.rectangle((start, 0, end - 1, h), fill=0)
+
+            transposed = ink.transpose(Image.Transpose.TRANSPOSE)
+
+        rows = _merge(_runs([n > 0 for n in _ink_counts(ink)]), row_gap)
+
+        if not rows:
+            return [], 0, 0
+
+        line_height = median(end - start for start, end in rows)
+        cols = _merge(
+            _runs([n > 0 for n in _ink_counts(transposed)]),
+            max(row_gap, round(line_height * col_gap)),
+        )
+
+    cells = []
+
+    for row, (top, bottom) in enumerate(rows):
+        for col, (left, right) in enumerate(cols):
+            bbox = ink.crop((left, top, right, bottom)).getbbox()
+
+            if bbox:  # Empty cells are not sent for OCR.
+                x0, y0, x1, y1 = bbox
+                cells.append((row, col, (left + x0, top + y0, left + x1, top + y1)))
+
+    return cells, len(rows), len(cols)
+
+
+def build_mosaic(img, boxes) -> tuple:
+    """
+    Stack cell crops in one image, each on its own band, for a single OCR pass.
+    :return: The mosaic, and the (top, bottom) band of each cell.
+    """
+    from PIL import Image
+
+    img = img.convert("L")
+    crops = [img.crop(box) for box in boxes]
+    width = max(crop.width for crop in crops) + 2 * cell_pad
+    height = sum(crop.height + 2 * cell_pad for crop in crops)
+    mosaic = Image.new("L", (width, height), 255)
+    slots = []
+    top = 0
+
+    for crop in crops:
+        bottom = top + crop.height + 2 * cell_pad
+        mosaic.paste(crop, (cell_pad, top + cell_pad))
+        slots.append((top, bottom))
+        top = bottom
+
+    return mosaic, slots
+
+
+def _batches(boxes) -> list:
+    """Split cell boxes into groups whose mosaic stays within max_mosaic_height."""
+    batches = [[]]
+    height = 0
+
+    for box in boxes:
+        cell_height = box[3] - box[1] + 2 * cell_pad
+
+        if batches[-1] and height + cell_height > max_mosaic_height:
+            batches.append([])
+            height = 0
+
+        batches[-1].append(box)
+        height += cell_height
+
+    return batches
+
+
+def _assign_words(words, slots) -> list:
+    """Group words by the mosaic band holding the vertical centre of their box."""
+    tops = [top for top, _ in slots]
+    cell_words = [[] for _ in slots]
+
+    for word in words:
+        if not word["text"].strip():
+            continue
+
+        centre = word["top"] + word["height"] / 2
+        slot = bisect_right(tops, centre) - 1
+
+        if slot >= 0 and centre < slots[slot][1]:
+            cell_words[slot].append(word["text"].strip())
+
+    return cell_words
+
+
+def _ink_counts(ink) -> list:
+    """Ink pixels in each row of a binary image; counted in C, over the raw bytes."""
+    w, h = ink.size
+    data = ink.tobytes()
+
+    return [data.count(255, y * w, (y + 1) * w) for y in range(h)]
+
+
+def _runs(flags) -> list:
+    """Returns (start, end) of each run of True values; end is exclusive."""
+    runs = []
+    start = None
+
+    for n, flag in enumerate(flags):
+        if flag and start is None:
+            start = n
+        elif not flag and start is not None:
+            runs.append((start, n))
+            start = None
+
+    if start is not None:
+        runs.append((start, len(flags)))
+
+    return runs
+
+
+def _merge(runs, min_gap) -> list:
+    """Join runs separated by fewer than min_gap blank pixels; eg words in a cell."""
+    merged = []
+
+    for start, end in runs:
+        if merged and start - merged[-1][1] < min_gap:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+
+    return merged
+
+
+def _between(rules) -> list:
+    """Bands between consecutive ruling lines; the cells of a ruled table."""
+    return [(rules[n][1], rules[n + 1][0]) for n in range(len(rules) - 1)]
@@ -1,32 +1,117 @@
 import csv
+import filecmp
+import hashlib
 import json
 import os
+import shutil
+import signal
+import stat
 import sys
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime as dt
 from datetime import timezone as tz
 from os import path
+from typing import TYPE_CHECKING
 
-import pytesseract
-from PIL import Image, ImageFilter, ImageGrab, ImageOps, ImageStat
-
+from Cleanup import clean_text
+from Engines import OCRCache, load_engine
+from Index import GlobalSearch, ProjectIndex, SqliteTagIndex, TagIndex, tag_index_name
+from Layout import Layout, layout_ext
+from Languages import guess_lang, langs_for_script, split_langs
 from lib import display_message, display_path_desc, identify_path
+from Metrics import set_project, span
+from Storage import (
+    default_storage,
+    file_lock,
+    open_log,
+    storage_types,
+    store_db,
+    _file_signature,
+    _load_log,
+    _save_to_log,
+)
+from Tables import extract_table, table_version
+
+if TYPE_CHECKING:  # PIL is imported on first use; see _capture_img.
+    from PIL import Image
 
 # Class variables :
 registry_name = "registry.json"  # JSON log of projects; list of objects
 user_data = "user_data"  # Folder name containing the registry file
 research_log = "research_log.json"  # JSON log of all research data.
 tags = "tags.json"  # JSON log of tags used for each entry in research_log
+# Suffix of the copies kept of log files replaced by a storage switch
+backup_ext = ".bak"
 img_folder = "assets"  # Folder name containing the images snipped
 paths_csv = "paths.csv"  # The CSV file containing the path to tesseract.exe; initialised with possible locations.
+image_exts = [".png", ".jpg", ".jpeg"]  # Image files picked up by batch import
+ocr_cache = "ocr_cache.db"  # OCR text of processed images, keyed by content hash
+asset_format = "webp"  # Encoding of image entries; lossless "webp", or optimised "png"
+thumb_folder = "thumbs"  # Subfolder of assets holding thumbnails for display
+thumb_size = (320, 320)  # Bounding box of thumbnails; aspect ratio is kept
+layout_folder = "layouts"  # Subfolder of assets holding word boxes of text entries
+capture_workers = 2  # Snips OCR'd at once, in the background of a capture
+watch_batch = 10  # Entries saved together in watch mode; or after watch_save_interval
+watch_save_interval = 30  # Seconds between saves of finished entries, in watch mode
+title_length = 60  # Characters of the first line, for titles of watch mode entries
+
+# Image preprocessing stages before OCR; override per project with "preprocess" in registry.json
+preprocess_defaults = {
+    "invert": "auto",  # Invert dark mode snips; or true / false.
+    "scale": "auto",  # Upscale factor from the text line height; or a fixed factor.
+    "sharpen": True,
+    "threshold": 145,  # Binarisation cut-off, 0-255; 0 to skip.
+}
+# Height, in pixels, of the dense core of a text line, as _auto_scale measures it; about
+# the x-height. Tesseract reads best from roughly 20 pixels; 40px text needs no upscale.
+target_x_height = 22
+max_scale = 3  # Larger factors cost time, and memory, without better OCR
+preprocess_version = 3  # Bump when preprocessing changes; invalidates cached OCR text.
+
+# Tesseract settings; override per project with "ocr" in registry.json, or per entry
+ocr_defaults = {
+    "psm": 3,  # Page segmentation mode; 6 for a single block, 7 for a single line.
+    "oem": 3,  # Engine mode; 1 LSTM only, 3 default.
+    "detect": False,  # Narrow a combined "lang" to the snip's language; see pick_lang.
+    "refine": False,  # OCR low confidence lines again; see refine_layout.
+}
+
+# Low confidence lines are OCR'd again with each of these; (preprocess overrides, psm)
+refine_variants = [
+    ({"threshold": 0}, 7),  # Grayscale, without binarisation; single line.
+    ({"threshold": 110}, 7),
+    ({"threshold": 180}, 7),
+    ({"invert": False}, 7),
+    ({}, 6),  # Project preprocessing; single block.
+]
+low_conf = 60  # Mean word confidence, 0-100, below which a line is OCR'd again
+max_refine_lines = 20  # Lines OCR'd again per snip; the least confident first
+min_refine_chars = 0.8  # Share of a line's characters a new reading must keep
+refine_pad = 4  # Pixels of margin around each line crop
+refine_workers = 4  # Line crops OCR'd at once
 
 
 class OCRManager:
-    def __init__(self, user_data_path) -> None:
+    def __init__(self, user_data_path, engine="auto", tesseract_path="") -> None:
+        """
+        :param engine: The OCR backend; one of engine_types.
+        :param tesseract_path: A known path to the executable; skips the lookup in paths.csv.
+        """
+        self.user_data_path = user_data_path
+        self.cache = OCRCache(path.join(user_data_path, ocr_cache))
+
+        if tesseract_path:  # Batch import workers; path already configured.
+            self.tesseract_path = tesseract_path
+            self.engine = load_engine(tesseract_path, engine, quiet=True)
+            return
+
         self.paths_csv = path.join(user_data_path, paths_csv)
         self._check_paths_file()
         self.tesseract_path = self._config_tesseract_path()
-        pytesseract.pytesseract.tesseract_cmd = self.tesseract_path
         self._clean_up_files_path()
+        self.engine = load_engine(self.tesseract_path, engine)
 
     def _check_paths_file(self):
         """Creates a default CSV file for paths to be used by Tesseract."""
@@ -143,60 +228,297 @@ class OCRManager:
     #                 return norm_path
     #             display_message("WARN", "Invalid path.")
 
-    def _preprocess_for_ocr(self, img):
+    def _preprocess_for_ocr(self, img, stages=None):
+        """
+        Prepare an image for OCR; stages are set in preprocess_defaults.
+        Each stage is a single pass in C; no per-pixel work in Python.
+        """
+        from PIL import Image, ImageFilter
+
+        stages = {**preprocess_defaults, **(stages or {})}
         img = img.convert("L")  # Convert to grayscale ("L").
+        w, h = img.size
+
+        # Mean brightness of each row; for both the dark mode and the line height checks.
+        profile = list(img.resize((1, h), resample=Image.Resampling.BOX).getdata())
 
         # Invert colours when in Dark Mode.
-        stat = ImageStat.Stat(img)
-        if stat.mean[0] < 120:
-            img = ImageOps.invert(img)
+        invert = stages["invert"]
+        if invert == "auto":
+            invert = sum(profile) / h < 120
 
-        # Resize image by scale, rs.
-        w, h = img.size
-        rs = 3
-        img = img.resize((w * rs, h * rs), resample=Image.Resampling.LANCZOS)
+        if invert:
+            profile = [255 - p for p in profile]
 
-        img = img.filter(ImageFilter.SHARPEN)
-        img = img.point(lambda p: p > 145 and 255)
+        # Resize image by scale, rs; skipped when text is already large enough.
+        rs = stages["scale"]
+        if rs == "auto":
+            rs = _auto_scale(profile, img.info.get("dpi"))
+
+        if rs != 1:
+            img = img.resize(
+                (round(w * rs), round(h * rs)), resample=Image.Resampling.LANCZOS
+            )
+
+        if stages["sharpen"]:
+            img = img.filter(ImageFilter.SHARPEN)
+
+        # Inversion and threshold in one lookup table; both commute with resize and sharpen.
+        lut = _build_lut(invert, stages["threshold"])
+        if lut:
+            img = img.point(lut)
 
         return img
 
+    def ocr_text(self, img, lang="eng", psm=3, oem=3, preprocess=None) -> str:
+        """Preprocess, and OCR an image; the plain text of ocr_layout."""
+        return self.ocr_layout(img, lang, psm, oem, preprocess).text()
+
+    def ocr_layout(self, img, lang="eng", psm=3, oem=3, preprocess=None) -> Layout:
+        """
+        Preprocess, and OCR an image in one image_to_data pass; words, boxes, and confidences.
+        Repeated images are served from the OCR cache.
+        """
+        key = OCRCache.key(
+            img,
+            kind="layout",
+            lang=lang,
+            psm=psm,
+            oem=oem,
+            preprocess={**preprocess_defaults, **(preprocess or {})},
+            version=preprocess_version,
+        )
+        with span("ocr.cache"):
+            cached = self.cache.get(key)
+
+        if cached is not None:
+            return Layout.from_bytes(cached)
+
+        with span("ocr.preprocess", size=img.size):
+            processed = self._preprocess_for_ocr(img, preprocess)
+
+        with span("ocr.tesseract", size=processed.size, engine=self.engine.name):
+            words = self.engine.image_to_data(processed, lang=lang, psm=psm, oem=oem)
+
+        layout = Layout.from_words(words, img.size, processed.width / img.width)
+        self.cache.put(key, layout.to_bytes())
+
+        return layout
+
+    def ocr_table(self, img, lang="eng", oem=3, preprocess=None) -> list:
+        """Preprocess an image, and read the table in it as a list of rows; cached as JSON."""
+        key = OCRCache.key(
+            img,
+            kind="table",
+            lang=lang,
+            oem=oem,
+            preprocess={**preprocess_defaults, **(preprocess or {})},
+            version=[preprocess_version, table_version],
+        )
+        cached = self.cache.get(key)
+
+        if cached is not None:
+            return json.loads(cached)
+
+        with span("ocr.preprocess", size=img.size):
+            img = self._preprocess_for_ocr(img, preprocess)
+
+        table = extract_table(img, self.engine, lang=lang, oem=oem)
+        self.cache.put(key, json.dumps(table, ensure_ascii=False))
+
+        return table
+
+    def refine_layout(self, img, layout, lang="eng", oem=3, preprocess=None) -> Layout:
+        """
+        OCR again only the lines read with low confidence, instead of the whole snip.
+        Each line crop is read with every refine_variants setting, in parallel; the most
+        confident reading of each line is kept, if better than the first, and about as
+        long; see min_refine_chars.
+        """
+        lines = [
+            (layout.mean_conf(start, end), start, end) for start, end in layout.lines()
+        ]
+        weak = sorted(line for line in lines if line[0] < low_conf)[:max_refine_lines]
+
+        if not weak:
+            return layout
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        best = {}
+
+        with (
+            span("ocr.refine", lines=len(weak), variants=len(refine_variants)),
+            ThreadPoolExecutor(refine_workers, "refine") as pool,
+        ):
+            jobs = []
+
+            for conf, start, end in weak:
+                box = _pad_box(layout.box(start, end), img.size, refine_pad)
+                crop = img.crop(box)
+                futures = [
+                    pool.submit(
+                        self.ocr_layout,
+                        crop,
+                        lang,
+                        psm,
+                        oem,
+                        {**(preprocess or {}), **stages},
+                    )
+                    for stages, psm in refine_variants
+                ]
+                chars = len(" ".join(layout.texts[start:end]))
+                jobs.append((conf, chars * min_refine_chars, start, box, futures))
+
+            for conf, min_chars, start, box, futures in jobs:
+                for future in futures:
+                    try:
+                        candidate = future.result()
+                    except Exception:
+                        continue  # Eg a crop too small for Tesseract.
+
+                    # A confident fragment, eg one word of the line, is not a better reading.
+                    if (
+                        candidate.mean_conf() > conf
+                        and len(" ".join(candidate.texts)) >= min_chars
+                    ):
+                        conf = candidate.mean_conf()
+                        best[start] = (box, candidate)
+
+        if not best:
+            return layout
+
+        words = []
+
+        for start, end in layout.lines():
+            if start not in best:
+                words.extend(layout.words(start, end))
+                continue
+
+            (left, top, _, _), candidate = best[start]
+            first = layout.words(start, start + 1)[0]
+
+            # Crop boxes back to snip pixels; the line keeps its place in the paragraph.
+            words.extend(
+                {
+                    **word,
+                    "left": word["left"] + left,
+                    "top": word["top"] + top,
+                    "block_num": first["block_num"],
+                    "par_num": first["par_num"],
+                    "line_num": first["line_num"],
+                }
+                for word in candidate.words()
+            )
+
+        return Layout.from_words(words, layout.size)
+
+    def detect_script(self, img, preprocess=None) -> str:
+        """Writing system of the text in an image, eg "Latin"; "" if undetected. Cached."""
+        key = OCRCache.key(img, kind="osd", preprocess=preprocess, version=1)
+        script = self.cache.get(key)
+
+        if script is None:
+            try:
+                with span("ocr.osd", size=img.size):
+                    script = self.engine.detect_script(
+                        self._preprocess_for_ocr(img, preprocess)
+                    )
+            except Exception:
+                script = ""  # Too little text, or osd.traineddata not installed.
+
+            self.cache.put(key, script)
+
+        return script
+
+    def pick_lang(self, img, lang, psm=3, oem=3, preprocess=None) -> str:
+        """
+        Narrow a combined language setting, eg "fra+eng+deu", to the language of the snip.
+        Fewer models make Tesseract faster, and reduce mix-ups between languages.
+        The script is detected first; languages sharing it are told apart by a first
+        pass with one model. That pass is cached, so it is reused if its guess holds.
+        """
+        langs = split_langs(lang)
+
+        if len(langs) < 2:
+            return lang
+
+        langs = langs_for_script(langs, self.detect_script(img, preprocess))
+
+        if len(langs) == 1:
+            return langs[0]
+
+        text = self.ocr_text(img, langs[0], psm, oem, preprocess)
+
+        return guess_lang(text, langs) or "+".join(langs)
+
+    def warm(self, lang, oem=3, detect=False) -> None:
+        """
+        Load language data in the background, ready for the first capture.
+        :param detect: Also load the single language models that pick_lang may choose.
+        """
+        codes = [lang, *split_langs(lang)] if detect else [lang]
+
+        def load():
+            try:
+                for code in dict.fromkeys(codes):
+                    self.engine.warm(code, oem)
+            except Exception as e:
+                display_message("WARN", f'Language data "{lang}" not loaded.', f"{e}")
+
+        threading.Thread(target=load, daemon=True).start()
+
     # FUTURE formatting detection; boldface, italics, variable font face
-    def process_img(self, img, entry_type, lang="eng") -> tuple:
+    def process_img(
+        self, img, entry_type, lang="eng", preprocess=None, ocr=None
+    ) -> tuple:
         """
         Extract contents from the snipped image.
+        :param lang: Tesseract languages of the project; eg "fra+eng+deu".
+        :param preprocess: Project overrides of preprocess_defaults.
+        :param ocr: Project, or entry overrides of ocr_defaults.
+        :return: The content, the languages it was read with, and the Layout of text.
         """
+        settings = {**ocr_defaults, **(ocr or {})}
+        psm, oem = settings["psm"], settings["oem"]
+        layout = None
+
         try:
             processed_item = img
 
-            if not entry_type == "image":
-                img = self._preprocess_for_ocr(img)
-
             match entry_type:
                 case "image":
                     image = ""
                     processed_item = image
 
                 case "text":
-                    text = pytesseract.image_to_string(
-                        img, lang=lang, config=r"--oem 3 --psm 3"
-                    )
+                    if settings["detect"]:
+                        lang = self.pick_lang(img, lang, psm, oem, preprocess)
+
+                    layout = self.ocr_layout(img, lang, psm, oem, preprocess)
 
-                    processed_item = text
+                    if settings["refine"]:
+                        layout = self.refine_layout(img, layout, lang, oem, preprocess)
+
+                    processed_item = layout.text()
 
                 case "table":
-                    table = ""
+                    table = self.ocr_table(img, lang, oem, preprocess)
+
                     processed_item = table
 
-            return processed_item, lang
+            return processed_item, lang, layout
 
         except Exception as e:
             display_message("WARN", "OCR text extraction failed.", f"{e}")
-            return "", lang
+            return "", lang, None
 
 
 class RegistryManager:
-    def __init__(self):
+    def __init__(self, app_parent=""):
+        """
+        :param app_parent: The folder holding user_data; defaults to the folder of the app.
+        """
         # Default running as a py script
         current_dir = path.abspath(path.dirname(__file__))
 
@@ -205,7 +527,7 @@ class RegistryManager:
             current_dir = path.dirname(path.abspath(sys.executable))
 
         # Move one level up if script is in 'dist' folder.
-        self.app_parent = (
+        self.app_parent = app_parent or (
             path.dirname(current_dir)
             if path.basename(current_dir).lower() == "dist"
             else current_dir
@@ -217,7 +539,9 @@ class RegistryManager:
         if not path.exists(self.user_data_path):
             os.makedirs(self.user_data_path)
 
-        self.ocr_manager = OCRManager(self.user_data_path)
+        self._ocr_manager = None  # Set up on first use; see ocr_manager.
+        # Index handles kept between searches; see search_all.
+        self._global_search = None
 
         # self.paths_csv = path.join(self.user_data_path, paths_csv)
         self.registry_path = path.join(self.user_data_path, registry_name)
@@ -226,38 +550,65 @@ class RegistryManager:
         # self.tesseract_path = self._config_tesseract_path()
         # pytesseract.pytesseract.tesseract_cmd = self.tesseract_path
         # self._clean_up_files_path()  # Wipe CSV file, and save only the correct path.
-        self.projects = _load_log(self.registry_path)
+        self.projects = []
+        self.by_path = {}  # path -> project; duplicate checks without scanning the list
+        self.signature = None  # Size, and mtime of registry.json when last read
+        self._changed = {}  # path -> project added, or updated by this instance
+        self._reload()
         # _save_to_log(self.registry_path, self.projects)
 
-    def add_project(self, name, project_path, lang="eng") -> bool:
+        self.missing = self.validate_paths()
+
+    @property
+    def ocr_manager(self):
+        """
+        The OCR engine; only located, and loaded, when first needed.
+        Listing, and adding projects never waits on Tesseract.
+        """
+        if self._ocr_manager is None:
+            self._ocr_manager = OCRManager(self.user_data_path)
+
+        return self._ocr_manager
+
+    def add_project(
+        self, name, project_path, lang="eng", storage=default_storage
+    ) -> bool:
         """
         Adds a new project to the registry.
         :param name: The name of the project; typically the name of the research project.
         :param project_path: The path to the project directory.
+        :param storage: The log backend for the project; one of storage_types.
         :return: None
         """
         abs_path = path.abspath(project_path)
         formatted_path = abs_path if os.sep == "/" else abs_path.replace(os.sep, "/")
 
         # Check for duplicate paths.
-        for proj in self.projects:
-            if proj["path"] == formatted_path:
-                display_message("WARN", "Project already exists in registry.")
-                return False
+        if formatted_path in self.by_path:
+            display_message("WARN", "Project already exists in registry.")
+            return False
 
-        self.projects.append(
-            {
-                "name": name,
-                "path": formatted_path,
-                "lang": lang,
-                "created": _set_timestamp(),
-            }
-        )
-        _save_to_log(self.registry_path, self.projects)
+        project = {
+            "name": name,
+            "path": formatted_path,
+            "lang": lang,
+            "storage": storage,
+            "created": _set_timestamp(),
+        }
+        self.projects.append(project)
+        self.by_path[formatted_path] = project
+
+        if not self._save_registry(project):
+            # Not in registry.json; forget it, so a later save does not add it unasked.
+            self._changed.pop(formatted_path, None)
+            self.projects = [item for item in self.projects if item is not project]
+            self.by_path = {item["path"]: item for item in self.projects}
+            return False
 
         display_message("INFO", f'Project "{name}" added to registry.')
 
-        if self.initialise_project(len(self.projects)):
+        # Projects saved meanwhile by another instance may now precede this one.
+        if self.initialise_project(self.projects.index(project) + 1):
             return True
 
         return True
@@ -297,20 +648,227 @@ class RegistryManager:
 
             return False
 
+    def set_storage(self, project_number, storage) -> bool:
+        """
+        Switch the log backend of a project, and migrate existing entries, and tags to it.
+        :param project_number: The project number corresponding to the project name
+        :param storage: The log backend for the project; one of storage_types.
+        :return: Whether the switch was successful
+        """
+        if not (1 <= project_number <= len(self.projects)):
+            display_message("WARN", "Project number out of range.")
+            return False
+
+        if storage not in storage_types:
+            display_message("WARN", f"Storage must be one of {storage_types}.")
+            return False
+
+        project = self.projects[project_number - 1]
+        project_path = project["path"]
+        current_storage = project.get("storage", default_storage)
+
+        if storage == current_storage:
+            display_message(
+                "INFO", f'Project "{project["name"]}" already uses {storage}.'
+            )
+            return True
+
+        log_path = path.join(project_path, research_log)
+        source = open_log(log_path, current_storage)
+        entries = source.load()
+        source_tags = TagManager(project_path, current_storage)
+        tag_items = source_tags.index.items()
+
+        # Copies of the old backend's files; the migration may rewrite, or replace them.
+        backups = _back_up(_backend_files(project_path, current_storage))
+
+        if backups is None:
+            display_message("WARN", "Storage migration cancelled; backup failed.")
+            return False
+
+        # Write all entries, and tags to the new backend, before the registry points to it.
+        target = open_log(log_path, storage)
+
+        if storage == "sqlite":
+            migrated = target.replace(entries, tag_items)
+        else:
+            migrated = target.replace(entries)
+
+            if migrated and current_storage == "sqlite":
+                tags_path = path.join(project_path, tags)
+                tag_names = [name for _, name, _ in tag_items]
+                migrated = _save_to_log(tags_path, tag_names, quiet=True)
+                TagIndex(tags_path, tag_names, log_path).replace(tag_items)
+
+        # Read back from disk, by new stores; the target may hold the entries in memory.
+        # Every field of every entry, and every tag with its ID must have survived.
+        if migrated:
+            tag_ids = {(tag_id, name) for tag_id, name, _ in tag_items}
+            stored_entries, stored_tags = _read_back(project_path, storage)
+            migrated = stored_entries == entries and tag_ids <= set(stored_tags)
+
+        if migrated:
+            project["storage"] = storage
+
+            if not self._save_registry(project):
+                project["storage"] = current_storage
+                migrated = False
+
+        if not migrated:
+            _restore(backups)
+            display_message("WARN", "Storage migration failed; project unchanged.")
+            return False
+
+        # Files the new backend does not use would be a stale copy; a backup is kept.
+        if current_storage == "sqlite":
+            source.conn.close()
+            source_tags.index.store.conn.close()
+
+        stale = _backend_files(project_path, current_storage)
+        stale -= _backend_files(project_path, storage)
+
+        for file_path in sorted(stale & set(backups)):
+            try:
+                os.remove(file_path)
+            except OSError as e:
+                display_message("WARN", "Old log file not removed.", f"{e}")
+
+        display_message("INFO", f'Project "{project["name"]}" now uses {storage} log.')
+        display_message(
+            "INFO",
+            "Previous log files kept as backups.",
+            "\n".join(path.basename(backup) for backup in sorted(backups.values())),
+        )
+
+        return True
+
+    def search_all(self, text, tags="", limit=50) -> list:
+        """
+        Full-text search across every registered project; best matches first.
+        :param tags: Optional tag query; eg "LAW NOT <1900-1999>".
+        :return: Dicts of project, card, score, snippet, and entry.
+        """
+        if self._global_search is None:
+            self._global_search = GlobalSearch(research_log)
+
+        return self._global_search.search(self.projects, text, tags, limit)
+
+    def validate_paths(self, workers=16) -> list:
+        """
+        Check that each project folder still exists; folders are checked concurrently,
+        so a slow, or disconnected network drive does not hold up the others.
+        :return: The numbers of projects whose folder is missing.
+        """
+        if not self.projects:
+            return []
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        def is_folder(project):
+            try:
+                return stat.S_ISDIR(os.stat(project["path"]).st_mode)
+            except OSError:
+                return False
+
+        with ThreadPoolExecutor(min(workers, len(self.projects))) as pool:
+            found = list(pool.map(is_folder, self.projects))
+
+        missing = [number for number, ok in enumerate(found, 1) if not ok]
+
+        for number in missing:
+            project = self.projects[number - 1]
+            display_message(
+                "WARN",
+                f'Project "{project["name"]}" folder not found.',
+                project["path"],
+            )
+
+        return missing
+
+    def _reload(self) -> None:
+        """Read registry.json; projects changed by this instance replace their stored copy."""
+        self.signature = _file_signature(self.registry_path)
+        self.projects = _load_log(self.registry_path)
+        positions = {project["path"]: n for n, project in enumerate(self.projects)}
+
+        for project_path, project in self._changed.items():
+            if project_path in positions:
+                self.projects[positions[project_path]] = project
+            else:
+                self.projects.append(project)
+
+        self.by_path = {project["path"]: project for project in self.projects}
+
+    def _save_registry(self, project) -> bool:
+        """
+        Write a project added, or changed, to registry.json, under a lock.
+        Projects saved by other instances since the registry was read are merged, not lost.
+        """
+        self._changed[project["path"]] = project
+
+        try:
+            with file_lock(self.registry_path):
+                if _file_signature(self.registry_path) != self.signature:
+                    self._reload()
+
+                saved = _save_to_log(self.registry_path, self.projects)
+                self.signature = _file_signature(self.registry_path)
+
+                return saved
+
+        except TimeoutError as e:
+            display_message("WARN", "Registry save failed.", f"{e}")
+            return False
+
+
+def export_json(project, folder_path) -> bool:
+    """
+    Write a project, from any backend, as research_log.json, tags.json, and tags_index.json.
+    :param project: The project's registry entry.
+    """
+    storage = project.get("storage", default_storage)
+    log_store = open_log(path.join(project["path"], research_log), storage)
+    tag_items = TagManager(project["path"], storage).index.items()
+    tags_path = path.join(folder_path, tags)
+    tag_names = [name for _, name, _ in tag_items]
+
+    os.makedirs(folder_path, exist_ok=True)
+
+    if not _save_to_log(path.join(folder_path, research_log), log_store.load()):
+        return False
+
+    _save_to_log(tags_path, tag_names, quiet=True)
+    TagIndex(tags_path, tag_names, path.join(folder_path, research_log)).replace(
+        tag_items
+    )
+    display_message("INFO", f'Project "{project["name"]}" exported.')
+    display_path_desc(folder_path, "folder")
+
+    return True
+
 
 class TagManager:
-    def __init__(self, project_path) -> None:
+    def __init__(self, project_path, storage=default_storage) -> None:
         self.tags_path = path.normpath(path.join(project_path, tags))
-        self.tags_list = _load_log(self.tags_path)
+        self.storage = storage
+        log_path = path.join(project_path, research_log)
+
+        if storage == "sqlite":  # Tag library lives in the project store.
+            self.tags_list = []
+            self.index = SqliteTagIndex(open_log(log_path, storage))
+        else:
+            self.tags_list = _load_log(self.tags_path)
+            self.index = TagIndex(self.tags_path, self.tags_list, log_path)
 
     def list_tags(self):
         """List tags currently used in the project."""
-        if not self.tags_list:
+        if not self.index:
             display_message("INFO", "No tags currently defined.")
             return
 
         # Determine number of rows for layout; with the number of columns limited to 4
-        num_tags = len(self.tags_list)
+        items = self.index.items()
+        num_tags = len(items)
         num_cols = 4
         col_width = 25
         text_limit = 20
@@ -325,8 +883,7 @@ class TagManager:
                 index = r + (c * rows)
 
                 if index < num_tags:
-                    tag_name = self.tags_list[index]
-                    tag_id = index + 1
+                    tag_id, tag_name, _ = items[index]
                     display_text = f"[{tag_id}] {tag_name}"
 
                     if len(display_text) > text_limit:
@@ -347,25 +904,21 @@ class TagManager:
         """
         raw_items = [item.strip() for item in user_input.split(",") if item.strip()]
         final_tags = []
+        selected = set()
         updated = False
 
         for item in raw_items:
             # Handle tag IDs (no cleaning).
             if item.isdigit():
-                idx = int(item) - 1
-
-                if 0 <= idx < len(self.tags_list):
-                    tag_name = self.tags_list[idx]
-
-                    if tag_name not in final_tags:
-                        final_tags.append(tag_name)
-
-                    continue
+                tag_name = self.index.name(int(item))
 
-                else:
+                if tag_name is None:
                     display_message("WARN", f"Tag number ({item}) out of range.")
+                elif tag_name not in selected:
+                    final_tags.append(tag_name)
+                    selected.add(tag_name)
 
-                    continue
+                continue
 
             def clean_item(c):
                 return "".join(char for char in c if char.isalnum())
@@ -399,85 +952,502 @@ class TagManager:
                 tag_name = clean_word.upper()
 
             # Finalise master list and selection.
-            if tag_name not in self.tags_list:
+            if tag_name not in self.index:
+                self.index.add(tag_name)
                 self.tags_list.append(tag_name)
                 updated = True
 
-            if tag_name not in final_tags:
+            if tag_name not in selected:
                 final_tags.append(tag_name)
+                selected.add(tag_name)
 
         if updated:
-            _save_to_log(self.tags_path, self.tags_list)
+            if self.storage != "sqlite":
+                _save_to_log(self.tags_path, self.tags_list)
+
+            self.index.save()
 
         return final_tags
 
+    def record_usage(self, entry_tags) -> None:
+        """Update tag usage counts, once an entry using the tags is saved."""
+        self.index.record_usage(entry_tags)
+        self.index.save()
+
 
 class TextEntry:
-    def __init__(self, project_path, tags_manager, ocr_manager):
-        """Initialise with the path to the active project."""
+    def __init__(
+        self,
+        project_path,
+        tags_manager,
+        ocr_manager,
+        storage=default_storage,
+        preprocess=None,
+        lang="eng",
+        ocr=None,
+        cleanup=None,
+    ):
+        """
+        Initialise with the path to the active project, its log backend, and OCR settings.
+        :param lang: Tesseract languages of the project; eg "fra+eng+deu".
+        :param ocr: Project overrides of ocr_defaults.
+        :param cleanup: Project overrides of Cleanup.cleanup_defaults.
+        """
         self.project_path = project_path
+        self.preprocess = preprocess
+        self.lang = lang
+        self.ocr = {**ocr_defaults, **(ocr or {})}
+        self.cleanup = cleanup
+        self._ocr_pool = None  # Threads OCR-ing snips; started on first capture.
         self.log_path = path.join(project_path, research_log)
+        self.layout_path = path.join(project_path, img_folder, layout_folder)
         self.tags_manager = tags_manager
         self.ocr_manager = ocr_manager
-        self.log = _load_log(self.log_path)
+        self.log_store = open_log(self.log_path, storage)  # Loaded lazily, if at all.
+        self.project_index = ProjectIndex(project_path, self.log_store)
+        set_project(project_path)  # Timing records, when enabled, go to the project.
+        ocr_manager.warm(lang, self.ocr["oem"], self.ocr["detect"])
 
     def capture_entry(self):
-        """The main workflow for capturing a text entry"""
+        """
+        The main workflow for capturing a text entry.
+        The snip is taken first; OCR runs in the background while the metadata is entered.
+        """
         print("\n>>> Create new text entry ... ")
 
+        # Take a screen snip, and capture the content.
+        img = _capture_img("text")
+
+        if not img:
+            return False  # Either user cancelled, no image in clipboard
+
+        ocr = self.submit_ocr(img)
+
         # Prompt user for entry metadata.
         metadata = _capture_meta(self.tags_manager)
-        text_detected = False
-        content = None
-        lang = None
-        while not text_detected:
-            img = _capture_img("text")  # Take a screen snip, and capture the content.
+        result = self._review_text(img, ocr)
+
+        if result is None:
+            return False
+
+        content, lang, layout = result
+        sidecar = _layout_sidecar(layout)
+        entry = _compile_entry("text", content, lang, metadata, sidecar[0])
+
+        if not _save_entries(
+            self.log_store, [entry], self.tags_manager, self.project_index
+        ):
+            return False
+
+        _store_layouts([sidecar], self.layout_path)
+
+        return True
+
+    def capture_queue(self) -> int:
+        """
+        Take several snips in a row, then enter the metadata of each, in order.
+        Each snip is OCR'd in the background as soon as it is taken; all entries are saved in one write.
+        :return: The number of entries saved.
+        """
+        print("\n>>> Queue text entries; cancel when done snipping ... ")
+
+        queued = []
+
+        while True:
+            img = _capture_img("text")
 
             if not img:
-                return False  # Either user cancelled, no image in clipboard
+                break
+
+            queued.append((img, self.submit_ocr(img)))
+            display_message("INFO", f"Snip {len(queued)} queued.")
+
+        entries = []
+        sidecars = []
+
+        for number, (img, ocr) in enumerate(queued, 1):
+            print(f"\n>>> Entry {number} of {len(queued)} ... ")
+
+            metadata = _capture_meta(self.tags_manager)
+            result = self._review_text(img, ocr)
+
+            if result is not None:
+                content, lang, layout = result
+                sidecars.append(_layout_sidecar(layout))
+                entries.append(
+                    _compile_entry("text", content, lang, metadata, sidecars[-1][0])
+                )
+
+        if entries and not _save_entries(
+            self.log_store, entries, self.tags_manager, self.project_index
+        ):
+            return 0
+
+        _store_layouts(sidecars, self.layout_path)
+
+        return len(entries)
+
+    def watch_clipboard(self, metadata, interval=None, emit=None) -> int:
+        """
+        Capture every image copied to the clipboard, until Ctrl+C; no prompts between snips.
+        Each is OCR'd in the background; finished entries are saved in batches.
+        :param metadata: (title, source, notes, tags) for every entry; a blank title is
+            taken from the first line of each entry's text.
+        :param interval: Seconds between clipboard polls; Clipboard.watch_interval if None.
+        :param emit: Called with each saved entry; eg to print it.
+        :return: The number of entries saved.
+        """
+        from Clipboard import ClipboardWatcher, watch_interval
+
+        watcher = ClipboardWatcher()
+        pending = []  # Futures of (content, lang, layout), in snip order
+        queued = saved = 0
+        held = 0  # Snips kept by a failed save; retried on the timer, not every poll
+        last_save = time.monotonic()
+
+        display_message("INFO", "Watching the clipboard; press Ctrl+C to stop.")
+
+        try:
+            while True:
+                img = watcher.poll()
+
+                if img is not None:
+                    pending.append(self.submit_ocr(img))
+                    queued += 1
+                    display_message("INFO", f"Snip {queued} queued.")
+
+                due = time.monotonic() - last_save >= watch_save_interval
+
+                if len(pending) - held >= watch_batch or (pending and due):
+                    # Ctrl+C waits for the save; pending must match what was written.
+                    with _deferred_interrupt():
+                        saved += self._save_watched(pending, metadata, emit)
+
+                    held = sum(1 for future in pending if future.done())
+                    last_save = time.monotonic()
+
+                time.sleep(interval or watch_interval)
+
+        except KeyboardInterrupt:
+            display_message("INFO", "Stopped watching; saving the remaining snips ...")
+
+        saved += self._save_watched(pending, metadata, emit, wait=True)
+        self.close()
+
+        if pending:
+            display_message("WARN", f"{len(pending)} snips not saved.")
+
+        display_message("INFO", f"Watch mode complete; {saved} saved.")
+
+        return saved
+
+    def _save_watched(self, pending, metadata, emit=None, wait=False) -> int:
+        """
+        Save the snips of watch mode whose OCR is done; removed from pending once saved.
+        If saving fails they stay pending, and are saved with the next batch.
+        :param wait: Wait for every snip; when watching stops.
+        :return: The number of entries saved.
+        """
+        title, source, notes, entry_tags = metadata
+        done = [future for future in pending if wait or future.done()]
+        entries = []
+        sidecars = []
+
+        for future in done:
+            content, lang, layout = future.result()
+
+            if not content:
+                display_message("SKIP", "No text detected in snip.")
+                pending.remove(future)
+                continue
+
+            entry_title = title or content.split("\n", 1)[0][:title_length]
+            sidecars.append(_layout_sidecar(layout))
+            entries.append(
+                _compile_entry(
+                    "text",
+                    content,
+                    lang,
+                    (entry_title, source, notes, entry_tags),
+                    sidecars[-1][0],
+                )
+            )
+
+        if not entries:
+            return 0
 
-            content, lang = self.ocr_manager.process_img(img, "text")
+        if not _save_entries(
+            self.log_store, entries, self.tags_manager, self.project_index
+        ):
+            display_message("WARN", f"{len(entries)} snips not saved; kept to retry.")
+            return 0
+
+        _store_layouts(sidecars, self.layout_path)
+
+        for future in done:
+            if future in pending:
+                pending.remove(future)
+
+        if emit:
+            for entry in entries:
+                emit(entry)
+
+        return len(entries)
+
+    def submit_ocr(self, img, settings=None):
+        """
+        OCR, and clean up a snip on a background thread.
+        :param settings: Overrides of the project's OCR settings, for this snip.
+        :return: A future of (content, lang, layout); the layout is stored once saved.
+        """
+        if self._ocr_pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._ocr_pool = ThreadPoolExecutor(capture_workers, "capture")
+
+        return self._ocr_pool.submit(
+            self._ocr_snip, img, {**self.ocr, **(settings or {})}
+        )
+
+    def close(self) -> None:
+        """Wait for queued snips to finish."""
+        if self._ocr_pool is not None:
+            self._ocr_pool.shutdown()
+            self._ocr_pool = None
+
+    def _ocr_snip(self, img, settings) -> tuple:
+        with span("capture.ocr"):
+            content, lang, layout = self.ocr_manager.process_img(
+                img, "text", self.lang, self.preprocess, settings
+            )
+        with span("capture.cleanup"):
             content = self._clean_up_text(content)
 
+        return content, lang, layout
+
+    def _review_text(self, img, ocr):
+        """
+        Wait for the OCR of a snip, then save, edit, or redo it.
+        :param ocr: Future of (content, lang, layout), from submit_ocr.
+        :return: (content, lang, layout), or None if the entry was cancelled.
+        """
+        settings = dict(self.ocr)  # Changed for this entry only, with [O].
+
+        while True:
+            if img is None:
+                img = _capture_img("text")
+
+                if not img:
+                    return None
+
+                ocr = self.submit_ocr(img, settings)
+
+            with span("capture.wait"):
+                content, lang, layout = ocr.result()
+
             if not content:
                 display_message("WARN", "No text detected.")
 
                 retry_snip = None
-                while retry_snip not in ["R", "C"]:
+                while retry_snip not in ["R", "O", "C"]:
                     print("\n>>> Select an option to continue :")
                     print(">>>  [R]etry taking a screenshot.")
+                    print(">>>  [O]CR again, with other settings.")
                     print(">>>  [C]ancel text entry.")
 
                     retry_snip = input("\n>>> ").strip().upper()
 
                     if retry_snip == "R":
                         display_message("INFO", "Retry snipping.")
+                        img = None
+                    elif retry_snip == "O":
+                        settings = _capture_ocr_settings(settings)
+                        ocr = self.submit_ocr(img, settings)
                     elif retry_snip == "C":
                         display_message("WARN", "Text entry cancelled.")
-                        return False
+                        return None
                     else:
-                        display_message("WARN", 'Enter one of the options ["R", "C"].')
+                        display_message(
+                            "WARN", 'Enter one of the options ["R", "O", "C"].'
+                        )
 
-            display_message("INFO", "Text entry captured.")
+                continue
+
+            display_message("INFO", f"Text entry captured ({lang}).")
             print(f"<=> CONTENT :\n{content}")
 
             save_entry = None
-            while save_entry not in ["S", "E"]:
+            while save_entry not in ["S", "E", "O", "F"]:
                 save_entry = (
-                    input("\n>>> [S]ave entry to file, or [E]dit text entry ... ")
+                    input(
+                        "\n>>> [S]ave entry to file, [E]dit text entry, "
+                        "[O]CR again with other settings, "
+                        "or [F]ix low confidence lines ... "
+                    )
                     .strip()
                     .upper()
                 )
                 if save_entry == "E":
-                    content = self._edit_text()
-                    text_detected = True
+                    return self._edit_text(), lang, layout
                 elif save_entry == "S":
-                    text_detected = True
+                    return content, lang, layout
+                elif save_entry == "O":
+                    settings = _capture_ocr_settings(settings)
+                    ocr = self.submit_ocr(img, settings)
+                elif save_entry == "F":
+                    # The first pass is cached; only the weak lines are OCR'd again.
+                    if settings["refine"]:
+                        display_message("INFO", "Low confidence lines already fixed.")
+                        save_entry = None
+                        continue
+
+                    settings = {**settings, "refine": True}
+                    ocr = self.submit_ocr(img, settings)
+                else:
+                    display_message(
+                        "WARN", 'Enter one of the options ["S", "E", "O", "F"].'
+                    )
+
+    def add_image(self, img, metadata, entry_type="text", ocr=None):
+        """
+        Create, and save an entry from an image, without prompts; for scripted imports.
+        :param metadata: (title, source, notes, tags), as returned by _capture_meta.
+        :param entry_type: "text", or "table".
+        :param ocr: Overrides of the project's OCR settings, for this entry.
+        :return: The saved entry, or None if nothing was detected, or saving failed.
+        """
+        content, lang, layout = self.ocr_manager.process_img(
+            img, entry_type, self.lang, self.preprocess, {**self.ocr, **(ocr or {})}
+        )
+
+        if entry_type == "text":
+            content = self._clean_up_text(content)
+
+        if not content:
+            display_message("WARN", f"No {entry_type} detected.")
+            return None
+
+        sidecar = _layout_sidecar(layout)
+        entry = _compile_entry(entry_type, content, lang, metadata, sidecar[0])
+
+        if not _save_entries(
+            self.log_store, [entry], self.tags_manager, self.project_index
+        ):
+            return None
+
+        _store_layouts([sidecar], self.layout_path)
+
+        return entry
+
+    def capture_folder(
+        self, folder_path, tag_input="", workers=None, source="", notes=""
+    ) -> tuple:
+        """
+        Create a text entry for each image in a folder; OCR runs in parallel, one process per core.
+        Entries are titled by file name, and saved to the log in a single write.
+        :param tag_input: Tags applied to every entry; same format as the tags prompt.
+        :param workers: Number of worker processes; defaults to the number of CPUs.
+        :param source: Source of every entry; defaults to the path of each image file.
+        :return: The number of entries saved, and a list of (file name, error) for failed files.
+        """
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        folder_path = path.abspath(folder_path)
+        files = sorted(
+            entry.path
+            for entry in os.scandir(folder_path)
+            if entry.is_file() and path.splitext(entry.name)[1].lower() in image_exts
+        )
+
+        if not files:
+            display_message("WARN", "No image files found.")
+            display_path_desc(folder_path, "folder")
+            return 0, []
+
+        entry_tags = self.tags_manager.resolve_tags(tag_input)
+        workers = min(workers or os.cpu_count() or 1, len(files))
+        results = {}
+        errors = []
+
+        display_message(
+            "INFO", f"Processing {len(files)} images ({workers} workers) ..."
+        )
+
+        with (
+            span("batch.ocr", files=len(files), workers=workers),
+            ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_ocr_worker,
+                initargs=(
+                    self.ocr_manager.user_data_path,
+                    self.ocr_manager.tesseract_path,
+                    self.ocr_manager.engine.name,
+                ),
+            ) as pool,
+        ):
+            futures = [
+                pool.submit(
+                    _ocr_file,
+                    file_path,
+                    self.lang,
+                    self.preprocess,
+                    self.ocr,
+                    self.cleanup,
+                )
+                for file_path in files
+            ]
+
+            for done, future in enumerate(as_completed(futures), 1):
+                file_path, content, lang, layout, error = future.result()
+                base_name = path.basename(file_path)
+
+                if error:
+                    errors.append((base_name, error))
+                elif not content:
+                    errors.append((base_name, "No text detected."))
                 else:
-                    display_message("WARN", 'Enter one of the options ["S", "E"].')
+                    results[file_path] = (content, lang, layout)
+
+                status = "ERROR" if error else "OK" if content else "EMPTY"
+                print(
+                    f"<=>  [{done:>{len(str(len(files)))}}/{len(files)}] {status:<5} {base_name}"
+                )
+
+        # Keep the folder order in the log, regardless of completion order.
+        entries = []
+        sidecars = []
+
+        for file_path in files:
+            if file_path not in results:
+                continue
+
+            content, lang, layout = results[file_path]
+            metadata = (
+                path.splitext(path.basename(file_path))[0],
+                source or file_path,
+                notes,
+                entry_tags,
+            )
+            sidecars.append(_layout_sidecar(layout))
+            entries.append(
+                _compile_entry("text", content, lang, metadata, sidecars[-1][0])
+            )
+
+        for base_name, error in errors:
+            display_message("SKIP", base_name, error)
+
+        if entries and not _save_entries(
+            self.log_store, entries, self.tags_manager, self.project_index
+        ):
+            return 0, errors
 
-        self.log.append(_compile_entry("text", content, lang, metadata))
-        return _save_to_log(self.log_path, self.log)
+        _store_layouts(sidecars, self.layout_path)
+
+        display_message(
+            "INFO",
+            f"Batch import complete; {len(entries)} saved, {len(errors)} failed.",
+        )
+        return len(entries), errors
 
     # FUTURE method to allow user edit a prefilled environment with the detected text; using notepad or similar
     def _edit_text(self):
@@ -486,17 +1456,410 @@ class TextEntry:
 
         return content
 
-    # FUTURE Implement text clean up; unnecessary line-breaks, numbered/bullet lists.
-    def _clean_up_text(self, text):
-        return text.strip()
+    def _clean_up_text(self, text) -> str:
+        """Rejoin hard-wrapped lines, and split words; keep lists. See Cleanup."""
+        return clean_text(text, self.cleanup)
+
+
+class ImageEntry:
+    def __init__(
+        self, project_path, tags_manager, storage=default_storage, encoding=asset_format
+    ):
+        """
+        Initialise with the path to the active project, and its log backend.
+        :param encoding: Image format of stored assets; "webp", or "png".
+        """
+        self.project_path = project_path
+        self.asset_path = path.join(project_path, img_folder)
+        self.encoding = encoding
+        self.tags_manager = tags_manager
+        self.log_store = open_log(path.join(project_path, research_log), storage)
+        self.project_index = ProjectIndex(project_path, self.log_store)
+        self._encoder = None  # Thread encoding snips; started on first capture.
+        set_project(project_path)
+
+    def capture_entry(self):
+        """
+        The main workflow for capturing an image entry.
+        The snip is taken first, so it is encoded while the entry metadata is entered.
+        """
+        print("\n>>> Create new image entry ... ")
+
+        img = _capture_img("image")
+
+        if not img:
+            return False  # Either user cancelled, no image in clipboard
+
+        asset = self.store_asset(img)
+        metadata = _capture_meta(self.tags_manager)
+
+        with span("image.wait"):
+            content = asset.result()
+
+        if not content:
+            return False
+
+        display_message("INFO", "Image entry captured.")
+        entry = _compile_entry("image", content, None, metadata)
+
+        return _save_entries(
+            self.log_store, [entry], self.tags_manager, self.project_index
+        )
+
+    def add_image(self, img, metadata):
+        """
+        Store an image, and save its entry, without prompts; for scripted imports.
+        :param metadata: (title, source, notes, tags), as returned by _capture_meta.
+        :return: The saved entry, or None if saving failed.
+        """
+        content = self.store_asset(img).result()
+
+        if not content:
+            return None
+
+        entry = _compile_entry("image", content, None, metadata)
+
+        if not _save_entries(
+            self.log_store, [entry], self.tags_manager, self.project_index
+        ):
+            return None
+
+        return entry
+
+    def store_asset(self, img):
+        """
+        Encode, and save an image to the assets folder, off the main thread.
+        :return: A future of the asset path, relative to the project; "" if saving failed.
+        """
+        if self._encoder is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._encoder = ThreadPoolExecutor(1, thread_name_prefix="encoder")
+
+        # Copied, so the clipboard image can be released while encoding.
+        return self._encoder.submit(
+            _store_asset, img.copy(), self.asset_path, self.encoding
+        )
+
+    def close(self) -> None:
+        """Wait for pending encodes to finish."""
+        if self._encoder is not None:
+            self._encoder.shutdown()
+            self._encoder = None
+
+
+def thumbnail_path(project_path, asset) -> str:
+    """Returns the thumbnail file of an image entry's asset path."""
+    return path.join(project_path, img_folder, thumb_folder, path.basename(asset))
+
+
+def _store_asset(img, asset_path, encoding) -> str:
+    """
+    Save an image, and its thumbnail, under a hash of the pixels.
+    Duplicate snips resolve to the existing file, and are not written again.
+    """
+    from PIL import features
+
+    if encoding == "webp" and not features.check("webp"):
+        encoding = "png"  # Pillow built without libwebp.
+
+    name = f"{_image_hash(img)}.{encoding}"
+    file_path = path.join(asset_path, name)
+    thumb_file = path.join(asset_path, thumb_folder, name)
+
+    try:
+        with span("image.encode", size=img.size, encoding=encoding):
+            # Creates the assets folder too, on a project's first image.
+            os.makedirs(path.dirname(thumb_file), exist_ok=True)
+
+            if not path.exists(file_path):
+                _save_image(img, file_path, encoding)
+
+            if not path.exists(thumb_file):
+                thumb = img.copy()
+                thumb.thumbnail(thumb_size)
+                _save_image(thumb, thumb_file, encoding)
+
+        return f"{img_folder}/{name}"
+
+    except Exception as e:
+        display_message("WARN", "Image save failed.", f"{e}")
+        return ""
+
+
+def _layout_sidecar(layout) -> tuple:
+    """
+    The word boxes of a text entry as bytes, and their sidecar file, named by a hash of the content.
+    :return: The sidecar path, relative to the project, and the bytes; ("", b"") if there are no words.
+    """
+    if layout is None or not len(layout):
+        return "", b""
+
+    data = layout.to_bytes()
+    name = f"{hashlib.blake2b(data, digest_size=16).hexdigest()}{layout_ext}"
+
+    return f"{img_folder}/{layout_folder}/{name}", data
+
+
+def _store_layouts(sidecars, layout_path) -> None:
+    """
+    Write sidecars from _layout_sidecar; only once their entries are saved, so a failed save
+    leaves no files behind. An entry whose sidecar is not written loads no layout.
+    """
+    for layout_file, data in sidecars:
+        if not layout_file:
+            continue
+
+        file_path = path.join(layout_path, path.basename(layout_file))
+
+        try:
+            if not path.exists(file_path):
+                os.makedirs(layout_path, exist_ok=True)
+
+                # Unique per writer; capture threads, and workers may save the same layout.
+                temp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+                with open(temp_path, "wb") as file:
+                    file.write(data)
+
+                os.replace(temp_path, file_path)
+
+        except OSError as e:
+            display_message("WARN", "Layout save failed.", f"{e}")
+
+
+@contextmanager
+def _deferred_interrupt():
+    """Hold back Ctrl+C until the block is done, then raise it; main thread only."""
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    interrupted = []
+    handler = signal.signal(signal.SIGINT, lambda *args: interrupted.append(True))
+
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGINT, handler)
+
+    if interrupted:
+        raise KeyboardInterrupt
+
+
+def _backend_files(project_path, storage) -> set:
+    """Files holding the entries, and tags of a project, in a log backend."""
+    log_path = path.join(project_path, research_log)
+    tag_files = {path.join(project_path, tags), path.join(project_path, tag_index_name)}
+
+    match storage:
+        case "sqlite":
+            return {
+                path.join(project_path, store_db + ext) for ext in ["", "-wal", "-shm"]
+            }
+        case "jsonl":
+            return {path.splitext(log_path)[0] + ".jsonl", log_path, *tag_files}
+        case _:
+            return {log_path, *tag_files}
+
+
+def _back_up(file_paths):
+    """
+    Copy each existing file to "<file>.bak"; replacing an older backup.
+    :return: File path to backup path; None if any copy failed.
+    """
+    backups = {}
+
+    for file_path in file_paths:
+        if not path.exists(file_path):
+            continue
+
+        try:
+            shutil.copy2(file_path, file_path + backup_ext)
+        except OSError as e:
+            display_message("WARN", "Backup failed.", f"{e}")
+            return None
+
+        backups[file_path] = file_path + backup_ext
+
+    return backups
+
+
+def _restore(backups) -> None:
+    """Put back files changed since _back_up, then remove the backups."""
+    for file_path, backup in backups.items():
+        try:
+            if path.exists(file_path) and filecmp.cmp(file_path, backup, shallow=False):
+                os.remove(backup)
+            else:
+                os.replace(backup, file_path)
+        except OSError as e:
+            display_message("WARN", "Log file not restored.", f"{e}")
+            display_path_desc(backup, "file")
+
+
+def _read_back(project_path, storage) -> tuple:
+    """Entries, and (id, name) of the tags of a project, read from disk by new stores."""
+    log_store = open_log(path.join(project_path, research_log), storage)
+    tags_manager = TagManager(project_path, storage)
+    stored = (
+        list(log_store.iter()),
+        [(tag_id, name) for tag_id, name, _ in tags_manager.index.items()],
+    )
+
+    if storage == "sqlite":
+        log_store.conn.close()
+        tags_manager.index.store.conn.close()
+
+    return stored
+
+
+def _image_hash(img) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{img.mode}:{img.size}:".encode())
+    digest.update(img.tobytes())
+
+    return digest.hexdigest()
+
+
+def _save_image(img, file_path, encoding) -> None:
+    """Write through a temp file, so an interrupted save leaves no partial asset."""
+    temp_path = file_path + ".tmp"
+
+    if encoding == "webp":
+        if img.mode not in ["RGB", "RGBA"]:
+            img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+
+        # Lossless keeps text in screenshots sharp; usually smaller than PNG.
+        img.save(temp_path, "WEBP", lossless=True, method=4)
+    else:
+        img.save(temp_path, "PNG", optimize=True)
+
+    os.replace(temp_path, file_path)
+
+
+def _save_entries(log_store, entries, tags_manager, project_index) -> bool:
+    """Append entries to the project log, then update the tag counts and indexes."""
+    with span("log.write", entries=len(entries)):
+        if not log_store.extend(entries):
+            return False
+
+    with span("tags.usage"):
+        tags_manager.record_usage([tag for entry in entries for tag in entry["tags"]])
+
+    with span("index.update", entries=len(entries)):
+        project_index.add(entries)
+
+    return True
+
+
+def _pad_box(box, size, pad) -> tuple:
+    """A (left, top, right, bottom) box grown by pad pixels, within an image of size."""
+    left, top, right, bottom = box
+    w, h = size
+
+    return (
+        max(0, left - pad),
+        max(0, top - pad),
+        min(w, right + pad),
+        min(h, bottom + pad),
+    )
+
+
+def _auto_scale(profile, dpi=None) -> float:
+    """
+    Upscale factor that brings text lines to target_x_height.
+    Rows count as text where their mean is well below the background; in a line, only
+    the rows between the baseline, and x-height are dense enough, not ascenders.
+    :param profile: Mean brightness of each row, with text darker than the background.
+    :param dpi: Image resolution; used when no text lines are found.
+    """
+    background = max(profile)
+    ink = background - max(4, (background - min(profile)) * 0.2)
+
+    # Heights of runs of consecutive rows containing text.
+    runs = []
+    run = 0
+    for p in profile + [background]:
+        if p < ink:
+            run += 1
+        elif run:
+            if run >= 3:  # Ignore rules, and underlines.
+                runs.append(run)
+            run = 0
+
+    if runs:
+        x_height = sorted(runs)[len(runs) // 2]
+        rs = target_x_height / x_height
+    elif dpi and dpi[0]:
+        rs = 300 / dpi[0]
+    else:
+        rs = 3
+
+    # Not worth resampling for a small gain.
+    if rs < 1.25:
+        return 1
+
+    return round(min(rs, max_scale), 1)
+
+
+def _build_lut(invert, threshold) -> list:
+    """Lookup table for inversion, and threshold; or an empty list if neither is set."""
+    if not invert and not threshold:
+        return []
+
+    levels = [255 - p if invert else p for p in range(256)]
+
+    if threshold:
+        return [255 if p > threshold else 0 for p in levels]
+
+    return levels
+
+
+_worker_ocr = None  # OCRManager of a batch import worker process
+
+
+def _init_ocr_worker(user_data_path, tesseract_path, engine) -> None:
+    global _worker_ocr
+    _worker_ocr = OCRManager(user_data_path, engine, tesseract_path)
+
+
+def _ocr_file(file_path, lang="eng", preprocess=None, ocr=None, cleanup=None) -> tuple:
+    """
+    Preprocess, OCR, and clean up an image file; runs in a batch import worker process.
+    :return: The file path, text, languages, Layout, and error message.
+    """
+    from PIL import Image
+
+    settings = {**ocr_defaults, **(ocr or {})}
+    psm, oem = settings["psm"], settings["oem"]
+
+    try:
+        with Image.open(file_path) as img:
+            if settings["detect"]:
+                lang = _worker_ocr.pick_lang(img, lang, psm, oem, preprocess)
+
+            layout = _worker_ocr.ocr_layout(img, lang, psm, oem, preprocess)
+
+            if settings["refine"]:
+                layout = _worker_ocr.refine_layout(img, layout, lang, oem, preprocess)
+
+        text = clean_text(layout.text(), cleanup)
+
+        return file_path, text, lang, layout, ""
+
+    except Exception as e:
+        return file_path, "", lang, None, f"{e}"
 
 
 def _set_timestamp() -> str:
     return dt.now(tz.utc).isoformat()
 
 
-def _capture_img(entry_type: str) -> Image.Image | None:
+def _capture_img(entry_type: str) -> "Image.Image | None":
     """Prompt user to take a screenshot.  Image in clipboard will be processed."""
+    from PIL import Image, ImageGrab
+
     print("\n<=> Use preferred snipping tool to copy image to clipboard.")
 
     extract_img = False
@@ -516,7 +1879,8 @@ def _capture_img(entry_type: str) -> Image.Image | None:
             return None
 
     try:
-        img = ImageGrab.grabclipboard()  # Pull the image from the system clipboard.
+        with span("capture.clipboard"):
+            img = ImageGrab.grabclipboard()  # Pull the image from the system clipboard.
 
         if isinstance(img, Image.Image):
             display_message("INFO", "Image retrieved from clipboard.")
@@ -549,12 +1913,33 @@ def _capture_meta(tags_manager):
     print(">>> Enclose numeric tags in brackes <>; eg. <1812>")
 
     tag_input = input(">>> Enter tags (comma separated) : ")
-    entry_tags = tags_manager.resolve_tags(tag_input)
+
+    with span("tags.resolve"):
+        entry_tags = tags_manager.resolve_tags(tag_input)
 
     return title, source, notes, entry_tags
 
 
-def _compile_entry(entry_type, content, lang, metadata) -> dict:
+def _capture_ocr_settings(settings) -> dict:
+    """Prompt for Tesseract settings of one entry; blank keeps the current value."""
+    settings = dict(settings)
+
+    print("\n>>> Page segmentation (psm) : 3 automatic, 4 columns, 6 block, 7 line.")
+    print(">>> Engine (oem) : 1 LSTM only, 3 default.")
+
+    for key in ["psm", "oem"]:
+        value = input(f">>> {key} [{settings[key]}] : ").strip()
+
+        if value.isdigit():
+            settings[key] = int(value)
+        elif value:
+            display_message("WARN", f"{key} must be a number; kept {settings[key]}.")
+
+    return settings
+
+
+def _compile_entry(entry_type, content, lang, metadata, layout="") -> dict:
+    """:param layout: Sidecar path of the word boxes of a text entry; see _layout_sidecar."""
     title, source, notes, entry_tags = metadata
     entry = {
         "type": entry_type,
@@ -567,38 +1952,7 @@ def _compile_entry(entry_type, content, lang, metadata) -> dict:
         "lang": lang,
     }
 
-    return entry
-
-
-def _load_log(file_path):
-    """Load contents of log file, or returns an empty list if not found."""
-    if path.exists(file_path):
-        with open(file_path, "r", encoding="utf-8") as file:
-            try:
-                return json.load(file)
-            except json.decoder.JSONDecodeError:
-                return []
-
-    return []
+    if layout:
+        entry["layout"] = layout
 
-
-def _save_to_log(log_path, data):
-    """Helper function to save data to specified log file."""
-    # Create a temp file, in case of fatal error during write process.
-    temp_path = log_path + ".tmp"
-
-    try:
-        with open(temp_path, "w", encoding="utf-8") as log_file:
-            json.dump(data, log_file, indent=2, ensure_ascii=False)
-
-        # Replace the official file, by the temp file.
-        os.replace(temp_path, log_path)
-        display_message("INFO", f'New entry added to "{path.basename(log_path)}".')
-        return True
-    except Exception as e:
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-
-        display_message("WARN", "File save failed :", f"{e}")
-        display_path_desc(log_path, "file")
-        return False
+    return entry
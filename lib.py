@@ -1,6 +1,10 @@
+import json
 import os
-import tkinter as tk
-from tkinter import filedialog as fd
+import time
+
+# Module variables :
+# In-progress rename plan, in the folder renamed
+rename_journal = ".rename_journal.json"
 
 
 def welcome_sequence(items: list, width: int) -> None:
@@ -51,6 +55,9 @@ def hor_bar(num_chars: int, indent: int = 0, text: str = "") -> None:
 #         filetypes=exts
 #     )
 def identify_path(base_type: str, file_type: str = "", initdir: str = "") -> str:
+    import tkinter as tk  # Loaded on first dialog; keeps start up fast.
+    from tkinter import filedialog as fd
+
     root = tk.Tk()
     root.withdraw()
     root.attributes("-topmost", True)
@@ -174,8 +181,19 @@ def display_message(tag: str, message: str, exception: str = "") -> None:
 
 
 def process_pathname(
-    case_num: int, base_path: str, target: str = "", data: list = []
+    case_num: int,
+    base_path: str,
+    target: str = "",
+    data: list = [],
+    dry_run: bool = False,
+    workers: int = 8,
 ) -> str:
+    """
+    Rename the PSD files of a folder; the full plan is computed first, then applied in parallel.
+    The plan is journaled, so an interrupted run can be resumed, or rolled back.
+    :param dry_run: Report the plan, and the time taken to compute it, without renaming.
+    :param workers: Number of threads renaming files; renames are I/O bound.
+    """
     psd_path = os.path.join(base_path, target)
 
     if not psd_path:
@@ -183,73 +201,224 @@ def process_pathname(
 
     display_path_desc(psd_path, "folder")
 
-    for item in os.listdir(psd_path):
-        filename, ext = os.path.splitext(item)
+    if os.path.exists(os.path.join(psd_path, rename_journal)):
+        display_message("WARN", "An interrupted rename was found in this folder.")
+        resume_renames(psd_path, rollback=_confirm_rollback(), workers=workers)
+        return psd_path
 
-        display_message("PROCESSING", f"{item} ...")
-
-        if ext.lower() == ".psd":  # Process only PSD files
-            path0 = os.path.join(psd_path, item)
-
-            if os.path.isfile(path0):
-                match case_num:
-                    case 1:  # Initial case when appending page markers ("##X") to original file name.
-                        page_num = filename[-2:]
-
-                        if page_num.isdigit():
-                            new_filename = f"{filename} {page_num}X{ext}"
-                            path1 = os.path.join(psd_path, new_filename)
-
-                            if path0 == path1:
-                                display_message(
-                                    "SKIP", "File with the same target name exists."
-                                )
-                            else:
-                                rename_path(path0, path1, "file")
-                        else:
-                            display_message("SKIP", "Not a valid file path.")
-
-                    case 2:  # Case when marking files for revision, with "X"
-                        if " " in filename:
-                            filename0, page = filename.split(" ")
-
-                            if page.isdigit() and page in data:
-                                new_filename = f"{filename}X{ext}"
-                                path1 = os.path.join(psd_path, new_filename)
-
-                                if path0 == path1:
-                                    display_message("SKIP", "File already marked.")
-                                else:
-                                    rename_path(path0, path1, "file")
-                            else:
-                                display_message("SKIP", "No revisions required.")
-                        else:
-                            display_message("SKIP", "No page marker found.")
-
-                    case 3:  # Case when cleaning up files name, prior to submission, remove page markers ("##" or "##X")
-                        if " " in filename:
-                            filename0, page = filename.split(" ")
-
-                            new_filename = f"{filename0}{ext}"
-                            path1 = os.path.join(psd_path, new_filename)
-
-                            if path0 == path1:
-                                display_message(
-                                    "SKIP", "File with the same name exists."
-                                )
-                            else:
-                                rename_path(path0, path1, "file")
-                        else:
-                            display_message("SKIP", "No page marker found.")
-
-            else:
-                display_message("SKIP", "Not a valid file path.")
-        else:
-            display_message("SKIP", "Not a PSD file.")
+    start = time.perf_counter()
+    plan, skipped = plan_renames(case_num, psd_path, set(data))
+    elapsed = time.perf_counter() - start
+
+    if dry_run:
+        for item, reason in skipped:
+            display_message("SKIP", f"{item} ...", reason)
+
+        for path_src, path_dst in plan:
+            print(
+                f"<=>  {os.path.basename(path_src)}  >>  {os.path.basename(path_dst)}"
+            )
+
+        display_message(
+            "DRY RUN",
+            f"{len(plan)} to rename, {len(skipped)} skipped; planned in {elapsed * 1000:.1f}ms.",
+        )
+        return psd_path
+
+    # One line per reason, rather than per file.
+    reasons = {}
+    for _, reason in skipped:
+        reasons[reason] = reasons.get(reason, 0) + 1
+
+    for reason, count in reasons.items():
+        display_message("SKIP", f"{count} files : {reason}")
+
+    errors = []
+
+    if plan:
+        _write_journal(psd_path, case_num, plan)
+        errors = apply_renames(psd_path, plan, workers)
 
+    display_message(
+        "INFO",
+        f"{len(plan) - len(errors)} files renamed, {len(skipped)} skipped, {len(errors)} failed.",
+    )
     return psd_path
 
 
+def plan_renames(case_num: int, psd_path: str, data: set) -> tuple:
+    """
+    Compute the renames of PSD files in a folder, without touching the files.
+    Renames onto an existing file, or two files onto the same name, are skipped as collisions.
+    :return: A list of (source path, target path), and a list of (file name, reason) skipped.
+    """
+    plan = []
+    skipped = []
+    targets = set()
+
+    with os.scandir(psd_path) as entries:
+        items = sorted(entries, key=lambda e: e.name)
+
+    existing = {os.path.normcase(entry.name) for entry in items}
+
+    for entry in items:
+        item = entry.name
+        filename, ext = os.path.splitext(item)
+        new_filename = ""
+
+        if ext.lower() != ".psd":  # Process only PSD files
+            skipped.append((item, "Not a PSD file."))
+            continue
+
+        if not entry.is_file():
+            skipped.append((item, "Not a valid file path."))
+            continue
+
+        match case_num:
+            # Initial case when appending page markers ("##X") to original file name.
+            case 1:
+                page_num = filename[-2:]
+
+                if page_num.isdigit():
+                    new_filename = f"{filename} {page_num}X{ext}"
+                else:
+                    skipped.append((item, "Not a valid file path."))
+
+            case 2:  # Case when marking files for revision, with "X"
+                if " " in filename:
+                    filename0, page = filename.rsplit(" ", 1)
+
+                    if page.isdigit() and page in data:
+                        new_filename = f"{filename}X{ext}"
+                    else:
+                        skipped.append((item, "No revisions required."))
+                else:
+                    skipped.append((item, "No page marker found."))
+
+            # Case when cleaning up files name, prior to submission, remove page markers ("##" or "##X")
+            case 3:
+                if " " in filename:
+                    filename0, page = filename.rsplit(" ", 1)
+                    new_filename = f"{filename0}{ext}"
+                else:
+                    skipped.append((item, "No page marker found."))
+
+        if not new_filename:
+            continue
+
+        key = os.path.normcase(new_filename)
+
+        if new_filename == item:
+            skipped.append((item, "File with the same name exists."))
+        elif key in existing or key in targets:
+            skipped.append((item, f"Collision with {new_filename}."))
+        else:
+            targets.add(key)
+            plan.append((entry.path, os.path.join(psd_path, new_filename)))
+
+    return plan, skipped
+
+
+def apply_renames(psd_path: str, plan: list, workers: int = 8) -> list:
+    """
+    Apply a rename plan with a thread pool; the journal is removed once every rename succeeds.
+    :return: A list of (file name, error) of failed renames.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def rename(step):
+        path_src, path_dst = step
+
+        try:
+            os.rename(path_src, path_dst)
+            return None
+        except Exception as e:
+            return os.path.basename(path_src), f"{e}"
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        errors = [error for error in pool.map(rename, plan) if error]
+
+    for base_src, error in errors:
+        display_message("ERROR", f"Failed to rename {base_src}.", error)
+
+    if errors:
+        display_message(
+            "WARN", "Rename incomplete; journal kept to resume, or roll back."
+        )
+    else:
+        os.remove(os.path.join(psd_path, rename_journal))
+
+    return errors
+
+
+def resume_renames(psd_path: str, rollback: bool = False, workers: int = 8) -> list:
+    """
+    Finish, or undo, an interrupted rename, from the journal left in the folder.
+    A step is done when its target exists, and its source does not. Steps whose source,
+    and target both exist are skipped, and kept in the journal; renaming would overwrite.
+    :return: A list of (file name, error) of failed, or skipped renames.
+    """
+    with open(os.path.join(psd_path, rename_journal), "r", encoding="utf-8") as file:
+        journal = json.load(file)
+
+    done = []
+    pending = []
+    conflicts = []
+
+    for path_src, path_dst in journal["plan"]:
+        src_exists = os.path.exists(path_src)
+
+        if os.path.exists(path_dst):
+            if not src_exists:
+                done.append((path_dst, path_src))
+            elif not rollback:
+                conflicts.append((path_src, path_dst))
+        elif src_exists:
+            pending.append((path_src, path_dst))
+
+    if rollback:
+        display_message("INFO", f"Rolling back {len(done)} renamed files ...")
+        return apply_renames(psd_path, done, workers)
+
+    display_message("INFO", f"Resuming {len(pending)} pending renames ...")
+    errors = apply_renames(psd_path, pending, workers)
+
+    for path_src, path_dst in conflicts:
+        display_message(
+            "ERROR",
+            f"Skipped {os.path.basename(path_src)}.",
+            f"{os.path.basename(path_dst)} already exists.",
+        )
+
+    if conflicts:
+        # The journal keeps the steps left to resolve; failed renames still have a source.
+        failed = [step for step in pending if os.path.exists(step[0])]
+        _write_journal(psd_path, journal["case"], [*conflicts, *failed])
+
+    return errors + [
+        (os.path.basename(path_src), "Target already exists.")
+        for path_src, _ in conflicts
+    ]
+
+
+def _write_journal(psd_path: str, case_num: int, plan: list) -> None:
+    journal_path = os.path.join(psd_path, rename_journal)
+
+    with open(journal_path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump({"case": case_num, "plan": plan}, file, indent=2)
+
+    os.replace(journal_path + ".tmp", journal_path)
+
+
+def _confirm_rollback() -> bool:
+    resp = ""
+
+    while resp not in ["R", "B"]:
+        resp = input("\n>>> [R]esume renaming, or roll [B]ack ? ").strip().upper()
+
+    return resp == "B"
+
+
 def rename_path(path_src: str, path_dst, pathtype: str) -> None:
     base_src = os.path.basename(path_src)
     base_dst = os.path.basename(path_dst)
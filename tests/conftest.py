@@ -0,0 +1,75 @@
+import os
+import sys
+from os import path
+
+import pytest
+
+# Modules sit flat in the app folder; make them importable from the tests.
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+# Stand-in for the tesseract executable, as called by pytesseract. Every image reads as
+# two lines, "w<width> text", and "second line"; the second with low confidence.
+fake_tesseract = """
+import sys
+
+from PIL import Image
+
+args = sys.argv[1:]
+
+if args[0] == "--version":
+    print("tesseract 5.3.0")
+    sys.exit(0)
+
+with Image.open(args[0]) as img:
+    width, height = img.size
+
+config = " ".join(args)
+words = [
+    (f"w{width}", 1, 1, 10, 96.5),
+    ("text", 1, 2, 60, 91.0),
+    ("second", 2, 1, 10, 42.0),
+    ("line", 2, 2, 70, 48.0),
+]
+
+if "--psm 0" in config:
+    with open(args[1] + ".osd", "w") as file:
+        file.write("Orientation in degrees: 0\\nScript: Latin\\nScript confidence: 5.0\\n")
+elif "tessedit_create_tsv=1" in config:
+    rows = [
+        "level\\tpage_num\\tblock_num\\tpar_num\\tline_num\\tword_num"
+        "\\tleft\\ttop\\twidth\\theight\\tconf\\ttext",
+        f"1\\t1\\t0\\t0\\t0\\t0\\t0\\t0\\t{width}\\t{height}\\t-1\\t",
+    ]
+
+    for text, par, number, left, conf in words:
+        top = 10 + 20 * (par - 1)
+        rows.append(f"5\\t1\\t1\\t{par}\\t1\\t{number}\\t{left}\\t{top}\\t40\\t12\\t{conf}\\t{text}")
+
+    with open(args[1] + ".tsv", "w") as file:
+        file.write("\\n".join(rows) + "\\n")
+else:
+    with open(args[1] + ".txt", "w") as file:
+        file.write(f"w{width} text\\nsecond line\\n")
+"""
+
+
+@pytest.fixture
+def tesseract(tmp_path_factory):
+    """Path to a fake tesseract executable; POSIX only."""
+    if os.name != "posix":
+        pytest.skip("Fake tesseract needs a POSIX shebang.")
+
+    file_path = tmp_path_factory.mktemp("bin") / "tesseract"
+    file_path.write_text(f"#!{sys.executable}\n{fake_tesseract}")
+    file_path.chmod(0o755)
+
+    return str(file_path)
+
+
+@pytest.fixture
+def ocr_manager(tmp_path_factory, tesseract):
+    from Tools import OCRManager
+
+    return OCRManager(
+        str(tmp_path_factory.mktemp("user_data")), "pytesseract", tesseract
+    )
@@ -0,0 +1,56 @@
+import json
+import os
+
+import Benchmark
+
+params = {**Benchmark.default_params, "repeat": 3, "cards": 50, "tags": 10, "psds": 5}
+
+
+def test_timeit_runs_setup_before_each():
+    calls = []
+    Benchmark._timeit(
+        lambda: calls.append("run"), params, lambda: calls.append("setup")
+    )
+
+    assert calls == ["setup", "run"] * 3
+
+
+def test_log_saves_time_the_same_log(tmp_path, monkeypatch):
+    sizes = []
+    getsize = os.path.getsize
+    timeit = Benchmark._timeit
+
+    def measured(func, params, setup=None, quiet=False):
+        def timed():
+            func()
+            sizes.append(getsize(tmp_path / "log_json" / "research_log.json"))
+
+        return timeit(timed, params, setup, quiet)
+
+    monkeypatch.setattr(Benchmark, "_timeit", measured)
+    results = Benchmark.bench_log(str(tmp_path), params)
+
+    assert len(set(sizes[:3])) == 1  # Each save appended to the same starting log.
+    assert {"save_json", "save_jsonl", "tail_jsonl"} <= set(results)
+
+
+def test_regression():
+    baseline = {"results": {"save_json": 0.010}}
+
+    assert Benchmark._is_regression("save_json", 0.013, baseline, 0.2)
+    assert not Benchmark._is_regression("save_json", 0.011, baseline, 0.2)
+    assert not Benchmark._is_regression("new_metric", 1.0, baseline, 0.2)
+
+
+def test_run_saves_baseline(tmp_path, capsys):
+    baseline_path = tmp_path / "baseline.json"
+
+    assert Benchmark.run(["rename"], params, str(baseline_path), save=True)
+    saved = json.loads(baseline_path.read_text())
+
+    assert saved["params"] == params
+    assert set(saved["results"]) == {"rename_plan", "rename_apply"}
+
+    # Compared with the baseline just saved; a large tolerance, so timing noise passes.
+    assert Benchmark.run(["rename"], params, str(baseline_path), tolerance=100)
+    assert "rename_plan" in capsys.readouterr().out
@@ -0,0 +1,58 @@
+from PIL import Image
+
+from Engines import OCRCache
+
+
+def test_key():
+    img = Image.new("L", (20, 10), 255)
+    other = Image.new("L", (20, 10), 254)
+
+    assert OCRCache.key(img, lang="eng") == OCRCache.key(img.copy(), lang="eng")
+    assert OCRCache.key(img, lang="eng") != OCRCache.key(img, lang="fra")
+    assert OCRCache.key(img, lang="eng") != OCRCache.key(other, lang="eng")
+
+
+def test_get_put(tmp_path):
+    cache = OCRCache(str(tmp_path / "cache.db"))
+    cache.put("text", "Steam power")
+    cache.put("layout", b"\x00\x01")
+
+    assert cache.get("text") == "Steam power"
+    assert cache.get("layout") == b"\x00\x01"
+    assert cache.get("missing") is None
+
+    cache.clear()
+
+    assert cache.get("text") is None
+
+
+def test_least_recently_used_evicted(tmp_path):
+    cache = OCRCache(str(tmp_path / "cache.db"), max_bytes=30)
+
+    for key in ["a", "b", "c"]:
+        cache.put(key, "x" * 9)  # 10 bytes each, with the key
+
+    cache.get("a")  # Now more recent than b
+    cache.put("d", "x" * 9)
+
+    assert [key for key in "abcd" if cache.get(key) is not None] == ["a", "c", "d"]
+
+
+def test_ocr_layout_cached(ocr_manager, monkeypatch):
+    img = Image.new("RGB", (300, 80), "white")
+    calls = []
+    image_to_data = ocr_manager.engine.image_to_data
+
+    def counted(*args, **kwargs):
+        calls.append(args)
+        return image_to_data(*args, **kwargs)
+
+    monkeypatch.setattr(ocr_manager.engine, "image_to_data", counted)
+    first = ocr_manager.ocr_layout(img)
+
+    assert ocr_manager.ocr_layout(img.copy()).texts == first.texts
+    assert len(calls) == 1
+
+    ocr_manager.ocr_layout(img, psm=6)  # Other settings; OCR'd again
+
+    assert len(calls) == 2
@@ -0,0 +1,103 @@
+from os import path
+
+import pytest
+from PIL import Image
+
+from Tools import ImageEntry, TagManager, TextEntry, thumbnail_path
+
+
+@pytest.fixture
+def text_entry(tmp_path, ocr_manager):
+    project_path = tmp_path / "project"
+    project_path.mkdir()
+
+    return TextEntry(str(project_path), TagManager(str(project_path)), ocr_manager)
+
+
+@pytest.fixture
+def image_entry(tmp_path):
+    project_path = tmp_path / "project"
+    project_path.mkdir()
+    image_entry = ImageEntry(str(project_path), TagManager(str(project_path)))
+
+    yield image_entry
+
+    image_entry.close()
+
+
+def test_capture_folder(text_entry, tmp_path):
+    folder = tmp_path / "scans"
+    folder.mkdir()
+
+    for n, width in enumerate([300, 200, 100]):
+        Image.new("RGB", (width, 60), "white").save(folder / f"page {n}.png")
+
+    (folder / "broken.png").write_bytes(b"not an image")
+    (folder / "notes.txt").write_text("skipped")
+
+    saved, errors = text_entry.capture_folder(str(folder), "history", workers=2)
+    entries = text_entry.log_store.load()
+
+    assert saved == 3
+    assert [name for name, _ in errors] == ["broken.png"]
+    assert [entry["title"] for entry in entries] == ["page 0", "page 1", "page 2"]
+    assert len({entry["content"] for entry in entries}) == 3  # Each its own image
+    assert entries[0]["tags"] == ["HISTORY"]
+    assert entries[0]["source"] == str(folder / "page 0.png")
+    assert path.exists(path.join(text_entry.project_path, entries[0]["layout"]))
+
+
+def test_capture_folder_unsaved(text_entry, tmp_path, monkeypatch):
+    folder = tmp_path / "scans"
+    folder.mkdir()
+    Image.new("RGB", (300, 60), "white").save(folder / "page.png")
+    monkeypatch.setattr("Tools._save_entries", lambda *args: False)
+
+    assert text_entry.capture_folder(str(folder), workers=1) == (0, [])
+    assert not path.exists(text_entry.layout_path)  # No sidecars without entries
+
+
+def test_capture_folder_empty(text_entry, tmp_path):
+    assert text_entry.capture_folder(str(tmp_path)) == (0, [])
+
+
+@pytest.mark.parametrize("encoding", ["webp", "png"])
+def test_add_image(tmp_path, encoding):
+    image_entry = ImageEntry(
+        str(tmp_path), TagManager(str(tmp_path)), encoding=encoding
+    )
+    img = Image.new("RGB", (800, 400), "navy")
+
+    entry = image_entry.add_image(img, ("Map", "atlas", "", ["GEO"]))
+    image_entry.close()
+
+    assert entry["type"] == "image"
+    assert entry["content"].startswith("assets/")
+    assert image_entry.log_store.load() == [entry]
+
+    with Image.open(tmp_path / entry["content"]) as stored:
+        assert stored.size == img.size
+        assert stored.tobytes() == img.tobytes()  # Lossless
+
+    with Image.open(thumbnail_path(str(tmp_path), entry["content"])) as thumb:
+        assert thumb.size == (320, 160)
+
+
+def test_add_image_dedup(image_entry):
+    first = image_entry.add_image(Image.new("RGB", (50, 50), "red"), ("A", "", "", []))
+    second = image_entry.add_image(Image.new("RGB", (50, 50), "red"), ("B", "", "", []))
+    other = image_entry.add_image(Image.new("RGB", (50, 50), "blue"), ("C", "", "", []))
+
+    assert first["content"] == second["content"]  # Same pixels, same asset
+    assert other["content"] != first["content"]
+    assert len(image_entry.log_store.load()) == 3
+
+
+def test_store_asset_failed(image_entry, monkeypatch):
+    def save_image(img, file_path, encoding):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("Tools._save_image", save_image)
+
+    assert image_entry.add_image(Image.new("RGB", (10, 10)), ("A", "", "", [])) is None
+    assert image_entry.log_store.load() == []
@@ -0,0 +1,82 @@
+import pytest
+
+from Cleanup import TextCleaner, clean_text
+
+wrapped = (
+    "Optical character recog-\n"
+    "nition of printed pages is a self-\n"
+    "evident first step for research.\n"
+    "It ends here.\n"
+    "\n"
+    "Next paragraph."
+)
+
+
+def test_defaults():
+    assert clean_text(wrapped) == (
+        "Optical character recognition of printed pages is a self-evident first step "
+        "for research. It ends here.\n\nNext paragraph."
+    )
+
+
+def test_short_line_ends_paragraph():
+    text = "A long line of text that wraps on.\nEnds.\nAnother paragraph starts."
+
+    assert (
+        clean_text(text)
+        == "A long line of text that wraps on. Ends.\n\nAnother paragraph starts."
+    )
+
+
+def test_rejoin_off_keeps_lines():
+    assert clean_text(wrapped, {"rejoin": False}) == (
+        "Optical character recognition of printed pages is a self-evident first step "
+        "for research.\nIt ends here.\n\nNext paragraph."
+    )
+
+
+def test_dehyphenate_off():
+    assert clean_text("recog-\nnition", {"dehyphenate": False}) == "recog- nition"
+
+
+@pytest.mark.parametrize(
+    "stages, cleaned",
+    [
+        ({}, "Items :\n\n• first\n2) second item wrapped"),
+        ({"markdown": True}, "Items :\n\n- first\n2. second item wrapped"),
+        ({"lists": False}, "Items : • first 2) second item wrapped"),
+    ],
+)
+def test_lists(stages, cleaned):
+    assert clean_text("Items :\n• first\n2) second item\nwrapped", stages) == cleaned
+
+
+@pytest.mark.parametrize(
+    "text, cleaned",
+    [
+        (
+            "A. Smith wrote it.\nI. Newton read it.",
+            "A. Smith wrote it. I. Newton read it.",
+        ),
+        ("Written by\nA. Smith in 1850.", "Written by A. Smith in 1850."),
+        ("Steps :\na. cut\nb) fold\n(c) glue", "Steps :\n\na. cut\nb) fold\n(c) glue"),
+        ("i. first\nii. second", "i. first\nii. second"),
+        ("1. first\na. part\nb. part", "1. first\na. part\nb. part"),
+        ("a. cut\nwrapped\na. again", "a. cut wrapped a. again"),
+    ],
+)
+def test_lettered_lists(text, cleaned):
+    assert clean_text(text) == cleaned
+
+
+def test_characters():
+    assert clean_text("ﬁne  ﬂow­chart here") == "fine flowchart here"
+
+
+def test_feed_in_pieces():
+    cleaner = TextCleaner()
+
+    for n in range(0, len(wrapped), 7):
+        cleaner.feed(wrapped[n : n + 7])
+
+    assert cleaner.close() == clean_text(wrapped)
@@ -0,0 +1,113 @@
+import json
+from os import path
+
+import pytest
+from PIL import Image
+
+import Benchmark
+import Cli
+
+
+@pytest.fixture
+def cli(tmp_path, capsys):
+    """Run Cli.main in a temporary app folder; returns the exit code, and JSON output."""
+
+    def run(*argv):
+        code = Cli.main(["--app-parent", str(tmp_path), *argv])
+        lines = capsys.readouterr().out.splitlines()
+
+        return code, [json.loads(line) for line in lines]
+
+    return run
+
+
+@pytest.fixture
+def project(cli, tmp_path):
+    project_path = str(tmp_path / "project")
+    code, output = cli("add-project", "Mills", project_path, "--storage", "jsonl")
+    assert code == 0
+
+    return output[0]
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    file_path = str(tmp_path / "Loom.png")
+    Image.new("RGB", (120, 40), "white").save(file_path)
+
+    return file_path
+
+
+def test_add_project(cli, project, tmp_path):
+    assert project["number"] == 1
+    assert project["storage"] == "jsonl"
+
+    code, output = cli("list")
+
+    assert code == 0
+    assert [item["name"] for item in output] == ["Mills"]
+
+
+def test_ingest_image(cli, project, image_path):
+    code, output = cli(
+        "ingest", "Mills", image_path, "--type", "image", "--tags", "Cotton"
+    )
+    entry = output[0]
+
+    assert code == 0
+    assert entry["type"] == "image"
+    assert entry["title"] == "Loom"
+    assert entry["tags"] == ["COTTON"]
+    assert path.isfile(path.join(project["path"], entry["content"]))
+
+
+def test_ingest_text(cli, project, image_path, tesseract):
+    meta = json.dumps({"title": "Spinning", "tags": ["Cotton"]})
+    code, output = cli(
+        "--tesseract", tesseract, "ingest", "1", image_path, "--meta", meta
+    )
+
+    assert code == 0
+    assert output[0]["title"] == "Spinning"
+    assert output[0]["tags"] == ["COTTON"]
+    assert "second line" in output[0]["content"]
+
+
+def test_ingest_no_tesseract(cli, project, image_path):
+    assert cli("--tesseract", "missing", "ingest", "1", image_path) == (1, [])
+
+
+def test_unknown_project(cli, project):
+    assert cli("search", "Forges", "--tags", "COTTON") == (1, [])
+
+
+def test_search(cli, project, image_path):
+    cli("ingest", "Mills", image_path, "--type", "image", "--tags", "Cotton")
+    cli("ingest", "Mills", image_path, "--type", "image", "--tags", "Wool")
+
+    code, output = cli("search", "Mills", "--tags", "COTTON")
+
+    assert code == 0
+    assert [result["entry"]["tags"] for result in output] == [["COTTON"]]
+    assert cli("search", "Mills") == (1, [])  # Nothing to search for
+
+
+def test_export(cli, project, image_path, tmp_path):
+    cli("ingest", "Mills", image_path, "--type", "image", "--tags", "Cotton")
+    folder = tmp_path / "export"
+
+    code, output = cli("export", "Mills", str(folder))
+    entries = json.loads((folder / "research_log.json").read_text(encoding="utf-8"))
+
+    assert code == 0
+    assert output == [{"exported": str(folder)}]
+    assert [entry["title"] for entry in entries] == ["Loom"]
+
+
+def test_bench_cli_silent(tmp_path, capsys):
+    params = {**Benchmark.default_params, "repeat": 1}
+    results = Benchmark.bench_cli(str(tmp_path), params)
+    captured = capsys.readouterr()
+
+    assert {"cli_ingest", "cli_search"} <= set(results)
+    assert captured.out == captured.err == ""
@@ -0,0 +1,107 @@
+import sys
+import threading
+import types
+
+import pytest
+
+import Engines
+
+
+class FakeAPI:
+    def __init__(self, lang, oem, path=""):
+        self.lang = lang
+        self.ended = False
+
+    def End(self):
+        self.ended = True
+
+    def SetPageSegMode(self, psm):
+        self.psm = psm
+
+    def SetImage(self, img):
+        self.img = img
+
+    def GetUTF8Text(self):
+        return f"{self.img} read as {self.lang}, psm {self.psm}"
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    tesserocr = types.SimpleNamespace(PyTessBaseAPI=FakeAPI, OEM=int)
+    monkeypatch.setitem(sys.modules, "tesserocr", tesserocr)
+
+    return Engines.TesserocrEngine("")
+
+
+def test_api_per_thread(engine):
+    barrier = threading.Barrier(2)
+    used = []
+
+    def call():
+        with engine._api("eng", 3) as api:
+            used.append(api)
+            barrier.wait(timeout=5)  # Both threads hold a handle at once.
+
+    threads = [threading.Thread(target=call) for _ in range(2)]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert used[0] is not used[1]
+    assert len(engine.apis[("eng", 3)]) == 2
+
+    with engine._api("eng", 3) as api:
+        assert api in used
+
+
+def test_api_limit(engine):
+    handles = []
+
+    for lang in ["eng", "fra", "deu", "spa", "ita"]:
+        with engine._api(lang, 3) as api:
+            handles.append(api)
+
+    assert list(engine.apis) == [("fra", 3), ("deu", 3), ("spa", 3), ("ita", 3)]
+    assert handles[0].ended and not handles[-1].ended
+
+
+def test_image_to_string(engine):
+    assert engine.image_to_string("snip", "fra", psm=6) == "snip read as fra, psm 6"
+    assert engine.image_to_string("snip", "fra") == "snip read as fra, psm 3"
+    assert len(engine.apis[("fra", 3)]) == 1  # Loaded once.
+
+
+def test_close_ends_apis(engine):
+    with engine._api("eng", 3) as api:
+        pass
+
+    engine.close()
+
+    assert api.ended and not engine.apis
+
+
+def test_load_engine(engine, monkeypatch):
+    assert Engines.load_engine("", quiet=True).name == "tesserocr"
+
+    monkeypatch.setitem(sys.modules, "tesserocr", None)  # Not installed
+
+    assert Engines.load_engine("", quiet=True).name == "pytesseract"
+    assert Engines.load_engine("", "pytesseract", quiet=True).name == "pytesseract"
+
+
+def test_pytesseract_words(monkeypatch):
+    import pytesseract
+
+    # A line, then its two words; conf is a string in the TSV output.
+    data = {key: [1, 1, 1] for key in Engines.word_keys}
+    data.update(level=[4, 5, 5], text=["", "Steam", "mill"], conf=["-1", "91.5", "88"])
+
+    monkeypatch.setattr(pytesseract, "image_to_data", lambda *args, **kwargs: data)
+    words = Engines.PytesseractEngine("tesseract").image_to_data(None)
+
+    assert [(word["text"], word["conf"]) for word in words] == [
+        ("Steam", 91.5),
+        ("mill", 88.0),
+    ]
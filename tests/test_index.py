@@ -0,0 +1,136 @@
+from os import path
+
+import pytest
+
+from Index import GlobalSearch, ProjectIndex
+from Storage import open_log
+
+entries = [
+    {"title": "Steam power", "content": "Watt engine", "tags": ["HISTORY", "<1769>"]},
+    {"title": "Corn laws", "content": "Tariff repeal", "tags": ["LAW", "<1846>"]},
+    {"title": "Factory acts", "content": "Steam mills", "tags": ["LAW", "HISTORY"]},
+    {"title": "Railways", "content": "Rocket", "tags": ["ECONOMICS", "<1829>"]},
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    log_store = open_log(path.join(tmp_path, "research_log.json"), "jsonl")
+    log_store.extend(entries)
+
+    return ProjectIndex(str(tmp_path), log_store)
+
+
+@pytest.mark.parametrize(
+    "expression, cards",
+    [
+        ("HISTORY", [0, 2]),
+        ("history law", [2]),
+        ("HISTORY AND LAW", [2]),
+        ("HISTORY OR ECONOMICS", [0, 2, 3]),
+        ("NOT HISTORY", [1, 3]),
+        ("LAW NOT <1800-1850>", [2]),
+        ("(LAW OR ECONOMICS) AND NOT <1846>", [2, 3]),
+        ("<1760-1830>", [0, 3]),
+        ("MISSING", []),
+    ],
+)
+def test_query(index, expression, cards):
+    assert index.query(expression) == cards
+
+
+@pytest.mark.parametrize("expression", ["(HISTORY", "HISTORY AND", "OR LAW", ")"])
+def test_query_invalid(index, expression):
+    assert index.query(expression) == []
+
+
+def test_filter(index):
+    assert [(card, entry["title"]) for card, entry in index.filter("LAW")] == [
+        (1, "Corn laws"),
+        (2, "Factory acts"),
+    ]
+
+
+def test_fetch_stops_at_last_card(index, monkeypatch):
+    read = []
+
+    def entries_read():
+        for entry in entries:
+            read.append(entry)
+            yield entry
+
+    monkeypatch.setattr(index.log_store, "iter", entries_read)
+
+    assert [card for card, _ in index.fetch([1, 0])] == [0, 1]
+    assert len(read) == 2
+
+
+def test_query_sqlite_store(tmp_path):
+    log_store = open_log(path.join(tmp_path, "research_log.json"), "sqlite")
+    log_store.extend(entries)
+    sqlite_index = ProjectIndex(str(tmp_path), log_store)
+
+    assert sqlite_index.query("LAW AND <1800-1850>") == [1]
+    assert len(sqlite_index) == 4
+
+
+def test_search(index):
+    assert [card for card, _ in index.search("steam")] == [0, 2]
+    assert [card for card, _ in index.search("title:steam")] == [0]
+    assert [card for card, _ in index.search("tarif*")] == [1]
+    assert index.search('"no such phrase"') == []
+
+
+def test_add_keeps_index_current(index):
+    entry = {"title": "Spinning jenny", "content": "", "tags": ["HISTORY"]}
+    index.log_store.append(entry)
+    index.add([entry])
+
+    assert index.query("HISTORY") == [0, 2, 4]
+    assert [card for card, _ in index.search("jenny")] == [4]
+
+
+def test_index_from_before_full_text_search_is_rebuilt(index, tmp_path):
+    # An index.db of an older version; tags indexed, text table empty, signature current.
+    with index.conn:
+        index.conn.execute("DELETE FROM cards_fts")
+        index.conn.execute("DELETE FROM meta WHERE key = 'version'")
+    index.conn.close()
+
+    reopened = ProjectIndex(str(tmp_path), index.log_store)
+
+    assert [card for card, _ in reopened.search("steam")] == [0, 2]
+
+
+def test_stale_signature_rebuilds(index, tmp_path):
+    index.log_store.append({"title": "Steam hammer", "tags": ["HISTORY"]})
+    index.conn.close()
+
+    reopened = ProjectIndex(str(tmp_path), index.log_store)
+
+    assert reopened.query("HISTORY") == [0, 2, 4]
+    assert len(reopened) == 5
+
+
+def test_global_search_scores_per_project(tmp_path):
+    projects = []
+
+    for name, logged in [("A", entries), ("B", [{"title": "Steam steam steam"}])]:
+        (tmp_path / name).mkdir()
+        open_log(str(tmp_path / name / "research_log.json"), "jsonl").extend(logged)
+        projects.append(
+            {"name": name, "path": str(tmp_path / name), "storage": "jsonl"}
+        )
+
+    results = GlobalSearch("research_log.json").search(projects, "steam")
+
+    assert sorted((result["project"], result["card"]) for result in results) == [
+        ("A", 0),
+        ("A", 2),
+        ("B", 0),
+    ]
+    assert all(0 < result["score"] <= 1 for result in results)
+    assert {result["project"] for result in results if result["score"] == 1} == {
+        "A",
+        "B",
+    }
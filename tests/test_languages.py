@@ -0,0 +1,92 @@
+import pytest
+from PIL import Image
+
+import Tools
+from Languages import guess_lang, langs_for_script, split_langs
+from Layout import Layout
+
+french = "Le chat est dans la maison, et le chien est sur la table pour une heure."
+english = "The cat is in the house, and the dog is on the table for an hour."
+
+
+def test_split_langs():
+    assert split_langs("fra+eng+deu") == ["fra", "eng", "deu"]
+    assert split_langs("eng") == ["eng"]
+    assert split_langs("eng+") == ["eng"]
+
+
+def test_langs_for_script():
+    langs = ["rus", "eng", "fra"]
+
+    assert langs_for_script(langs, "Latin") == ["eng", "fra"]
+    assert langs_for_script(langs, "Cyrillic") == ["rus"]
+    assert langs_for_script(langs, "Arabic") == langs  # None match; keep all
+    assert langs_for_script(langs, "") == langs
+
+
+def test_guess_lang():
+    assert guess_lang(french, ["eng", "fra"]) == "fra"
+    assert guess_lang(english, ["eng", "fra"]) == "eng"
+    assert guess_lang(english, ["fra", "deu"]) == ""  # Too few votes
+    assert guess_lang("The chat", ["eng", "fra"]) == ""
+    assert guess_lang(english, ["rus", "ukr"]) == ""  # No stop words
+    assert guess_lang(f"{english} {french}", ["eng", "fra"]) == ""  # No clear lead
+
+
+@pytest.fixture
+def stub_ocr(ocr_manager, monkeypatch):
+    """OCRManager reading every image as a given script, and text."""
+    calls = []
+
+    def ocr_text(img, lang="eng", psm=3, oem=3, preprocess=None):
+        calls.append(lang)
+        return ocr_manager.text
+
+    monkeypatch.setattr(ocr_manager, "detect_script", lambda img, pre=None: "Latin")
+    monkeypatch.setattr(ocr_manager, "ocr_text", ocr_text)
+    ocr_manager.text = french
+    ocr_manager.calls = calls
+
+    return ocr_manager
+
+
+def test_pick_lang(stub_ocr):
+    img = Image.new("L", (100, 40), 255)
+
+    assert stub_ocr.pick_lang(img, "eng") == "eng"  # Nothing to narrow
+    assert stub_ocr.calls == []
+    assert stub_ocr.pick_lang(img, "rus+fra") == "fra"  # By script alone
+    assert stub_ocr.calls == []
+    assert stub_ocr.pick_lang(img, "eng+fra+rus") == "fra"
+    assert stub_ocr.calls == ["eng"]
+
+    stub_ocr.text = "Steam 1850"
+
+    assert stub_ocr.pick_lang(img, "eng+fra+rus") == "eng+fra"  # Undecided
+
+
+def test_process_img_settings(ocr_manager, monkeypatch):
+    calls = []
+
+    def ocr_layout(img, lang="eng", psm=3, oem=3, preprocess=None):
+        calls.append((lang, psm, oem))
+        return Layout.from_words([], img.size)
+
+    monkeypatch.setattr(ocr_manager, "ocr_layout", ocr_layout)
+    monkeypatch.setattr(ocr_manager, "pick_lang", lambda img, lang, *args: "fra")
+    img = Image.new("L", (100, 40), 255)
+
+    ocr_manager.process_img(img, "text", "eng+fra")
+    ocr_manager.process_img(img, "text", "eng+fra", ocr={"psm": 7, "oem": 1})
+    ocr_manager.process_img(img, "text", "eng+fra", ocr={"detect": True})
+
+    assert calls == [("eng+fra", 3, 3), ("eng+fra", 7, 1), ("fra", 3, 3)]
+
+
+def test_capture_ocr_settings(monkeypatch):
+    answers = iter(["7", "x"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+    settings = {"psm": 3, "oem": 3, "refine": False}
+
+    assert Tools._capture_ocr_settings(settings) == {**settings, "psm": 7}
+    assert settings["psm"] == 3  # Not changed in place
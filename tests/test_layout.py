@@ -0,0 +1,134 @@
+import os
+from os import path
+
+import pytest
+from PIL import Image
+
+import Tools
+from Layout import Layout, load_layout
+from Tools import _layout_sidecar, _store_layouts
+
+
+def word(text, left, top, conf, par=1, line=1):
+    return {
+        "text": text,
+        "left": left,
+        "top": top,
+        "width": 40,
+        "height": 20,
+        "conf": conf,
+        "block_num": 1,
+        "par_num": par,
+        "line_num": line,
+    }
+
+
+@pytest.fixture
+def layout():
+    words = [
+        word("Steam", 10, 10, 96),
+        word("power", 60, 10, 90),
+        word(" ", 110, 10, -1),
+        word("mills", 10, 40, 40, line=2),
+        word("Rocket", 10, 90, 80, par=2),
+    ]
+
+    return Layout.from_words(words, (200, 120), scale=2.0)
+
+
+def test_text(layout):
+    assert layout.texts == ["Steam", "power", "mills", "Rocket"]
+    assert layout.paragraphs() == ["Steam power\nmills", "Rocket"]
+    assert layout.text() == "Steam power\nmills\n\nRocket"
+
+
+def test_lines(layout):
+    assert layout.lines() == [(0, 2), (2, 3), (3, 4)]
+    assert layout.box(0, 2) == (5, 5, 50, 15)
+    assert layout.mean_conf(0, 2) == 93
+    assert layout.mean_conf(4) == -1
+
+
+def test_words(layout):
+    assert layout.words(2, 3) == [
+        word("mills", 5, 20, 40, line=2) | {"width": 20, "height": 10}
+    ]
+
+
+def test_bytes_round_trip(layout):
+    loaded = Layout.from_bytes(layout.to_bytes())
+
+    assert loaded.texts == layout.texts
+    assert loaded.columns == layout.columns
+    assert loaded.size == layout.size
+
+
+def test_words_all(layout):
+    words = layout.words()
+
+    assert [word["text"] for word in words] == layout.texts
+    assert Layout.from_words(words, layout.size).columns == layout.columns
+
+
+@pytest.fixture
+def refine_ocr(ocr_manager, monkeypatch):
+    """OCRManager reading every line crop by its binarisation threshold; see readings."""
+    readings = {
+        0: [word("miles", 2, 3, 70)],  # Better, and as long
+        110: [word("m", 2, 3, 99)],  # More confident, but a fragment
+        180: None,  # Tesseract fails
+    }
+    crops = []
+
+    def ocr_layout(img, lang="eng", psm=3, oem=3, preprocess=None):
+        crops.append(img.size)
+        words = readings.get(preprocess.get("threshold"), [word("mills", 2, 3, 50)])
+
+        if words is None:
+            raise RuntimeError("Image too small")
+
+        return Layout.from_words(words, img.size)
+
+    monkeypatch.setattr(ocr_manager, "ocr_layout", ocr_layout)
+    ocr_manager.crops = crops
+
+    return ocr_manager
+
+
+def test_refine_layout(refine_ocr, layout):
+    refined = refine_ocr.refine_layout(Image.new("L", layout.size), layout)
+
+    # Only the weak line, "mills" at (5, 20, 25, 30), is cropped; with a 4px margin.
+    assert refine_ocr.crops == [(28, 18)] * len(Tools.refine_variants)
+    assert refined.texts == ["Steam", "power", "miles", "Rocket"]
+    assert refined.words(2, 3) == [word("miles", 3, 19, 70, line=2)]
+    assert refined.words(0, 2) == layout.words(0, 2)
+    assert refined.paragraphs() == ["Steam power\nmiles", "Rocket"]
+
+
+def test_refine_layout_no_weak_lines(refine_ocr, layout, monkeypatch):
+    monkeypatch.setattr(Tools, "low_conf", 30)
+
+    assert refine_ocr.refine_layout(Image.new("L", layout.size), layout) is layout
+    assert refine_ocr.crops == []
+
+
+def test_refine_layout_fragments(refine_ocr, layout, monkeypatch):
+    monkeypatch.setattr(Tools, "refine_variants", [({"threshold": 110}, 7)])
+
+    assert refine_ocr.refine_layout(Image.new("L", layout.size), layout) is layout
+
+
+def test_store_layouts(layout, tmp_path):
+    layout_path = str(tmp_path / "assets" / "layouts")
+    sidecar = _layout_sidecar(layout)
+    empty = _layout_sidecar(Layout.from_words([], (1, 1)))
+
+    assert sidecar == _layout_sidecar(layout)  # Named by content
+    assert empty == ("", b"")
+    assert not path.exists(path.join(tmp_path, sidecar[0]))  # Not written yet
+
+    _store_layouts([sidecar, empty], layout_path)
+
+    assert load_layout(path.join(tmp_path, sidecar[0])).texts == layout.texts
+    assert os.listdir(layout_path) == [path.basename(sidecar[0])]
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+import Metrics
+from Metrics import span, summarise
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    # enable, and set_project also set environment variables for worker processes.
+    monkeypatch.setenv(Metrics.env_flag, "")
+    monkeypatch.setenv(Metrics.env_path, "")
+    monkeypatch.setattr(Metrics, "_enabled", False)
+    monkeypatch.setattr(Metrics, "_metrics_path", "")
+    Metrics.set_project(str(tmp_path))
+
+    return tmp_path
+
+
+def records(project):
+    with open(project / Metrics.metrics_name, encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+def test_span_disabled(project):
+    with span("capture.ocr"):
+        pass
+
+    assert not (project / Metrics.metrics_name).exists()
+
+
+def test_span_records(project):
+    Metrics.enable()
+
+    with span("capture.ocr", size=[300, 80]):
+        pass
+
+    with pytest.raises(ValueError), span("capture.cleanup"):
+        raise ValueError  # Timed, even when the stage fails.
+
+    assert [(record["stage"], record.get("size")) for record in records(project)] == [
+        ("capture.ocr", [300, 80]),
+        ("capture.cleanup", None),
+    ]
+
+
+def test_summarise(project):
+    lines = [json.dumps({"stage": "ocr", "ms": ms}) for ms in range(1, 21)]
+    lines += [json.dumps({"stage": "save", "ms": 5}), '{"stage": "to']
+    (project / Metrics.metrics_name).write_text("\n".join(lines))
+
+    assert summarise(str(project)) == {
+        "ocr": {"count": 20, "p50": 10, "p95": 19},
+        "save": {"count": 1, "p50": 5, "p95": 5},
+    }
+
+
+def test_summarise_without_records(tmp_path):
+    assert summarise(str(tmp_path)) == {}
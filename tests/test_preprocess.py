@@ -0,0 +1,55 @@
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from Tools import OCRManager, _auto_scale, max_scale
+
+
+def text_image(font_size, dark=False):
+    """Five lines of text in the default font, at a font size in pixels."""
+    background, ink = (30, 220) if dark else (255, 0)
+    img = Image.new("L", (900, font_size * 9), background)
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default(font_size)
+
+    for n in range(5):
+        draw.text(
+            (5, 5 + n * font_size * 1.5),
+            "The quick brown fox jumps over the lazy dog, again",
+            font=font,
+            fill=ink,
+        )
+
+    return img
+
+
+def profile(img):
+    return list(img.resize((1, img.height), resample=Image.Resampling.BOX).getdata())
+
+
+@pytest.mark.parametrize(
+    "font_size, low, high",
+    [
+        (12, max_scale, max_scale),  # Small screen text; capped
+        (16, 2, 2.6),
+        (20, 1.8, 2.2),
+        (40, 1, 1),  # Already large; not resampled
+        (80, 1, 1),
+    ],
+)
+def test_auto_scale(font_size, low, high):
+    assert low <= _auto_scale(profile(text_image(font_size))) <= high
+
+
+def test_auto_scale_without_text():
+    assert _auto_scale([255] * 50, (100, 100)) == max_scale
+    assert _auto_scale([255] * 50, (200, 200)) == 1.5
+    assert _auto_scale([255] * 50, (300, 300)) == 1
+
+
+def test_preprocess_dark_mode(tmp_path):
+    ocr_manager = OCRManager(str(tmp_path), tesseract_path="tesseract")
+    img = ocr_manager._preprocess_for_ocr(text_image(20, dark=True))
+
+    assert img.size[0] == round(900 * _auto_scale(profile(text_image(20))))
+    assert set(img.getdata()) == {0, 255}
+    assert img.getpixel((1, 1)) == 255  # Inverted to a light background
@@ -0,0 +1,56 @@
+import json
+import os
+from os import path
+
+from lib import (
+    apply_renames,
+    plan_renames,
+    rename_journal,
+    resume_renames,
+    _write_journal,
+)
+
+
+def _touch(folder, *names):
+    for name in names:
+        open(path.join(folder, name), "w").close()
+
+
+def test_plan_adds_page_markers(tmp_path):
+    _touch(tmp_path, "ch1 01.psd", "ch1 02.psd", "notes.txt")
+
+    plan, skipped = plan_renames(1, str(tmp_path), set())
+
+    assert sorted(path.basename(dst) for _, dst in plan) == [
+        "ch1 01 01X.psd",
+        "ch1 02 02X.psd",
+    ]
+    assert [name for name, _ in skipped] == ["notes.txt"]
+
+
+def test_apply_removes_journal(tmp_path):
+    _touch(tmp_path, "ch1 01.psd")
+    plan, _ = plan_renames(1, str(tmp_path), set())
+    _write_journal(str(tmp_path), 1, plan)
+
+    assert apply_renames(str(tmp_path), plan) == []
+    assert sorted(os.listdir(tmp_path)) == ["ch1 01 01X.psd"]
+
+
+def test_resume_skips_steps_that_would_overwrite(tmp_path):
+    _touch(tmp_path, "a.psd", "b.psd", "c.psd", "c2.psd", "done2.psd")
+    plan = [
+        (path.join(tmp_path, "a.psd"), path.join(tmp_path, "a2.psd")),  # Pending
+        (path.join(tmp_path, "b.psd"), path.join(tmp_path, "c2.psd")),  # Conflict
+        (path.join(tmp_path, "done.psd"), path.join(tmp_path, "done2.psd")),  # Done
+    ]
+    _write_journal(str(tmp_path), 1, plan)
+
+    errors = resume_renames(str(tmp_path))
+
+    assert errors == [("b.psd", "Target already exists.")]
+    assert path.exists(path.join(tmp_path, "a2.psd"))
+    assert path.exists(path.join(tmp_path, "b.psd"))  # Not renamed over c2.psd.
+
+    with open(path.join(tmp_path, rename_journal), encoding="utf-8") as file:
+        assert json.load(file)["plan"] == [list(plan[1])]
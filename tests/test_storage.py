@@ -0,0 +1,124 @@
+import os
+from os import path
+
+import pytest
+
+import Storage
+from Storage import iter_log, open_log
+from Tools import RegistryManager
+
+entries = [
+    {"title": "Steam power", "content": "Watt engine", "tags": ["HISTORY"]},
+    {"title": "Corn laws", "content": "Tariff repeal", "tags": ["LAW"]},
+]
+
+
+@pytest.fixture
+def registry(tmp_path):
+    project_path = tmp_path / "project"
+    project_path.mkdir()
+    registry = RegistryManager(str(tmp_path))
+    assert registry.add_project("Test", str(project_path), storage="json")
+    open_log(str(project_path / "research_log.json"), "json").extend(entries)
+
+    return registry
+
+
+# Non-ASCII text; logs are written with ensure_ascii=False
+accented = [{"title": f"Café {n}", "content": "é" * n, "tags": []} for n in range(12)]
+
+
+@pytest.mark.parametrize("storage", ["json", "jsonl"])
+@pytest.mark.parametrize("chunk", [7, 64, 1 << 16])
+def test_iter_log(tmp_path, monkeypatch, storage, chunk):
+    log_path = str(tmp_path / "research_log.json")
+    log_store = open_log(log_path, storage)
+    log_store.extend(accented)
+    monkeypatch.setattr(Storage, "chunk_size", chunk)
+
+    assert list(iter_log(log_store.log_path)) == accented
+
+
+def test_iter_log_skips_torn_line(tmp_path):
+    log_path = tmp_path / "research_log.jsonl"
+    log_path.write_text('{"title": "Whole"}\n{"title": "Tor', encoding="utf-8")
+
+    assert list(iter_log(str(log_path))) == [{"title": "Whole"}]
+
+
+def test_iter_log_truncated_array(tmp_path):
+    log_path = tmp_path / "research_log.json"
+    log_path.write_text('[{"title": "Whole"}, {"title": "Tor', encoding="utf-8")
+
+    assert list(iter_log(str(log_path))) == [{"title": "Whole"}]
+
+
+def test_tail(tmp_path, monkeypatch):
+    log_store = open_log(str(tmp_path / "research_log.json"), "jsonl")
+    log_store.extend(accented)
+    size = path.getsize(log_store.log_path)
+
+    # Every chunk size; block boundaries fall inside records, and inside characters.
+    for chunk in range(1, size + 2):
+        monkeypatch.setattr(Storage, "chunk_size", chunk)
+
+        assert log_store.tail(3) == accented[-3:]
+
+    assert log_store.tail(20) == accented
+    assert log_store.tail(0) == []
+
+
+def test_tail_reads_legacy(tmp_path):
+    log_path = str(tmp_path / "research_log.json")
+    open_log(log_path, "json").extend(accented[:4])
+    open_log(log_path, "jsonl").extend(accented[4:6])
+
+    assert open_log(log_path, "jsonl").tail(3) == accented[3:6]
+
+
+@pytest.mark.parametrize(
+    "storage, files, removed",
+    [
+        ("jsonl", {"research_log.jsonl", "research_log.json"}, set()),
+        ("sqlite", {"research.db"}, {"research_log.json", "tags.json"}),
+    ],
+)
+def test_set_storage(registry, storage, files, removed):
+    project_path = registry.projects[0]["path"]
+
+    assert registry.set_storage(1, storage)
+    assert RegistryManager(registry.app_parent).projects[0]["storage"] == storage
+    assert files <= set(os.listdir(project_path))
+    assert not removed & set(os.listdir(project_path))
+    # The replaced files survive as backups
+    assert open_log(path.join(project_path, "research_log.json.bak")).load() == entries
+    assert {name + ".bak" for name in removed} <= set(os.listdir(project_path))
+
+    assert registry.set_storage(1, "json")
+    assert [
+        {key: entry[key] for key in ["title", "content", "tags"]}
+        for entry in open_log(path.join(project_path, "research_log.json")).load()
+    ] == entries
+    assert not {"research_log.jsonl", "research.db"} & set(os.listdir(project_path))
+
+
+def test_set_storage_unverified(registry, monkeypatch):
+    project_path = registry.projects[0]["path"]
+    monkeypatch.setattr("Tools._read_back", lambda project_path, storage: ([], []))
+
+    assert not registry.set_storage(1, "jsonl")
+    assert RegistryManager(registry.app_parent).projects[0]["storage"] == "json"
+    assert open_log(path.join(project_path, "research_log.json")).load() == entries
+    assert "research_log.json.bak" not in os.listdir(project_path)
+
+
+def test_add_project_unsaved(registry, tmp_path, monkeypatch):
+    def file_lock(file_path):
+        raise TimeoutError(file_path)
+
+    monkeypatch.setattr("Tools.file_lock", file_lock)
+
+    assert not registry.add_project("Other", str(tmp_path))
+    assert [project["name"] for project in registry.projects] == ["Test"]
+    assert list(registry.by_path) == [registry.projects[0]["path"]]
+    assert list(registry._changed) == [registry.projects[0]["path"]]
@@ -0,0 +1,57 @@
+import pytest
+from PIL import Image, ImageDraw
+
+from Tables import _assign_words, _merge, _runs, find_cells
+
+
+def test_runs():
+    assert _runs([False, True, True, False, True]) == [(1, 3), (4, 5)]
+    assert _runs([]) == []
+
+
+def test_merge():
+    assert _merge([(0, 5), (6, 10), (20, 25)], 3) == [(0, 10), (20, 25)]
+
+
+def grid(ruled):
+    """A 2 x 3 table; a blank cell at row 1, column 2."""
+    img = Image.new("L", (300, 100), 255)
+    draw = ImageDraw.Draw(img)
+
+    if ruled:
+        for y in [0, 50, 99]:
+            draw.line((0, y, 299, y), fill=0, width=1)
+        for x in [0, 100, 200, 299]:
+            draw.line((x, 0, x, 99), fill=0, width=1)
+
+    for row, col in [(0, 0), (0, 1), (0, 2), (1, 0), (1, 1)]:
+        left, top = 20 + col * 100, 15 + row * 50
+        draw.rectangle((left, top, left + 40, top + 15), fill=0)
+
+    return img
+
+
+@pytest.mark.parametrize("ruled", [True, False])
+def test_find_cells(ruled):
+    cells, rows, cols = find_cells(grid(ruled))
+
+    assert (rows, cols) == (2, 3)
+    assert [(row, col) for row, col, _ in cells] == [
+        (0, 0),
+        (0, 1),
+        (0, 2),
+        (1, 0),
+        (1, 1),
+    ]
+    assert cells[4][2] == (120, 65, 161, 81)
+
+
+def test_assign_words():
+    words = [
+        {"text": "a", "top": 2, "height": 10},
+        {"text": " ", "top": 2, "height": 10},
+        {"text": "b", "top": 25, "height": 10},
+        {"text": "c", "top": 28, "height": 10},
+    ]
+
+    assert _assign_words(words, [(0, 20), (20, 40)]) == [["a"], ["b", "c"]]
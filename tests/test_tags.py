@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from Index import TagIndex
+from Storage import open_log
+from Tools import TagManager
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "tags.json").write_text(json.dumps(["HISTORY", "LAW", "<1846>"]))
+    open_log(str(tmp_path / "research_log.json"), "json").extend(
+        [{"tags": ["LAW", "<1846>"]}, {"tags": ["LAW"]}]
+    )
+
+    return tmp_path
+
+
+def test_legacy_ids_follow_list(project):
+    manager = TagManager(str(project))
+
+    assert manager.index.items() == [(1, "HISTORY", 0), (2, "LAW", 2), (3, "<1846>", 1)]
+    assert (project / "tags_index.json").exists()
+
+
+def test_ids_survive_reorder(project):
+    TagManager(str(project))
+    (project / "tags.json").write_text(json.dumps(["<1846>", "ECONOMICS", "LAW"]))
+    index = TagIndex(
+        str(project / "tags.json"),
+        ["<1846>", "ECONOMICS", "LAW"],
+        str(project / "research_log.json"),
+    )
+
+    assert index.name(2) == "LAW"
+    assert index.name(4) == "ECONOMICS"
+
+
+@pytest.mark.parametrize("storage", ["json", "sqlite"])
+def test_resolve_tags(project, storage):
+    manager = TagManager(str(project), storage)
+    manager.index.add("HISTORY")
+    history = manager.index.ids["HISTORY"]
+
+    resolved = manager.resolve_tags(
+        f"{history}, trade routes, <1850>, 99, <none>, Trade!, <1914>"
+    )
+
+    assert resolved == ["HISTORY", "TRADE", "<1850>", "<000>", "<1914>"]
+    assert "TRADE" in TagManager(str(project), storage).index
+
+
+def test_record_usage(project):
+    manager = TagManager(str(project))
+    manager.record_usage(["HISTORY", "NEW"])
+    reloaded = TagManager(str(project)).index
+
+    assert reloaded.counts[reloaded.ids["HISTORY"]] == 1
+    assert reloaded.counts[reloaded.ids["NEW"]] == 1
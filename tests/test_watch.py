@@ -0,0 +1,104 @@
+import os
+import signal
+from concurrent.futures import Future
+
+import pytest
+
+import Clipboard
+import Tools
+from Layout import Layout
+from Tools import TagManager, TextEntry
+
+
+class StubOCR:
+    def warm(self, *args):
+        pass
+
+
+def finished(content, layout=None):
+    future = Future()
+    future.set_result((content, "eng", layout))
+
+    return future
+
+
+@pytest.fixture
+def text_entry(tmp_path):
+    project_path = str(tmp_path)
+
+    return TextEntry(project_path, TagManager(project_path), StubOCR())
+
+
+def test_failed_save_is_retried(text_entry, monkeypatch):
+    metadata = ("", "clipboard", "", [])
+    pending = [finished("First snip"), finished(""), finished("Second snip")]
+    save_entries = Tools._save_entries
+
+    monkeypatch.setattr(Tools, "_save_entries", lambda *args: False)
+
+    assert text_entry._save_watched(pending, metadata) == 0
+    assert len(pending) == 2  # The snip without text is dropped.
+
+    monkeypatch.setattr(Tools, "_save_entries", save_entries)
+
+    assert text_entry._save_watched(pending, metadata) == 2
+    assert pending == []
+    assert [entry["title"] for entry in text_entry.log_store.load()] == [
+        "First snip",
+        "Second snip",
+    ]
+
+
+def test_layouts_stored_once_saved(text_entry, monkeypatch):
+    words = [
+        {
+            "text": "Snip",
+            "left": 1,
+            "top": 1,
+            "width": 30,
+            "height": 10,
+            "conf": 95,
+            "block_num": 1,
+            "par_num": 1,
+            "line_num": 1,
+        }
+    ]
+    pending = [finished("Snip", Layout.from_words(words, (40, 20)))]
+    save_entries = Tools._save_entries
+
+    monkeypatch.setattr(Tools, "_save_entries", lambda *args: False)
+    text_entry._save_watched(pending, ("", "", "", []))
+
+    assert not os.path.exists(text_entry.layout_path)
+
+    monkeypatch.setattr(Tools, "_save_entries", save_entries)
+    text_entry._save_watched(pending, ("", "", "", []))
+    (entry,) = text_entry.log_store.load()
+
+    assert os.path.isfile(os.path.join(text_entry.project_path, entry["layout"]))
+
+
+def test_interrupted_save_completes(text_entry, monkeypatch):
+    snips = iter(["First snip", "Second snip"])
+    save_entries = Tools._save_entries
+
+    class StubWatcher:
+        def poll(self):
+            return next(snips, None)
+
+    def interrupted_save(*args):
+        saved = save_entries(*args)
+        signal.raise_signal(signal.SIGINT)  # Ctrl+C as the batch is written
+
+        return saved
+
+    monkeypatch.setattr(Clipboard, "ClipboardWatcher", StubWatcher)
+    monkeypatch.setattr(Tools, "watch_batch", 2)
+    monkeypatch.setattr(Tools, "_save_entries", interrupted_save)
+    monkeypatch.setattr(text_entry, "submit_ocr", finished)
+
+    assert text_entry.watch_clipboard(("", "", "", []), interval=0.001) == 2
+    assert [entry["title"] for entry in text_entry.log_store.load()] == [
+        "First snip",
+        "Second snip",
+    ]